@@ -59,6 +59,18 @@ export function useTranslateBatch() {
   );
 }
 
+/**
+ * Translate multiple entries in a background job; the results arrive as
+ * `translation_stream` and `translation_stream_complete` realtime events
+ */
+export function useStreamTranslateBatch() {
+  return useFrappePostCall<{
+    success: boolean;
+    job_id?: string;
+    error?: string;
+  }>('translation_tools.api.ai_translation.stream_translate_batch');
+}
+
 /**
  * Translate multiple entries in a batch
  */
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { Button } from '@/components/ui/button';
 import { Checkbox } from '@/components/ui/checkbox';
 import {
@@ -13,7 +13,10 @@ import { toast } from 'sonner';
 // import { useTranslateBatch, useSaveBatchTranslations } from '../api';
 import type { POFile, TranslationToolsSettings, POEntry } from '../types';
 import { useTranslation } from '@/context/TranslationContext';
-import { useFrappePostCall } from 'frappe-react-sdk';
+import { useFrappeEventListener, useFrappePostCall } from 'frappe-react-sdk';
+
+// A streaming job that sends nothing for this long is given up on
+const STREAM_IDLE_TIMEOUT_MS = 15 * 60 * 1000;
 
 interface BatchTranslationViewProps {
   selectedFile: POFile | null;
@@ -37,6 +40,10 @@ export default function BatchTranslationView({
     [key: string]: string;
   }>({});
   const [isTranslating, setIsTranslating] = useState(false);
+  // Job whose streamed translations are being received; the id is made
+  // here, so events of a job finishing before the call returns still match
+  const streamJobId = useRef<string | null>(null);
+  const streamTimeout = useRef<ReturnType<typeof setTimeout> | null>(null);
 
   // Select entries that need translation
   const untranslatedEntries = entries.filter((entry) => !entry.is_translated);
@@ -47,7 +54,9 @@ export default function BatchTranslationView({
     call: translateBatchCall,
     loading: translateLoading,
     error: translateError,
-  } = useFrappePostCall('translation_tools.api.ai_translation.translate_batch');
+  } = useFrappePostCall(
+    'translation_tools.api.ai_translation.stream_translate_batch'
+  );
 
   const {
     call: saveBatchCall,
@@ -73,6 +82,63 @@ export default function BatchTranslationView({
     }
   }, [translateError, saveError, __]);
 
+  const stopStream = () => {
+    streamJobId.current = null;
+    if (streamTimeout.current) {
+      clearTimeout(streamTimeout.current);
+      streamTimeout.current = null;
+    }
+    setIsTranslating(false);
+  };
+
+  // (Re)start the idle timer, so a job that dies silently does not spin forever
+  const watchStream = () => {
+    if (streamTimeout.current) clearTimeout(streamTimeout.current);
+    streamTimeout.current = setTimeout(() => {
+      stopStream();
+      toast.error(__('Translation timed out'));
+    }, STREAM_IDLE_TIMEOUT_MS);
+  };
+
+  useEffect(() => {
+    return () => {
+      if (streamTimeout.current) clearTimeout(streamTimeout.current);
+    };
+  }, []);
+
+  // Show translations as the background job parses them
+  useFrappeEventListener('translation_stream', (data) => {
+    if (!data || data.job_id !== streamJobId.current) return;
+    watchStream();
+    setTranslatedEntries((prev) => ({ ...prev, ...data.translations }));
+  });
+
+  useFrappeEventListener('translation_stream_complete', async (data) => {
+    if (!data || data.job_id !== streamJobId.current) return;
+    stopStream();
+
+    if (!data.success) {
+      console.error('Translation error:', data.error);
+      toast.error(data.error || __('Translation failed'));
+      return;
+    }
+
+    const newTranslations = data.translations || {};
+    setTranslatedEntries((prev) => ({ ...prev, ...newTranslations }));
+    if (data.failed?.length) {
+      toast.warning(
+        `${data.failed.length} ` + __('entries could not be translated')
+      );
+    } else {
+      toast.success(__('Batch translation completed successfully'));
+    }
+
+    // If auto-save is enabled
+    if (settings?.auto_save) {
+      await saveBatchTranslations(newTranslations);
+    }
+  });
+
   // Clear selection when entries change
   // useEffect(() => {
   //   setSelectedEntries([]);
@@ -87,6 +153,9 @@ export default function BatchTranslationView({
     toast.info(
       __('Translating batch of') + ` ${selectedEntries.length} ` + __('entries...')
     );
+    const jobId = `${Date.now().toString(36)}${Math.random().toString(36).slice(2, 8)}`;
+    streamJobId.current = jobId;
+    watchStream();
 
     try {
       // API call to translate batch
@@ -108,41 +177,33 @@ export default function BatchTranslationView({
 
       // const data = await result.json();
 
-      // Use SDK hook instead of fetch
+      // The job streams its results over realtime events, see above
       const response = await translateBatchCall({
         file_path: selectedFile.file_path,
         entry_ids: selectedEntries.map((e) => e.id),
         model_provider: settings?.default_model_provider || 'openai',
         model: settings?.default_model || undefined,
+        stream_job_id: jobId,
       });
 
       // console.log('response translateBatchCall', response);
 
-      if (response?.message?.success) {
-        // Update translations
-        const newTranslations = response?.message?.translations;
-        setTranslatedEntries((prev) => ({ ...prev, ...newTranslations }));
-
-        toast.success(__('Batch translation completed successfully'));
-
-        // If auto-save is enabled
-        if (settings?.auto_save) {
-          await saveBatchTranslations();
-        }
-      } else {
+      if (!response?.message?.success && streamJobId.current === jobId) {
         console.error('Translation error:', response?.message?.error);
         toast.error(response?.message?.error || __('Translation failed'));
+        stopStream();
       }
     } catch (err) {
       console.error('Translation error:', err);
       toast.error(__('Translation failed'));
-    } finally {
-      setIsTranslating(false);
+      if (streamJobId.current === jobId) stopStream();
     }
   };
 
-  const saveBatchTranslations = async () => {
-    if (!selectedFile?.file_path || Object.keys(translatedEntries).length === 0)
+  const saveBatchTranslations = async (
+    translations: { [key: string]: string } = translatedEntries
+  ) => {
+    if (!selectedFile?.file_path || Object.keys(translations).length === 0)
       return;
 
     toast.info(__('Saving translations...'));
@@ -168,7 +229,7 @@ export default function BatchTranslationView({
       // Use SDK hook instead of fetch
       const result = await saveBatchCall({
         file_path: selectedFile.file_path,
-        translations: translatedEntries,
+        translations,
         push_to_github: settings?.github_enable && settings?.github_token,
       });
 
@@ -350,7 +411,7 @@ export default function BatchTranslationView({
             </Button>
 
             <Button
-              onClick={saveBatchTranslations}
+              onClick={() => saveBatchTranslations()}
               disabled={
                 isTranslating ||
                 saveLoading ||
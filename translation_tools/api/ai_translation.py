@@ -1,21 +1,34 @@
 import os
+from datetime import datetime
+
 import frappe
 import polib
 import json
-import hashlib
 import openai
 import anthropic
 import logging
-import tempfile
 from .settings import get_translation_settings, get_decrypted_api_keys
 from .po_files import (
     push_translation_to_github,
     enhanced_error_handler,
     validate_file_path,
+    get_po_catalog,
+    language_from_filename,
 )
 from .common import get_bench_path
-from .translation import _batch_translate_with_openai, _batch_translate_with_claude
+from .glossary import get_glossary_terms_dict
+from .translation_memory import translate_with_memory
+from .translation import (
+    _batch_translate_with_openai,
+    _batch_translate_with_claude,
+    get_failover_max_wait,
+    get_parse_stats,
+    get_provider_breaker,
+    translate_chunked,
+)
 from translation_tools.utils.json_logger import get_json_logger
+from translation_tools.utils.po_catalog import get_catalog_cache
+from translation_tools.utils.prompt_cache import PromptUsage
 from frappe.utils import cstr, now
 
 # Configure logging
@@ -66,36 +79,66 @@ def validate_po_file(file_path):
         if not os.path.exists(full_path):
             return False, f"File not found: {file_path}"
 
-        # Try reading the file as UTF-8
-        with open(full_path, "rb") as f:
-            content = f.read()
-
-        # Check for and remove BOM if present
-        if content.startswith(b"\xef\xbb\xbf"):
-            logger.info(f"Removing BOM from file {file_path}")
-            content = content[3:]
-
-        # Create a temporary file without BOM
-        with tempfile.NamedTemporaryFile(delete=False) as temp:
-            temp_path = temp.name
-            temp.write(content)
-
         try:
-            # Try to parse the cleaned file
-            po = polib.pofile(temp_path)
+            # Reuse the parsed catalog shared with the editor endpoints
+            po = get_po_catalog(full_path).po
             return True, po
         except Exception as e:
             logger.error(f"PO Syntax error in {file_path}: {str(e)}")
             return False, f"Syntax error in po file: {str(e)}"
-        finally:
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
     except Exception as e:
         logger.error(f"Error validating PO file {file_path}: {str(e)}")
         return False, str(e)
 
 
+def _get_batch_config(model_provider=None, model=None):
+    """
+    Resolve the provider, model and API key of a batch translation
+
+    Returns:
+        tuple: (settings, provider, model, api_key or None)
+    """
+    api_keys = get_decrypted_api_keys()
+    settings = get_translation_settings()
+
+    # Use the working config values or fall back to parameters
+    final_provider = model_provider if model_provider else settings.get("default_model_provider", "openai")
+    final_model = model if model else settings.get("default_model", "gpt-4o-mini")
+
+    # Get the appropriate API key based on provider
+    if final_provider == "openai":
+        api_key = api_keys.get("openai_api_key")
+    elif final_provider in ["anthropic", "claude"]:
+        api_key = api_keys.get("anthropic_api_key")
+    else:
+        api_key = None
+
+    return settings, final_provider, final_model, api_key
+
+
+def _get_batch_entries(full_path, entry_ids):
+    """Return the requested entries of a PO file that have a msgid"""
+    entries_to_translate = []  # List for result mapping
+    catalog = get_po_catalog(full_path)
+    for entry_id in entry_ids:
+        # Look up each requested entry in the catalog index
+        po_index, entry = catalog.find_entry(entry_id)
+        if entry is None or not entry.msgid:
+            continue
+
+        # Add to list for result mapping
+        entries_to_translate.append(
+            {
+                "id": entry_id,
+                "po_index": po_index,  # Store index for later retrieval
+                "entry": entry,  # Store the full entry for GitHub push
+                "msgid": entry.msgid,
+                "context": entry.msgctxt if hasattr(entry, "msgctxt") else None,
+            }
+        )
+    return entries_to_translate
+
+
 @frappe.whitelist()
 @enhanced_error_handler  
 def translate_batch(file_path, entry_ids, model_provider="openai", model=None):
@@ -159,22 +202,8 @@ def translate_batch(file_path, entry_ids, model_provider="openai", model=None):
         #         os.unlink(temp_path)
 
         # Get API keys from secure Translation Tools Settings
-        from .translation import _translate_with_openai, _translate_with_claude
-        
-        api_keys = get_decrypted_api_keys()
-        settings = get_translation_settings()
-        
-        # Use the working config values or fall back to parameters
-        final_provider = model_provider if model_provider else settings.get("default_model_provider", "openai")
-        final_model = model if model else settings.get("default_model", "gpt-4o-mini")
         
-        # Get the appropriate API key based on provider
-        if final_provider == "openai":
-            api_key = api_keys.get("openai_api_key")
-        elif final_provider in ["anthropic", "claude"]:
-            api_key = api_keys.get("anthropic_api_key")
-        else:
-            api_key = None
+        settings, final_provider, final_model, api_key = _get_batch_config(model_provider, model)
 
         if not api_key:
             return {
@@ -190,33 +219,8 @@ def translate_batch(file_path, entry_ids, model_provider="openai", model=None):
             
         logger.info(f"Processing {len(entry_ids)} requested entry IDs")
 
-        # Get entries to translate
-        entries_dict = {}  # Dictionary for batch translation functions
-        entries_to_translate = []  # List for result mapping
-
         logger.info("Building entries list...")
-        for po_index, entry in enumerate(po):
-            if not isinstance(entry, polib.POEntry) or not entry.msgid:
-                continue
-
-            # Generate entry ID using the same method as FrontEnd
-            unique_string = f"{po_index}-{entry.msgid}"
-            entry_id = hashlib.md5(unique_string.encode("utf-8")).hexdigest()
-
-            if entry_id in entry_ids:
-                # Add to the dictionary with po_index as key for batch translation
-                entries_dict[po_index] = entry.msgid
-
-                # Add to list for result mapping
-                entries_to_translate.append(
-                    {
-                        "id": entry_id,
-                        "po_index": po_index,  # Store index for later retrieval
-                        "entry": entry,  # Store the full entry for GitHub push
-                        "msgid": entry.msgid,
-                        "context": entry.msgctxt if hasattr(entry, "msgctxt") else None,
-                    }
-                )
+        entries_to_translate = _get_batch_entries(full_path, entry_ids)
 
         if not entries_to_translate:
             logger.error("No valid entries found for translation")
@@ -224,43 +228,51 @@ def translate_batch(file_path, entry_ids, model_provider="openai", model=None):
             
         logger.info(f"Found {len(entries_to_translate)} entries to translate")
 
-        # Create input for translation
-        # entries_for_translation = [e["msgid"] for e in entries_to_translate]
-
-        # Use the SAME translation method as the fast working single entry function
         logger.info(f"Starting translation with {final_provider} using {final_model}")
         translation_start_time = time.time()
-        
-        results = {}
+
+        try:
+            glossary_terms = get_glossary_terms_dict()
+        except Exception as glossary_error:
+            logger.warning(f"Failed to load glossary: {glossary_error}")
+            glossary_terms = {}
+        temperature = settings.get("temperature", 0.3)
+
+        def translate_missing(missing):
+            # One request per chunk, chunks packed by estimated tokens
+            translated, _ = translate_chunked(
+                [(entry_id, msgid) for entry_id, (msgid, _) in missing.items()],
+                final_provider,
+                api_key,
+                final_model,
+                glossary_terms,
+                temperature,
+            )
+            return translated
+
         try:
-            # Translate each entry individually using the SAME method as the working function
+            # Strings the translation memory knows are not sent to the provider
+            results = translate_with_memory(
+                {
+                    entry_data["id"]: (entry_data["msgid"], entry_data["context"])
+                    for entry_data in entries_to_translate
+                },
+                translate_missing,
+                language=language_from_filename(os.path.basename(full_path), "th"),
+                provider=final_provider,
+                model=final_model,
+            )
             for entry_data in entries_to_translate:
-                entry_id = entry_data["id"]
-                msgid = entry_data["msgid"]
-                
-                logger.info(f"Translating entry {entry_id}: {msgid[:50]}...")
-                
-                # Use the EXACT SAME translation functions as the working single entry
-                if final_provider == "claude":
-                    translation = _translate_with_claude(api_key, final_model, msgid)
-                else:
-                    translation = _translate_with_openai(api_key, final_model, msgid)
-                
-                if translation:
-                    results[entry_id] = translation
-                    logger.info(f"Entry {entry_id} translated successfully")
-                else:
-                    results[entry_id] = ""
-                    logger.warning(f"Entry {entry_id} translation failed")
-                
+                results.setdefault(entry_data["id"], "")
+
             translation_duration = time.time() - translation_start_time
             logger.info(f"Batch translation completed in {translation_duration:.2f} seconds")
-            
+
         except Exception as ai_error:
             logger.error(f"Translation failed: {str(ai_error)}")
             return {"success": False, "error": f"Translation failed: {str(ai_error)}"}
 
-        # Results are already built in the loop above
+        # Results are keyed by the requested entry IDs
         logger.info(f"Returning {len(results)} translations")
         return {"success": True, "translations": results}
 
@@ -269,6 +281,125 @@ def translate_batch(file_path, entry_ids, model_provider="openai", model=None):
         return {"success": False, "error": str(e)}
 
 
+@frappe.whitelist()
+@enhanced_error_handler
+def stream_translate_batch(file_path, entry_ids, model_provider="openai", model=None, stream_job_id=None):
+    """
+    Translate a batch of entries in a background job, streaming the results
+
+    Returns as soon as the job is queued. The job publishes a
+    ``translation_stream`` realtime event with the translations of each
+    entry as soon as they are parsed from the provider's streamed answer,
+    then a ``translation_stream_complete`` event with all translations.
+    Nothing is saved, see save_batch_translations().
+
+    Args:
+        stream_job_id (str): Id the events are tagged with; the client makes
+            it, so it can match events of a job that finishes before this
+            call returns
+
+    Returns:
+        dict: ``job_id`` to match the realtime events against
+    """
+    full_path = validate_file_path(file_path)
+    is_valid, po_result = validate_po_file(file_path)
+    if not is_valid:
+        return {"success": False, "error": po_result}
+
+    _, final_provider, final_model, api_key = _get_batch_config(model_provider, model)
+    if not api_key:
+        return {
+            "success": False,
+            "error": "API key not found in configuration. Please configure it in Translation Tools Settings.",
+        }
+
+    if isinstance(entry_ids, str):
+        entry_ids = json.loads(entry_ids)
+
+    job_id = stream_job_id or frappe.generate_hash(length=12)
+    # Not job_id, frappe.enqueue() takes that as the RQ job's own id
+    frappe.enqueue(
+        stream_translate_batch_job,
+        queue="long",
+        timeout=1800,
+        stream_job_id=job_id,
+        full_path=full_path,
+        file_path=file_path,
+        entry_ids=entry_ids,
+        model_provider=final_provider,
+        model=final_model,
+    )
+    logger.info(f"Queued streaming translation {job_id} of {len(entry_ids)} entries")
+    return {"success": True, "job_id": job_id, "async": True}
+
+
+def stream_translate_batch_job(stream_job_id, full_path, file_path, entry_ids, model_provider, model):
+    """Background job of stream_translate_batch()"""
+    user = frappe.session.user
+
+    def publish(event, message):
+        frappe.publish_realtime(
+            event, {"job_id": stream_job_id, "file_path": file_path, **message}, user=user
+        )
+
+    try:
+        settings, _, _, api_key = _get_batch_config(model_provider, model)
+        entries_to_translate = _get_batch_entries(full_path, entry_ids)
+        try:
+            glossary_terms = get_glossary_terms_dict()
+        except Exception as glossary_error:
+            logger.warning(f"Failed to load glossary: {glossary_error}")
+            glossary_terms = {}
+
+        prompt_usage = PromptUsage()
+
+        def translate_missing(missing):
+            translated, _ = translate_chunked(
+                [(entry_id, msgid) for entry_id, (msgid, _) in missing.items()],
+                model_provider,
+                api_key,
+                model,
+                glossary_terms,
+                settings.get("temperature", 0.3),
+                on_translation=lambda entry_id, translation: publish(
+                    "translation_stream", {"translations": {entry_id: translation}}
+                ),
+                max_wait=get_failover_max_wait(),
+                prompt_usage=prompt_usage,
+            )
+            return translated
+
+        results = translate_with_memory(
+            {
+                entry_data["id"]: (entry_data["msgid"], entry_data["context"])
+                for entry_data in entries_to_translate
+            },
+            translate_missing,
+            language=language_from_filename(os.path.basename(full_path), "th"),
+            provider=model_provider,
+            model=model,
+            on_hits=lambda hits: publish("translation_stream", {"translations": hits}),
+        )
+        # The job runs outside a request, remembered translations need a commit
+        frappe.db.commit()
+
+        failed = [entry_data["id"] for entry_data in entries_to_translate if not results.get(entry_data["id"])]
+        logger.info(f"Streaming translation {stream_job_id}: {len(results)} translated, {len(failed)} failed")
+        publish(
+            "translation_stream_complete",
+            {
+                "success": True,
+                "translations": results,
+                "failed": failed,
+                "prompt_usage": prompt_usage.as_dict(),
+            },
+        )
+    except Exception as e:
+        logger.error(f"Streaming translation {stream_job_id} failed: {str(e)}", exc_info=True)
+        frappe.log_error(f"Streaming translation error: {str(e)}")
+        publish("translation_stream_complete", {"success": False, "error": str(e)})
+
+
 @frappe.whitelist()
 @enhanced_error_handler
 def save_batch_translations(file_path, translations, push_to_github=False):
@@ -303,45 +434,36 @@ def save_batch_translations(file_path, translations, push_to_github=False):
 
         # Load PO file
         full_path = validate_file_path(file_path)
-        po_file = polib.pofile(full_path)
+        catalog = get_po_catalog(full_path)
 
         # Update entries
-        updated_count = 0
-        for po_index, entry in enumerate(po_file):
-            if not isinstance(entry, polib.POEntry) or not entry.msgid:
-                continue
-
-            # Generate entry ID
-            unique_string = f"{po_index}-{entry.msgid}"
-            entry_id = hashlib.md5(unique_string.encode("utf-8")).hexdigest()
-
-            # Check if this entry should be updated
-            if str(entry_id) in translations:
-                new_translation = translations[str(entry_id)]
+        updated_entries = []
+        with catalog.lock:
+            for entry_id, new_translation in translations.items():
+                _index, entry = catalog.find_entry(str(entry_id))
+                if entry is None or not entry.msgid:
+                    continue
 
                 # Update entry
-                entry.msgstr = new_translation
-                updated_count += 1
-
-                # Push to GitHub if requested
-                if push_to_github:
-                    try:
-                        push_translation_to_github(file_path, entry, new_translation)
-                    except Exception as github_err:
-                        frappe.log_error(
-                            f"GitHub push error for entry {entry_id}: {str(github_err)}"
-                        )
-
-        # Save the file
-        full_path = validate_file_path(file_path)
-        po_file.save(full_path)
-
-        # Update metadata
-        update_po_metadata(po_file, file_path)
+                catalog.set_msgstr(entry, new_translation)
+                updated_entries.append((entry_id, entry, new_translation))
+
+            # Patch the changed msgstr into the file instead of rewriting it
+            flush_batch(catalog, full_path)
+
+        # Push to GitHub if requested, without holding the catalog lock
+        if push_to_github:
+            for entry_id, entry, new_translation in updated_entries:
+                try:
+                    push_translation_to_github(file_path, entry, new_translation)
+                except Exception as github_err:
+                    frappe.log_error(
+                        f"GitHub push error for entry {entry_id}: {str(github_err)}"
+                    )
 
         return {
             "success": True,
-            "updated_count": updated_count,
+            "updated_count": len(updated_entries),
             "github_pushed": push_to_github,
         }
 
@@ -386,38 +508,29 @@ def save_batch_translations_with_single_github_push(
             push_to_github = push_to_github.lower() == "true"
 
         # Load PO file
-        po_file = polib.pofile(file_path)
+        full_path = validate_file_path(file_path)
+        catalog = get_po_catalog(full_path)
 
         # Map of entries that will be updated
         updated_entries = []
 
         # Update entries
         updated_count = 0
-        for po_index, entry in enumerate(po_file):
-            if not entry.msgid:
-                continue
-
-            # Generate entry ID
-            unique_string = f"{po_index}-{entry.msgid}"
-            entry_id = hashlib.md5(unique_string.encode("utf-8")).hexdigest()
-
-            # Check if this entry should be updated
-            if str(entry_id) in translations:
-                new_translation = translations[str(entry_id)]
+        with catalog.lock:
+            for entry_id, new_translation in translations.items():
+                _index, entry = catalog.find_entry(str(entry_id))
+                if entry is None or not entry.msgid:
+                    continue
 
                 # Store the entry and translation for later GitHub push
                 updated_entries.append({"entry": entry, "translation": new_translation})
 
                 # Update entry
-                entry.msgstr = new_translation
+                catalog.set_msgstr(entry, new_translation)
                 updated_count += 1
 
-        # Save the file
-        full_path = validate_file_path(file_path)
-        po_file.save(full_path)
-
-        # Update metadata
-        update_po_metadata(po_file, file_path)
+            # Patch the changed msgstr into the file instead of rewriting it
+            flush_batch(catalog, full_path)
 
         # Push to GitHub if requested (a single push for all changes)
         github_result = None
@@ -504,6 +617,17 @@ def push_batch_to_github(file_path, updated_entries):
 
 
 # Helper function to update PO file metadata after translations
+def flush_batch(catalog, full_path):
+    """Write the batch's set_msgstr() changes and the revision date, see save_translation()"""
+    catalog.po.metadata["PO-Revision-Date"] = datetime.now().strftime("%Y-%m-%d %H:%M%z")
+    try:
+        catalog.flush()
+    except Exception:
+        # The in-memory catalog no longer matches the file
+        get_catalog_cache().invalidate(full_path)
+        raise
+
+
 def update_po_metadata(po_file, file_path):
     """Update PO file metadata including translation percentage"""
     try:
@@ -586,6 +710,42 @@ def test_ai_connection(provider="openai"):
         return {"success": False, "error": str(e), "provider": provider}
 
 
+@frappe.whitelist()
+def get_provider_health():
+    """Circuit breaker state of each AI provider, shown on the settings page"""
+    return {
+        "success": True,
+        "providers": [get_provider_breaker(provider).status() for provider in ("openai", "claude")],
+    }
+
+
+@frappe.whitelist()
+def reset_provider_circuit(provider):
+    """Close a provider's circuit breaker, e.g. after fixing its API key"""
+    frappe.only_for("System Manager")
+    breaker = get_provider_breaker(provider)
+    breaker.reset()
+    return {"success": True, **breaker.status()}
+
+
+@frappe.whitelist()
+def get_batch_parse_stats():
+    """Share of batch items each model left out or got wrong, to compare models"""
+    frappe.only_for("System Manager")
+    try:
+        models = get_parse_stats()
+    except Exception as e:
+        logger.warning(f"Could not read parse stats: {str(e)}")
+        return {"success": False, "error": str(e)}
+    return {
+        "success": True,
+        "models": sorted(
+            ({"model": model, **counts} for model, counts in models.items()),
+            key=lambda counts: counts["failure_rate"],
+        ),
+    }
+
+
 @frappe.whitelist()
 def test_all_ai_connections():
     """Test connections to all configured AI providers"""
@@ -2,11 +2,10 @@ import os
 import frappe
 import polib
 import json
-import hashlib
-import openai
 from .settings import get_decrypted_api_keys, get_translation_settings
-from .po_files import enhanced_error_handler, validate_file_path
+from .po_files import enhanced_error_handler, validate_file_path, get_po_catalog
 from .common import logger
+from .translation import get_ai_client
 
 
 @frappe.whitelist()
@@ -24,8 +23,8 @@ def translate_batch_simple(file_path, entry_ids, model_provider="openai", model=
             return {"success": False, "error": f"File not found: {file_path}"}
 
         # Load PO file
-        po = polib.pofile(full_path)
-        logger.info(f"Loaded PO file with {len(po)} entries")
+        catalog = get_po_catalog(full_path)
+        logger.info(f"Loaded PO file with {len(catalog)} entries")
 
         # Get API keys
         api_keys = get_decrypted_api_keys()
@@ -40,41 +39,37 @@ def translate_batch_simple(file_path, entry_ids, model_provider="openai", model=
 
         # Find entries to translate
         results = {}
-        for po_index, entry in enumerate(po):
-            if not entry.msgid:
+        for entry_id in entry_ids:
+            _index, entry = catalog.find_entry(entry_id)
+            if entry is None or not entry.msgid:
                 continue
+
+            logger.info(f"Translating entry {entry_id}: {entry.msgid[:50]}...")
                 
-            # Generate entry ID
-            unique_string = f"{po_index}-{entry.msgid}"
-            entry_id = hashlib.md5(unique_string.encode("utf-8")).hexdigest()
-            
-            if entry_id in entry_ids:
-                logger.info(f"Translating entry {entry_id}: {entry.msgid[:50]}...")
-                
-                # Simple API call without complex processing
-                try:
-                    client = openai.OpenAI(api_key=api_key)
-                    response = client.chat.completions.create(
-                        model=model or "gpt-4o-mini",
-                        messages=[
-                            {
-                                "role": "system",
-                                "content": "Translate from English to Thai. Return only the translation."
-                            },
-                            {"role": "user", "content": entry.msgid}
-                        ],
-                        temperature=0.3,
-                        max_tokens=1000,
-                        timeout=30  # 30 second timeout per entry
-                    )
+            # Simple API call without complex processing
+            try:
+                client = get_ai_client("openai", api_key)
+                response = client.chat.completions.create(
+                    model=model or "gpt-4o-mini",
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "Translate from English to Thai. Return only the translation."
+                        },
+                        {"role": "user", "content": entry.msgid}
+                    ],
+                    temperature=0.3,
+                    max_tokens=1000,
+                    timeout=30  # 30 second timeout per entry
+                )
                     
-                    translation = response.choices[0].message.content.strip()
-                    results[entry_id] = translation
-                    logger.info(f"Translated entry {entry_id} successfully")
+                translation = response.choices[0].message.content.strip()
+                results[entry_id] = translation
+                logger.info(f"Translated entry {entry_id} successfully")
                     
-                except Exception as translate_error:
-                    logger.error(f"Translation failed for entry {entry_id}: {str(translate_error)}")
-                    results[entry_id] = ""
+            except Exception as translate_error:
+                logger.error(f"Translation failed for entry {entry_id}: {str(translate_error)}")
+                results[entry_id] = ""
 
         logger.info(f"Translation completed. Results: {len(results)} entries")
         return {"success": True, "translations": results}
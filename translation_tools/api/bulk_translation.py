@@ -21,14 +21,18 @@ logger = logging.getLogger("translation_tools.bulk_translation")
 # ASEAN-focused language support
 SUPPORTED_ASEAN_LOCALES = ["th", "vi", "lo", "km", "my"]  # Thai, Vietnamese, Lao, Khmer (Cambodia), Myanmar (Burma)
 
+# Locales the AI prompts and glossary are written for
+AI_TRANSLATION_LOCALES = ["th"]
+
 
 @frappe.whitelist()
-def generate_all_apps_asean_translations(force_regenerate_pot=False):
+def generate_all_apps_asean_translations(force_regenerate_pot=False, translate_untranslated=False):
     """
     Enqueue bulk ASEAN translation generation as a background job
 
     Args:
         force_regenerate_pot (bool): Whether to regenerate POT files first
+        translate_untranslated (bool): Whether to AI translate untranslated entries
 
     Returns:
         dict: Job information including job_id for tracking progress
@@ -39,6 +43,7 @@ def generate_all_apps_asean_translations(force_regenerate_pot=False):
             "doctype": "Bulk Translation Job",
             "status": "Queued",
             "force_regenerate_pot": int(force_regenerate_pot),
+            "translate_untranslated": int(translate_untranslated),
             "total_apps": len(frappe.get_installed_apps()),
             "total_locales": len(SUPPORTED_ASEAN_LOCALES),
             "started_at": now_datetime()
@@ -53,7 +58,8 @@ def generate_all_apps_asean_translations(force_regenerate_pot=False):
             timeout=7200,  # 2 hours timeout
             job_name=f"bulk_translation_{job_doc.job_id}",
             translation_job_id=job_doc.job_id,
-            force_regenerate_pot=force_regenerate_pot
+            force_regenerate_pot=force_regenerate_pot,
+            translate_untranslated=translate_untranslated
         )
 
         logger.info(f"Bulk translation job {job_doc.job_id} enqueued")
@@ -72,13 +78,14 @@ def generate_all_apps_asean_translations(force_regenerate_pot=False):
         }
 
 
-def process_bulk_translation_job(translation_job_id, force_regenerate_pot=False):
+def process_bulk_translation_job(translation_job_id, force_regenerate_pot=False, translate_untranslated=False):
     """
     Background worker function for processing bulk translation job
 
     Args:
         translation_job_id (str): UUID of the Bulk Translation Job (stored in job_id field, not document name)
         force_regenerate_pot (bool): Whether to regenerate POT files first
+        translate_untranslated (bool): Whether to AI translate untranslated entries of all apps at the end
     """
     try:
         # Get job document by job_id field (not document name)
@@ -131,6 +138,14 @@ def process_bulk_translation_job(translation_job_id, force_regenerate_pot=False)
                     "asean_translations": []
                 })
 
+        ai_translation = None
+        if frappe.utils.sbool(translate_untranslated):
+            job_doc.current_app = None
+            job_doc.current_locale = ", ".join(AI_TRANSLATION_LOCALES)
+            job_doc.save()
+            frappe.db.commit()
+            ai_translation = translate_untranslated_entries(results)
+
         # Job completed - update final status
         total_apps = len(results)
         processed_apps = len([r for r in results if r["status"] == "completed"])
@@ -148,7 +163,8 @@ def process_bulk_translation_job(translation_job_id, force_regenerate_pot=False)
             "skipped_apps": skipped_apps,
             "error_apps": error_apps,
             "apps_results": results,
-            "asean_locales": SUPPORTED_ASEAN_LOCALES
+            "asean_locales": SUPPORTED_ASEAN_LOCALES,
+            "ai_translation": ai_translation
         }, indent=2)
         job_doc.save()
         frappe.db.commit()
@@ -255,6 +271,45 @@ def process_app_asean_translations(app_name, force_regenerate_pot=False):
         return app_result
 
 
+def translate_untranslated_entries(apps_results):
+    """
+    AI translate the untranslated entries of every updated PO file
+
+    All catalogs are translated together so a string shared by several apps
+    is sent to the provider once; the summary reports the calls this saved.
+    MO files of the apps that received translations are compiled again.
+
+    Args:
+        apps_results (list): Results of process_app_asean_translations()
+
+    Returns:
+        dict: Summary of translate_po_files_deduplicated()
+    """
+    from .translation import translate_po_files_deduplicated
+
+    bench_path = get_bench_path()
+    targets = {}
+    for app_result in apps_results:
+        for translation_result in app_result.get("asean_translations", []):
+            locale = translation_result["locale"]
+            if locale in AI_TRANSLATION_LOCALES and translation_result["po_updated"]:
+                po_path = os.path.join(bench_path, "apps", app_result["app"], app_result["app"], "locale", f"{locale}.po")
+                targets[po_path] = (app_result["app"], locale)
+
+    try:
+        summary = translate_po_files_deduplicated(list(targets))
+    except Exception as e:
+        logger.error(f"AI translation of bulk job failed: {str(e)}")
+        return {"success": False, "error": str(e)}
+
+    for po_path in summary.get("files_updated", []):
+        app_name, locale = targets[po_path]
+        compile_po_to_mo(app_name, locale)
+
+    logger.info(f"Bulk AI translation saved {summary.get('calls_saved', 0)} provider calls by deduplication")
+    return summary
+
+
 def get_app_pot_path(app_name):
     """Get the POT file path for an app"""
     bench_path = get_bench_path()
@@ -13,7 +13,25 @@ from frappe import _
 from frappe.utils import now
 import openai
 from .settings import get_translation_settings, get_decrypted_api_keys
-from .translation import _translate_with_openai, _translate_with_claude
+from translation_tools.utils.csv_column_stream import (
+    parse_numbered_translations,
+    source_to_translate,
+    translate_csv_stream,
+)
+from translation_tools.utils.translation_executor import DEFAULT_CONCURRENCY, TranslationExecutor
+from .common import logger
+from .translation import (
+    _translate_with_openai,
+    _translate_with_claude,
+    get_ai_client,
+    limited_create,
+    prepare_providers,
+)
+from .translation_memory import translate_with_memory
+
+# Progress of background CSV translation jobs, kept a day
+CSV_JOB_KEY = "translation_tools:csv_job:{}"
+CSV_JOB_TTL = 86400
 
 
 @frappe.whitelist()
@@ -188,13 +206,8 @@ def translate_csv_column(
         # Identify rows to translate
         rows_to_translate = []
         for idx, row in enumerate(rows):
-            source_value = row.get(source_column, '').strip()
-            target_value = row.get(target_column, '').strip()
-
-            # Skip conditions
-            if skip_empty and not source_value:
-                continue
-            if skip_existing and target_value and target_value != '-':
+            source_value = source_to_translate(row, source_column, target_column, skip_empty, skip_existing)
+            if not source_value:
                 continue
 
             rows_to_translate.append({
@@ -222,14 +235,30 @@ def translate_csv_column(
             # Extract source texts
             source_texts = [item['source'] for item in batch]
 
-            # Translate batch
-            translations = _batch_translate_csv(
-                api_key,
-                final_model,
-                final_provider,
-                source_texts,
-                direction
+            # Translate batch, texts the translation memory knows are not sent
+            def translate_missing(missing):
+                keys = list(missing)
+                texts = [missing[key][0] for key in keys]
+                try:
+                    return dict(zip(keys, _batch_translate_csv(
+                        api_key,
+                        final_model,
+                        final_provider,
+                        texts,
+                        direction
+                    )))
+                except Exception as e:
+                    frappe.log_error(f"Batch translation error: {str(e)}")
+                    return {}
+
+            translated = translate_with_memory(
+                {i: (text, None) for i, text in enumerate(source_texts)},
+                translate_missing,
+                language='en' if direction == 'th_to_en' else 'th',
+                provider=final_provider,
+                model=final_model,
             )
+            translations = [translated.get(i, '') for i in range(len(source_texts))]
 
             # Apply translations
             for item, translation in zip(batch, translations):
@@ -263,6 +292,216 @@ def translate_csv_column(
         }
 
 
+def _decode_csv_content(file_content):
+    """CSV text of base64 or raw content"""
+    try:
+        import base64
+        return base64.b64decode(file_content, validate=True).decode('utf-8')
+    except Exception:
+        return file_content
+
+
+@frappe.whitelist()
+def translate_csv_column_background(
+    source_column,
+    target_column,
+    file_url=None,
+    file_content=None,
+    direction='th_to_en',
+    model_provider='openai',
+    model=None,
+    batch_size=20,
+    concurrency=None,
+    skip_empty=True,
+    skip_existing=True
+):
+    """
+    Translate a CSV column in a background job, for files too big for one request
+
+    The CSV is read from an uploaded File (``file_url``) or from
+    ``file_content``. The job streams the rows in blocks, translates the
+    distinct new values of each block with ``concurrency`` batch requests in
+    flight and appends the rows to a private output File as it goes.
+
+    Returns:
+        dict: ``job_id`` for get_csv_translation_progress()
+    """
+    settings = get_translation_settings()
+    api_keys = get_decrypted_api_keys()
+    final_provider = model_provider or settings.get('default_model_provider', 'openai')
+    final_model = model or settings.get('default_model', 'gpt-4o-mini')
+    api_key = api_keys.get('openai_api_key' if final_provider == 'openai' else 'anthropic_api_key')
+    if not api_key:
+        return {'success': False, 'error': f'{final_provider} API key not configured'}
+
+    job_id = frappe.generate_hash(length=12)
+    if file_url:
+        file_doc = frappe.get_doc('File', {'file_url': file_url})
+        file_doc.check_permission('read')
+        input_path = file_doc.get_full_path()
+        remove_input = False
+    elif file_content:
+        input_path = frappe.get_site_path('private', 'files', f'csv_translation_{job_id}_input.csv')
+        with open(input_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(_decode_csv_content(file_content))
+        remove_input = True
+    else:
+        return {'success': False, 'error': 'No CSV file or content given'}
+
+    with open(input_path, encoding='utf-8-sig', newline='') as f:
+        fieldnames = next(csv.reader(f), [])
+    if source_column not in fieldnames:
+        if remove_input:
+            os.remove(input_path)
+        return {'success': False, 'error': f'Source column "{source_column}" not found in CSV'}
+
+    _set_csv_job_progress(job_id, {'status': 'queued', 'total_rows': None})
+    frappe.enqueue(
+        translate_csv_column_job,
+        queue='long',
+        timeout=7200,
+        # Not job_id, frappe.enqueue() takes that as the RQ job's own id
+        csv_job_id=job_id,
+        input_path=input_path,
+        remove_input=remove_input,
+        source_column=source_column,
+        target_column=target_column,
+        direction=direction,
+        provider=final_provider,
+        model=final_model,
+        batch_size=int(batch_size),
+        concurrency=concurrency,
+        skip_empty=frappe.parse_json(skip_empty),
+        skip_existing=frappe.parse_json(skip_existing),
+    )
+    logger.info(f"Queued CSV translation {job_id} of column {source_column}")
+    return {'success': True, 'job_id': job_id, 'async': True}
+
+
+def translate_csv_column_job(
+    csv_job_id,
+    input_path,
+    remove_input,
+    source_column,
+    target_column,
+    direction,
+    provider,
+    model,
+    batch_size=20,
+    concurrency=None,
+    skip_empty=True,
+    skip_existing=True
+):
+    """Background job of translate_csv_column_background()"""
+    user = frappe.session.user
+    api_keys = get_decrypted_api_keys()
+    api_key = api_keys.get('openai_api_key' if provider == 'openai' else 'anthropic_api_key')
+    # The provider requests run on worker threads without the site config
+    prepare_providers([(provider, api_key, model)])
+    language = 'en' if direction == 'th_to_en' else 'th'
+    file_name = f'csv_translation_{csv_job_id}.csv'
+    output_path = frappe.get_site_path('private', 'files', file_name)
+    file_url = f'/private/files/{file_name}'
+
+    def translate_missing(missing):
+        # Runs on the job's thread; only the provider requests use the pool
+        keys = list(missing)
+        batches = [keys[i:i + batch_size] for i in range(0, len(keys), batch_size)]
+        results = {}
+
+        def translate(batch):
+            texts = [missing[key][0] for key in batch]
+            return _batch_translate_csv(api_key, model, provider, texts, direction), 0
+
+        def apply(batch, translations):
+            results.update(zip(batch, translations))
+
+        def on_error(batch, error):
+            # Called on the job's thread, the workers cannot log to the site
+            frappe.log_error(f"CSV translation {csv_job_id}: batch of {len(batch)} failed: {str(error)}")
+
+        TranslationExecutor(
+            translate,
+            concurrency=concurrency or frappe.conf.get('translation_concurrency') or DEFAULT_CONCURRENCY,
+        ).run(batches, apply, on_error=on_error)
+        return results
+
+    def translate_texts(texts):
+        translated = translate_with_memory(
+            {text: (text, None) for text in texts},
+            translate_missing,
+            language=language,
+            provider=provider,
+            model=model,
+        )
+        # Remembered translations of each block survive a failure later on
+        frappe.db.commit()
+        return translated
+
+    def on_block(stats):
+        output.flush()
+        _set_csv_job_progress(csv_job_id, {'status': 'running', 'file_url': file_url, **stats.as_dict()})
+
+    try:
+        with open(input_path, encoding='utf-8-sig', newline='') as source, open(
+            output_path, 'w', encoding='utf-8', newline=''
+        ) as output:
+            reader = csv.DictReader(source)
+            fieldnames = list(reader.fieldnames or [])
+            if target_column not in fieldnames:
+                fieldnames.append(target_column)
+            writer = csv.DictWriter(output, fieldnames=fieldnames)
+            writer.writeheader()
+            stats = translate_csv_stream(
+                reader,
+                writer,
+                source_column,
+                target_column,
+                translate_texts,
+                skip_empty=skip_empty,
+                skip_existing=skip_existing,
+                on_block=on_block,
+            )
+
+        frappe.get_doc({
+            'doctype': 'File',
+            'file_name': file_name,
+            'file_url': file_url,
+            'is_private': 1,
+        }).insert(ignore_permissions=True)
+        frappe.db.commit()
+
+        result = {'status': 'completed', 'file_url': file_url, **stats.as_dict()}
+        logger.info(
+            f"CSV translation {csv_job_id}: {stats.translated} rows translated, "
+            f"{stats.sent} unique values sent, {stats.reused} reused"
+        )
+    except Exception as e:
+        frappe.log_error(f"CSV translation job error: {str(e)}")
+        result = {'status': 'failed', 'error': str(e)}
+    finally:
+        if remove_input and os.path.exists(input_path):
+            os.remove(input_path)
+
+    _set_csv_job_progress(csv_job_id, result)
+    frappe.publish_realtime('csv_translation_complete', {'job_id': csv_job_id, **result}, user=user)
+
+
+def _set_csv_job_progress(job_id, progress):
+    frappe.cache().set_value(
+        CSV_JOB_KEY.format(job_id), json.dumps(progress), expires_in_sec=CSV_JOB_TTL
+    )
+
+
+@frappe.whitelist()
+def get_csv_translation_progress(job_id):
+    """Progress of a background CSV translation job"""
+    progress = frappe.cache().get_value(CSV_JOB_KEY.format(job_id))
+    if not progress:
+        return {'success': False, 'error': 'Job not found or expired'}
+    return {'success': True, 'job_id': job_id, **json.loads(progress)}
+
+
 def _batch_translate_csv(api_key, model, provider, texts, direction):
     """
     Translate a batch of texts for CSV translation
@@ -275,7 +514,11 @@ def _batch_translate_csv(api_key, model, provider, texts, direction):
         direction (str): Translation direction
 
     Returns:
-        list: Translated texts
+        list: Translated texts, in the order of ``texts``
+
+    Raises:
+        ValueError: When the answer does not have exactly one numbered line
+            per text, so no translation can end up in another row
     """
     if not texts:
         return []
@@ -320,54 +563,33 @@ Do not add explanations or extra text."""
 
 {target_lang} translations (numbered list only):"""
 
-    try:
-        if provider == 'openai':
-            client = openai.OpenAI(api_key=api_key)
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {'role': 'system', 'content': system_prompt},
-                    {'role': 'user', 'content': user_prompt}
-                ],
-                temperature=0.3,
-                max_tokens=3000,
-                timeout=60
-            )
-            raw_response = response.choices[0].message.content.strip()
-        else:  # claude
-            import anthropic
-            client = anthropic.Anthropic(api_key=api_key)
-            response = client.messages.create(
-                model=model,
-                messages=[
-                    {'role': 'user', 'content': f"{system_prompt}\n\n{user_prompt}"}
-                ],
-                max_tokens=3000,
-                temperature=0.3
-            )
-            raw_response = response.content[0].text.strip()
-
-        # Parse numbered translations
-        translations = []
-        for line in raw_response.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-
-            # Remove numbering: "1. " or "1) " or "1 - "
-            import re
-            line = re.sub(r'^\d+[\.\)\-\s]+', '', line)
-            translations.append(line.strip())
-
-        # Ensure we have the right number of translations
-        while len(translations) < len(texts):
-            translations.append('')
-
-        return translations[:len(texts)]
-
-    except Exception as e:
-        frappe.log_error(f"Batch translation error: {str(e)}")
-        return [''] * len(texts)
+    if provider == 'openai':
+        client = get_ai_client('openai', api_key)
+        response = limited_create(
+            'openai', api_key, client.chat.completions.with_raw_response.create,
+            model=model,
+            messages=[
+                {'role': 'system', 'content': system_prompt},
+                {'role': 'user', 'content': user_prompt}
+            ],
+            temperature=0.3,
+            max_tokens=3000,
+        )
+        raw_response = response.choices[0].message.content.strip()
+    else:  # claude
+        client = get_ai_client('claude', api_key)
+        response = limited_create(
+            'claude', api_key, client.messages.with_raw_response.create,
+            model=model,
+            messages=[
+                {'role': 'user', 'content': f"{system_prompt}\n\n{user_prompt}"}
+            ],
+            max_tokens=3000,
+            temperature=0.3
+        )
+        raw_response = response.content[0].text.strip()
+
+    return parse_numbered_translations(raw_response, len(texts))
 
 
 def _contains_thai(text):
@@ -1,13 +1,12 @@
 import frappe
 from frappe import _
 import os
-import tempfile
 import requests
-import polib
 import re
 from urllib.parse import urlparse
 import difflib
-from .po_files import validate_file_path
+from .po_files import validate_file_path, get_po_catalog
+from translation_tools.utils.po_catalog import load_po_file, parse_po_content
 from .common import get_bench_path
 
 # Constants for performance tuning
@@ -112,7 +111,7 @@ def preview_sync(repo_url, branch, repo_files, local_file_path):
         if not os.path.exists(resolved_path):
             frappe.throw(_("Local PO file not found"))
 
-        local_po = polib.pofile(resolved_path)
+        local_po = get_po_catalog(resolved_path).po
 
         # Count totals for preview
         added = 0
@@ -139,34 +138,28 @@ def preview_sync(repo_url, branch, repo_files, local_file_path):
             if response.status_code != 200:
                 continue
 
-            with tempfile.NamedTemporaryFile(suffix=".po", delete=False) as temp_file:
-                temp_file.write(response.content)
-                temp_file_path = temp_file.name
+            # Parse the downloaded content in memory, no temp file needed
+            github_po = parse_po_content(response.content)
 
-            try:
-                github_po = polib.pofile(temp_file_path)
-
-                github_entries_total += len(github_po)
-                github_translated += len([e for e in github_po if e.msgstr])
-                github_untranslated += len([e for e in github_po if not e.msgstr])
-
-                # Check each entry for potential changes
-                for entry in github_po:
-                    if not entry.msgid or not entry.msgstr:
-                        continue
-
-                    if entry.msgid in existing_translations:
-                        if existing_translations[entry.msgid]:
-                            if existing_translations[entry.msgid] != entry.msgstr:
-                                updated += 1
-                            else:
-                                unchanged += 1
+            github_entries_total += len(github_po)
+            github_translated += len([e for e in github_po if e.msgstr])
+            github_untranslated += len([e for e in github_po if not e.msgstr])
+
+            # Check each entry for potential changes
+            for entry in github_po:
+                if not entry.msgid or not entry.msgstr:
+                    continue
+
+                if entry.msgid in existing_translations:
+                    if existing_translations[entry.msgid]:
+                        if existing_translations[entry.msgid] != entry.msgstr:
+                            updated += 1
                         else:
-                            added += 1
+                            unchanged += 1
                     else:
                         added += 1
-            finally:
-                os.unlink(temp_file_path)
+                else:
+                    added += 1
 
         return {
             "success": True,
@@ -278,7 +271,8 @@ def _apply_sync_internal(repo_url, branch, repo_files, local_file_path):
         if not os.path.exists(resolved_path):
             frappe.throw(_("Local PO file not found"))
 
-        local_po = polib.pofile(resolved_path)
+        # Private copy, the shared catalog is refreshed after the save below
+        local_po = load_po_file(resolved_path)
 
         # Create dictionary for O(1) lookup
         local_entries = {entry.msgid: entry for entry in local_po if entry.msgid}
@@ -305,73 +299,67 @@ def _apply_sync_internal(repo_url, branch, repo_files, local_file_path):
             if response.status_code != 200:
                 continue
 
-            with tempfile.NamedTemporaryFile(suffix=".po", delete=False) as temp_file:
-                temp_file.write(response.content)
-                temp_file_path = temp_file.name
+            # Parse the downloaded content in memory, no temp file needed
+            github_po = parse_po_content(response.content)
+            total_entries = len(github_po)
 
-            try:
-                github_po = polib.pofile(temp_file_path)
-                total_entries = len(github_po)
-
-                # Build index of unmatched local entries for fuzzy matching (OPTIMIZATION)
-                # Only include entries without translations as candidates
-                unmatched_local = {
-                    entry.msgid: entry
-                    for entry in local_po
-                    if entry.msgid and not entry.msgstr
-                }
-
-                for github_entry in github_po:
-                    if not github_entry.msgid or not github_entry.msgstr:
-                        continue
-
-                    processed += 1
-
-                    if github_entry.msgid in local_entries:
-                        local_entry = local_entries[github_entry.msgid]
-
-                        if local_entry.msgstr:
-                            if local_entry.msgstr != github_entry.msgstr:
-                                local_entry.msgstr = github_entry.msgstr
-                                updated += 1
-                            else:
-                                unchanged += 1
-                        else:
+            # Build index of unmatched local entries for fuzzy matching (OPTIMIZATION)
+            # Only include entries without translations as candidates
+            unmatched_local = {
+                entry.msgid: entry
+                for entry in local_po
+                if entry.msgid and not entry.msgstr
+            }
+
+            for github_entry in github_po:
+                if not github_entry.msgid or not github_entry.msgstr:
+                    continue
+
+                processed += 1
+
+                if github_entry.msgid in local_entries:
+                    local_entry = local_entries[github_entry.msgid]
+
+                    if local_entry.msgstr:
+                        if local_entry.msgstr != github_entry.msgstr:
                             local_entry.msgstr = github_entry.msgstr
-                            added += 1
-                            # Remove from unmatched since it now has translation
-                            unmatched_local.pop(github_entry.msgid, None)
+                            updated += 1
+                        else:
+                            unchanged += 1
                     else:
-                        # OPTIMIZED FUZZY MATCHING:
-                        # Only search through limited candidates, not all entries
-                        # This reduces O(n²) to O(n * k) where k is MAX_FUZZY_CANDIDATES
-                        best_match = None
-                        best_ratio = FUZZY_MATCH_THRESHOLD
-
-                        # Limit candidates for fuzzy matching
-                        candidates = list(unmatched_local.items())[:MAX_FUZZY_CANDIDATES]
-
-                        for local_msgid, local_entry in candidates:
-                            ratio = difflib.SequenceMatcher(
-                                None, local_msgid, github_entry.msgid
-                            ).ratio()
-                            if ratio > best_ratio:
-                                best_ratio = ratio
-                                best_match = local_entry
-
-                        if best_match:
-                            best_match.msgstr = github_entry.msgstr
-                            added += 1
-                            # Remove matched entry from candidates
-                            unmatched_local.pop(best_match.msgid, None)
-
-                    # Log progress for large files (every 1000 entries)
-                    if processed % 1000 == 0:
-                        frappe.logger().info(
-                            f"GitHub sync progress: {processed}/{total_entries} entries processed"
-                        )
-            finally:
-                os.unlink(temp_file_path)
+                        local_entry.msgstr = github_entry.msgstr
+                        added += 1
+                        # Remove from unmatched since it now has translation
+                        unmatched_local.pop(github_entry.msgid, None)
+                else:
+                    # OPTIMIZED FUZZY MATCHING:
+                    # Only search through limited candidates, not all entries
+                    # This reduces O(n²) to O(n * k) where k is MAX_FUZZY_CANDIDATES
+                    best_match = None
+                    best_ratio = FUZZY_MATCH_THRESHOLD
+
+                    # Limit candidates for fuzzy matching
+                    candidates = list(unmatched_local.items())[:MAX_FUZZY_CANDIDATES]
+
+                    for local_msgid, local_entry in candidates:
+                        ratio = difflib.SequenceMatcher(
+                            None, local_msgid, github_entry.msgid
+                        ).ratio()
+                        if ratio > best_ratio:
+                            best_ratio = ratio
+                            best_match = local_entry
+
+                    if best_match:
+                        best_match.msgstr = github_entry.msgstr
+                        added += 1
+                        # Remove matched entry from candidates
+                        unmatched_local.pop(best_match.msgid, None)
+
+                # Log progress for large files (every 1000 entries)
+                if processed % 1000 == 0:
+                    frappe.logger().info(
+                        f"GitHub sync progress: {processed}/{total_entries} entries processed"
+                    )
 
         # Save the updated local PO file
         local_po.save(resolved_path)
@@ -395,21 +383,12 @@ def _apply_sync_internal(repo_url, branch, repo_files, local_file_path):
 def _update_po_file_cache(resolved_path):
     """Update the PO File DocType cache after sync"""
     try:
-        from translation_tools.api.po_files import process_po_file
+        from translation_tools.api.po_files import process_po_file, sync_po_file_rows
         bench_path = get_bench_path()
 
         file_data = process_po_file(resolved_path, bench_path)
         if file_data:
-            relative_path = os.path.relpath(resolved_path, bench_path)
-            po_doc_name = relative_path
-
-            if frappe.db.exists("PO File", po_doc_name):
-                existing_doc = frappe.get_doc("PO File", po_doc_name)
-                existing_doc.translated_entries = file_data.get('translated_entries', existing_doc.translated_entries)
-                existing_doc.total_entries = file_data.get('total_entries', existing_doc.total_entries)
-                existing_doc.translation_status = file_data.get('translated_percentage', existing_doc.translation_status)
-                existing_doc.last_modified = file_data.get('last_modified', existing_doc.last_modified)
-                existing_doc.save(ignore_permissions=True)
-                frappe.db.commit()
+            sync_po_file_rows([file_data])
+            frappe.db.commit()
     except Exception as cache_error:
         frappe.logger().warning(f"Could not update database cache: {str(cache_error)}")
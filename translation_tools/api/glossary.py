@@ -7,6 +7,16 @@ from .common import logger
 
 # logger = get_json_logger(console=True)
 
+# Redis key of the glossary version, part of translation memory keys; the
+# version is also kept as a global default so it survives a cache flush
+GLOSSARY_VERSION_KEY = "translation_tools:glossary_version"
+
+# Redis key of the approved glossary, stored with the version it was read at
+GLOSSARY_TERMS_KEY = "translation_tools:glossary_terms"
+
+# Approved glossary per site: site -> (version, {source term: translation})
+_local_glossary = {}
+
 
 @frappe.whitelist()
 def update_glossary_term_categories():
@@ -274,18 +284,78 @@ def get_glossary_terms():
 
 
 def get_glossary_terms_dict():
-    """Get glossary terms as a dictionary for AI context"""
+    """
+    Get approved glossary terms as a dictionary for AI context
+
+    Served from process memory, then Redis, then the database; a copy is
+    only used while its version matches the current glossary version. The
+    returned dict is shared, callers must not modify it.
+    """
     try:
-        terms = get_glossary_terms()
-        return {
-            term.source_term: term.thai_translation for term in terms if term.is_approved
-        }
+        version = get_glossary_version()
+        local = _local_glossary.get(frappe.local.site)
+        if local and local[0] == version:
+            return local[1]
+
+        cached = frappe.cache().get_value(GLOSSARY_TERMS_KEY)
+        if cached and cached.get("version") == version:
+            terms = cached["terms"]
+        else:
+            terms = {
+                term.source_term: term.thai_translation
+                for term in frappe.get_all(
+                    "Translation Glossary Term",
+                    filters={"is_approved": 1},
+                    fields=["source_term", "thai_translation"],
+                    order_by="source_term",
+                )
+            }
+            frappe.cache().set_value(GLOSSARY_TERMS_KEY, {"version": version, "terms": terms})
+
+        _local_glossary[frappe.local.site] = (version, terms)
+        return terms
     except Exception as e:
         logger.warning(f"Failed to fetch glossary terms: {e}")
         # Return empty dict as fallback
         return {}
 
 
+def get_glossary_version():
+    """Version of the approved glossary, translations made under another version are not reused"""
+    cache = frappe.cache()
+    key = cache.make_key(GLOSSARY_VERSION_KEY)
+    # Raw commands, the version is a plain counter so it can be incremented atomically
+    version = cache.pipeline().get(key).execute()[0]
+    if version is None:
+        version = cint(frappe.db.get_global(GLOSSARY_VERSION_KEY))
+        cache.pipeline().set(key, version, nx=True).execute()
+    return cint(version)
+
+
+def bump_glossary_version():
+    """Invalidate cached glossaries and translation memory entries of older versions"""
+    get_glossary_version()
+    cache = frappe.cache()
+    version = cache.pipeline().incr(cache.make_key(GLOSSARY_VERSION_KEY)).execute()[0]
+    frappe.db.set_global(GLOSSARY_VERSION_KEY, version)
+    frappe.db.commit()
+    logger.info(f"Glossary version bumped to {version}")
+    return version
+
+
+def queue_glossary_version_bump():
+    """Bump the glossary version once the current transaction is committed"""
+    if frappe.flags.glossary_version_bump_queued:
+        return
+    frappe.flags.glossary_version_bump_queued = True
+
+    def bump():
+        frappe.flags.glossary_version_bump_queued = False
+        bump_glossary_version()
+
+    frappe.db.after_commit.add(bump)
+
+
 @frappe.whitelist()
 def add_glossary_term(term, push_to_github=False):
     """Add a new glossary term"""
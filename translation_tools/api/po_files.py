@@ -18,6 +18,18 @@ from frappe.utils.password import get_decrypted_password, get_encryption_key, en
 import frappe.utils
 from .common import get_bench_path
 from translation_tools.utils.json_logger import get_json_logger
+from translation_tools.utils.po_catalog import entry_key, get_catalog_cache, load_po_file
+from translation_tools.utils.po_file_sync import (
+    CHANGED,
+    COMPARED_FIELDS,
+    NEW,
+    PO_FILE_FIELDS,
+    TOUCHED,
+    UNCHANGED,
+    classify_rescan,
+    plan_po_file_sync,
+)
+from translation_tools.utils.po_scanner import count_po_entries
 
 # from .settings import get_github_token
 
@@ -54,7 +66,6 @@ if not logger.handlers:
 # Global flag for recursion protection
 SCAN_IN_PROGRESS = False
 MAX_SCAN_DEPTH = 10  # Prevent infinite directory recursion
-BATCH_SIZE = 50  # Number of files to process before commit
 
 
 def validate_file_path(path):
@@ -113,6 +124,53 @@ def enhanced_error_handler(func):
 # Keeping this comment to prevent re-adding duplicate handler setup
 
 
+def get_po_catalog(full_path):
+    """
+    Return the shared parsed catalog for a PO file.
+
+    The catalog is parsed once per process and reused until the file changes
+    on disk. Translations should be changed with ``catalog.set_msgstr()`` and
+    written with ``catalog.flush()``; callers that edit ``catalog.po``
+    directly must hold ``catalog.lock`` and call ``catalog.mark_saved()``
+    after saving the file.
+    """
+    cache = get_catalog_cache()
+    budget_mb = frappe.conf.get("po_catalog_cache_mb")
+    if budget_mb:
+        cache.memory_budget = int(budget_mb) * 1024 * 1024
+    return cache.get(full_path)
+
+
+def get_po_entry_counts(full_path):
+    """
+    Return entry counts of a PO file without parsing it into a catalog.
+
+    A catalog that is already cached and fresh is used as is; otherwise the
+    file is streamed through the line scanner, which is several times faster
+    than polib and does not keep the entries in memory. Used by scans and
+    stats refreshes, which only need the numbers.
+    """
+    catalog = get_catalog_cache().peek(full_path)
+    if catalog is not None:
+        with catalog.lock:
+            return catalog.stats.as_dict()
+    return count_po_entries(full_path)
+
+
+def language_from_filename(filename, default):
+    """Language code of a PO file, taken from its name (th.po -> th)"""
+    if filename.endswith(".po"):
+        return filename[:-3].split(".")[0]
+    return default
+
+
+@frappe.whitelist()
+def get_po_catalog_cache_stats():
+    """Return hit/miss/eviction counters of the parsed PO catalog cache"""
+    frappe.only_for("System Manager")
+    return get_catalog_cache().stats()
+
+
 @frappe.whitelist()
 @enhanced_error_handler
 def get_po_file_entries_paginated(
@@ -143,29 +201,10 @@ def get_po_file_entries_paginated(
         logger.error(f"File not found: {full_path}")
         return {"success": False, "error": f"File not found: {file_path}"}
 
-    # Try to safely load the PO file
+    # Try to safely load the PO file (shared parsed catalog, BOM handled by the loader)
     try:
-        # Check file encoding and handle BOM
-        with open(full_path, "rb") as f:
-            content = f.read()
-
-        # Check for and remove BOM if present
-        if content.startswith(b"\xef\xbb\xbf"):
-            logger.info(f"Removing BOM from file {file_path}")
-            content = content[3:]
-
-        # Create a temporary file without BOM
-        with tempfile.NamedTemporaryFile(delete=False) as temp:
-            temp_path = temp.name
-            temp.write(content)
-
-        try:
-            # Try to parse the cleaned file
-            po = polib.pofile(temp_path)
-        finally:
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+        catalog = get_po_catalog(full_path)
+        po = catalog.po
 
     except Exception as e:
         logger.exception(f"Error parsing PO file {file_path}: {str(e)}")
@@ -181,21 +220,22 @@ def get_po_file_entries_paginated(
     # Apply filters
     filtered_entries = []
     try:
-        for index, entry in enumerate(po):
+        # Search through the catalog's index, results come back ranked
+        if search_term and search_term.strip():
+            candidates = catalog.search(search_term)
+        elif filter_type == "untranslated":
+            candidates = catalog.untranslated_positions
+        else:
+            candidates = range(len(po))
+
+        for index in candidates:
+            entry = po[index]
             # Filter by translation status
             if filter_type == "untranslated" and entry.msgstr:
                 continue
             if filter_type == "translated" and not entry.msgstr:
                 continue
 
-            # Filter by search term
-            if (
-                search_term
-                and search_term.lower() not in entry.msgid.lower()
-                and search_term.lower() not in (entry.msgstr or "").lower()
-            ):
-                continue
-
             filtered_entries.append((index, entry))
     except Exception as e:
         logger.exception(f"Error filtering entries: {str(e)}")
@@ -225,13 +265,8 @@ def get_po_file_entries_paginated(
     formatted_entries = []
     for orig_index, entry in paginated_entries:
         try:
-            # Create a truly unique ID using the entry's original index and content
-            import hashlib
-
-            # Include original index to guarantee uniqueness
-            unique_string = f"{orig_index}-{entry.msgid}"
-
-            entry_id = hashlib.md5(unique_string.encode("utf-8")).hexdigest()
+            # Stable ID from msgctxt + msgid, resolved via the catalog index on save
+            entry_id = entry_key(entry)
 
             formatted_entries.append(
                 {
@@ -252,12 +287,13 @@ def get_po_file_entries_paginated(
 
     # Get translation stats
     try:
-        total = len(po)
-        translated = len([e for e in po if hasattr(e, "msgstr") and e.msgstr])
-        untranslated = len([e for e in po if not hasattr(e, "msgstr") or not e.msgstr])
+        catalog_stats = catalog.stats
+        total = catalog_stats.total
+        translated = catalog_stats.with_msgstr
+        untranslated = catalog_stats.without_msgstr
 
         # Calculate percentage
-        percentage = round((translated / total * 100) if total > 0 else 0, 1)
+        percentage = catalog_stats.percentage(translated)
 
         stats = {
             "total": total,
@@ -311,6 +347,45 @@ def get_po_file_entries_paginated(
     return result
 
 
+def _get_navigation_catalog(file_path):
+    """Load the catalog for the untranslated-entry navigation endpoints"""
+    # Validate path is within the bench directory
+    full_path = validate_file_path(file_path)
+
+    if not os.path.exists(full_path):
+        logger.error(f"File not found: {full_path}")
+        return None, {"success": False, "error": f"File not found: {file_path}"}
+
+    # Try to safely load the PO file (shared parsed catalog, BOM handled by the loader)
+    try:
+        return get_po_catalog(full_path), None
+    except Exception as e:
+        logger.exception(f"Error parsing PO file {file_path}: {str(e)}")
+        return None, {
+            "success": False,
+            "error": f"Error parsing PO file: {str(e)}",
+            "found": False,
+        }
+
+
+def _untranslated_entry_result(catalog, po_index, page_size):
+    """Describe the untranslated entry at po_index for the editor"""
+    entry = catalog.po[po_index]
+    return {
+        "success": True,
+        "found": True,
+        "page": math.floor(po_index / page_size) + 1,
+        "entry_id": entry_key(entry),
+        "entry_index": po_index,
+        # Number of untranslated entries before this one, for "N of M" display
+        "untranslated_index": catalog.untranslated_rank(po_index),
+        "untranslated_total": len(catalog.untranslated_positions),
+        "comments": (
+            entry.comment if hasattr(entry, "comment") else []
+        ),  # Ensure comments are properly handled
+    }
+
+
 @frappe.whitelist()
 @enhanced_error_handler
 def find_next_untranslated_entry(file_path, current_page=1, page_size=20):
@@ -325,130 +400,71 @@ def find_next_untranslated_entry(file_path, current_page=1, page_size=20):
     current_page = int(current_page)
     page_size = int(page_size)
 
-    # Validate path is within the bench directory
-    full_path = validate_file_path(file_path)
+    catalog, error = _get_navigation_catalog(file_path)
+    if error:
+        return error
 
-    print(f"full_path find_next_un {full_path}")
+    # Start searching from the next page, wrapping back to the first untranslated entry
+    po_index = catalog.next_untranslated(current_page * page_size)
+    if po_index is None:
+        po_index = catalog.next_untranslated(0)
 
-    if not os.path.exists(full_path):
-        logger.error(f"File not found: {full_path}")
-        return {"success": False, "error": f"File not found: {file_path}"}
-
-    # Try to safely load the PO file
-    try:
-        # Check file encoding and handle BOM
-        with open(full_path, "rb") as f:
-            content = f.read()
-
-        # Check for and remove BOM if present
-        if content.startswith(b"\xef\xbb\xbf"):
-            logger.info(f"Removing BOM from file {file_path}")
-            content = content[3:]
-
-        # Create a temporary file without BOM
-        with tempfile.NamedTemporaryFile(delete=False) as temp:
-            temp_path = temp.name
-            temp.write(content)
-
-        try:
-            # Try to parse the cleaned file
-            po = polib.pofile(temp_path)
-        finally:
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
-
-    except Exception as e:
-        logger.exception(f"Error parsing PO file {file_path}: {str(e)}")
-        return {
-            "success": False,
-            "error": f"Error parsing PO file: {str(e)}",
-            "found": False,
-        }
-
-    # Find all untranslated entries
-    try:
-        untranslated = []
-        for i, entry in enumerate(po):
-            if not hasattr(entry, "msgstr") or not entry.msgstr:
-                # Store both the entry and its index in the original file
-                untranslated.append((i, entry))
-    except Exception as e:
-        logger.exception(f"Error finding untranslated entries: {str(e)}")
-        return {
-            "success": False,
-            "error": f"Error finding untranslated entries: {str(e)}",
-            "found": False,
-        }
-
-    if not untranslated:
+    if po_index is None:
         logger.info("No untranslated entries found")
         return {"success": True, "found": False}
 
-    # Calculate what page each entry would be on
-    start_idx = current_page * page_size  # Start searching from the next page
+    result = _untranslated_entry_result(catalog, po_index, page_size)
+    logger.info(
+        f"Found untranslated entry on page {result['page']}, entry ID: {result['entry_id']}"
+    )
+    return result
 
-    try:
-        # Find the index of the first untranslated entry after the current page
-        for po_index, entry in untranslated:
-            if po_index >= start_idx:
-                # Calculate what page this entry is on
-                entry_page = math.floor(po_index / page_size) + 1
 
-                # Create a unique ID for the entry
-                import hashlib
+@frappe.whitelist()
+@enhanced_error_handler
+def find_previous_untranslated_entry(file_path, current_index=0, page_size=20):
+    """
+    Find the last untranslated entry before current_index, wrapping around to
+    the last untranslated entry of the file
+    """
+    current_index = int(current_index)
+    page_size = int(page_size)
 
-                unique_string = f"{po_index}-{entry.msgid}"
-                entry_id = hashlib.md5(unique_string.encode("utf-8")).hexdigest()
+    catalog, error = _get_navigation_catalog(file_path)
+    if error:
+        return error
 
-                logger.info(
-                    f"Found untranslated entry on page {entry_page}, entry ID: {entry_id}"
-                )
-                return {
-                    "success": True,
-                    "found": True,
-                    "page": entry_page,
-                    "entry_id": entry_id,
-                    "entry_index": po_index,
-                    "comments": (
-                        entry.comment if hasattr(entry, "comment") else []
-                    ),  # Ensure comments are properly handled
-                }
+    po_index = catalog.previous_untranslated(current_index)
+    if po_index is None:
+        po_index = catalog.previous_untranslated(len(catalog))
 
-        # If we reach here, we found untranslated entries, but they're on earlier pages
-        # In this case, start from the beginning
-        po_index, entry = untranslated[0]
-        entry_page = math.floor(po_index / page_size) + 1
+    if po_index is None:
+        return {"success": True, "found": False}
 
-        # Create a unique ID for the entry
-        import hashlib
+    return _untranslated_entry_result(catalog, po_index, page_size)
 
-        unique_string = f"{po_index}-{entry.msgid}"
-        entry_id = hashlib.md5(unique_string.encode("utf-8")).hexdigest()
 
-        # entry_id = hashlib.md5(entry.msgid.encode("utf-8")).hexdigest()[:16]
+@frappe.whitelist()
+@enhanced_error_handler
+def get_nth_untranslated_entry(file_path, n=1, page_size=20):
+    """Jump to the n-th (1-based) untranslated entry of a PO file"""
+    n = int(n)
+    page_size = int(page_size)
 
-        logger.info(
-            f"Wrapping back to first untranslated entry on page {entry_page}, entry ID: {entry_id}"
-        )
+    catalog, error = _get_navigation_catalog(file_path)
+    if error:
+        return error
+
+    po_index = catalog.nth_untranslated(n - 1)
+    if po_index is None:
         return {
             "success": True,
-            "found": True,
-            "page": entry_page,
-            "entry_id": entry_id,
-            "entry_index": po_index,
-            "comments": (
-                entry.comment if hasattr(entry, "comment") else []
-            ),  # Ensure comments are properly handled
-        }
-    except Exception as e:
-        logger.exception(f"Error determining next untranslated entry: {str(e)}")
-        return {
-            "success": False,
-            "error": f"Error determining next untranslated entry: {str(e)}",
             "found": False,
+            "untranslated_total": len(catalog.untranslated_positions),
         }
 
+    return _untranslated_entry_result(catalog, po_index, page_size)
+
 
 @frappe.whitelist()
 @enhanced_error_handler
@@ -533,6 +549,7 @@ def scan_and_cache_po_files(filename_patterns=None):
     """Scan filesystem for PO files and cache the results"""
 
     po_files = []
+    rows = []
     bench_path = get_bench_path()
     apps_path = os.path.join(bench_path, "apps")
 
@@ -560,17 +577,17 @@ def scan_and_cache_po_files(filename_patterns=None):
                         try:
                             po_data = parse_po_file(file_path)
 
-                            # Create or update cache entry
-                            update_po_file_cache(
-                                rel_path,
-                                app,
-                                file,
-                                po_data["language"],
-                                po_data["total_entries"],
-                                po_data["translated_entries"],
-                                po_data["translation_status"],
+                            rows.append(
+                                {
+                                    "file_path": rel_path,
+                                    "app_name": app,
+                                    "filename": file,
+                                    "language": po_data["language"],
+                                    "total_entries": po_data["total_entries"],
+                                    "translated_entries": po_data["translated_entries"],
+                                    "translation_status": po_data["translation_status"],
+                                }
                             )
-
                             po_files.append(
                                 {
                                     "file_path": rel_path,
@@ -591,6 +608,9 @@ def scan_and_cache_po_files(filename_patterns=None):
                         except Exception as e:
                             logger.error(f"Error processing {file_path}: {str(e)}")
 
+    # Create or update all cache entries at once
+    sync_po_file_rows(rows)
+
     logger.debug(f"Scanned and found {len(po_files)} PO files")
     return po_files
 
@@ -605,86 +625,187 @@ def update_po_file_cache(
     translation_status,
 ):
     """Create or update a PO file cache entry"""
-    try:
-        existing = frappe.db.exists("PO File", {"file_path": file_path})
+    sync_po_file_rows(
+        [
+            {
+                "file_path": file_path,
+                "app_name": app_name,
+                "filename": filename,
+                "language": language,
+                "total_entries": total_entries,
+                "translated_entries": translated_entries,
+                "translation_status": translation_status,
+            }
+        ]
+    )
 
-        if existing:
-            frappe.db.set_value(
-                "PO File",
-                existing,
-                {
-                    "total_entries": total_entries,
-                    "translated_entries": translated_entries,
-                    "translation_status": translation_status,
-                    "last_scanned": datetime.now(),
-                },
-            )
+
+def get_po_file_records(names):
+    """Fetch the PO File records to diff scanned rows against, in one query"""
+    if not names:
+        return []
+    return frappe.get_all(
+        "PO File",
+        filters={"name": ["in", list(names)]},
+        fields=["name", *COMPARED_FIELDS],
+    )
+
+
+def sync_po_file_rows(rows, existing=None):
+    """
+    Write scanned PO file rows to the PO File doctype in bulk.
+
+    Existing records are read in one query and diffed against the rows, new
+    files are inserted and changed ones updated with set-based SQL. Unchanged
+    records only get their last_scanned time bumped. The caller commits.
+
+    Args:
+        rows (list): Dicts with the PO_FILE_FIELDS of each scanned file
+        existing (list): Records from get_po_file_records(), when the caller
+            already fetched them
+
+    Returns:
+        dict: Counts of new, updated and unchanged files
+    """
+    if existing is None:
+        existing = get_po_file_records({row["file_path"] for row in rows})
+    inserts, updates, unchanged = plan_po_file_sync(rows, existing)
+
+    now = frappe.utils.now_datetime()
+    user = frappe.session.user
+
+    if inserts:
+        # INSERT IGNORE, so a record created concurrently is left alone
+        frappe.db.bulk_insert(
+            "PO File",
+            fields=[
+                "name", "owner", "modified_by", "creation", "modified",
+                *PO_FILE_FIELDS, "last_scanned",
+            ],
+            values=[
+                [
+                    row["file_path"], user, user, now, now,
+                    *(row.get(field) for field in PO_FILE_FIELDS), now,
+                ]
+                for row in inserts
+            ],
+            ignore_duplicates=True,
+        )
+
+    if updates:
+        frappe.db.bulk_update(
+            "PO File",
+            {name: {**changes, "last_scanned": now} for name, changes in updates.items()},
+            modified=now,
+            modified_by=user,
+        )
+
+    if unchanged:
+        frappe.db.set_value(
+            "PO File",
+            {"name": ["in", unchanged]},
+            "last_scanned",
+            now,
+            update_modified=False,
+        )
+
+    return {
+        "new_files": len(inserts),
+        "updated_files": len(updates),
+        "unchanged_files": len(unchanged),
+    }
+
+
+def rescan_po_files(file_paths, bench_path, dry_run=False, force=False, import_memory=False):
+    """
+    Refresh PO File records for files whose content changed.
+
+    Every file is stat'ed; files whose size or mtime changed are hashed, and
+    only files whose hash changed (or that are new) have their entries
+    counted. Files that were only touched get their fingerprint updated.
+
+    Args:
+        file_paths (list): Full paths of the PO files
+        bench_path (str): Bench root, record names are relative to it
+        dry_run (bool): Only report what would be reparsed, write nothing
+        force (bool): Reparse every file regardless of its fingerprint
+        import_memory (bool): Queue a translation memory import of the new
+            and changed files; only for explicit scans, not for listings
+            that refresh the stats after an editor save
+
+    Returns:
+        dict: Relative paths per outcome (new, changed, touched, unchanged,
+        failed), the share of files that needed parsing and, unless dry_run,
+        the sync_po_file_rows() counts
+    """
+    rel_paths = {path: os.path.relpath(path, bench_path) for path in file_paths}
+    existing = get_po_file_records(set(rel_paths.values()))
+    records = {record["name"]: record for record in existing}
+
+    files = {NEW: [], CHANGED: [], TOUCHED: [], UNCHANGED: [], "failed": []}
+    rows = []
+    for path, rel_path in rel_paths.items():
+        try:
+            state, fingerprint = classify_rescan(path, records.get(rel_path), force)
+        except OSError as e:
+            logger.warning(f"Could not read {path}: {e}")
+            files["failed"].append(rel_path)
+            continue
+
+        if dry_run or state == UNCHANGED:
+            files[state].append(rel_path)
+            continue
+
+        if state == TOUCHED:
+            row = {
+                "file_path": rel_path,
+                "last_modified": datetime.fromtimestamp(
+                    int(fingerprint["file_mtime_ns"]) / 1e9
+                ).strftime("%Y-%m-%d %H:%M:%S"),
+                **fingerprint,
+            }
         else:
-            doc = frappe.get_doc(
-                {
-                    "doctype": "PO File",
-                    "file_path": file_path,
-                    "app_name": app_name,
-                    "filename": filename,
-                    "language": language,
-                    "total_entries": total_entries,
-                    "translated_entries": translated_entries,
-                    "translation_status": translation_status,
-                    "last_scanned": datetime.now(),
-                }
-            )
-            doc.insert(ignore_permissions=True, ignore_if_duplicate=True)
-    except frappe.DuplicateEntryError:
-        # Race condition - another process inserted the record, update it instead
-        logger.debug(f"Duplicate entry detected for {file_path}, updating instead")
-        existing = frappe.db.exists("PO File", {"file_path": file_path})
-        if existing:
-            frappe.db.set_value(
-                "PO File",
-                existing,
-                {
-                    "total_entries": total_entries,
-                    "translated_entries": translated_entries,
-                    "translation_status": translation_status,
-                    "last_scanned": datetime.now(),
-                },
-            )
-    except Exception as e:
-        # Handle any other duplicate errors from MySQL
-        if "Duplicate entry" in str(e) or "1062" in str(e):
-            logger.debug(f"MySQL duplicate entry for {file_path}, updating instead")
-            existing = frappe.db.exists("PO File", {"file_path": file_path})
-            if existing:
-                frappe.db.set_value(
-                    "PO File",
-                    existing,
-                    {
-                        "total_entries": total_entries,
-                        "translated_entries": translated_entries,
-                        "translation_status": translation_status,
-                        "last_scanned": datetime.now(),
-                    },
+            file_data = process_po_file(path, bench_path)
+            if not file_data:
+                files["failed"].append(rel_path)
+                continue
+            row = {**file_data, **fingerprint}
+        files[state].append(rel_path)
+        rows.append(row)
+
+    checked = len(rel_paths) - len(files["failed"])
+    reparsed = len(files[NEW]) + len(files[CHANGED])
+    result = {
+        "dry_run": dry_run,
+        "files": files,
+        "reparse_rate": round(reparsed / checked * 100, 1) if checked else 0,
+    }
+    if not dry_run and rows:
+        result.update(sync_po_file_rows(rows, existing))
+
+    if import_memory and not dry_run:
+        # Reuse the translations of new and changed files
+        from .translation_memory import populate_from_po_file
+
+        for path, rel_path in rel_paths.items():
+            if rel_path in files[NEW] or rel_path in files[CHANGED]:
+                frappe.enqueue(
+                    populate_from_po_file,
+                    queue="long",
+                    file_path=path,
+                    enqueue_after_commit=True,
                 )
-        else:
-            # Re-raise if it's not a duplicate error
-            raise
+    return result
 
 
 def parse_po_file(file_path):
-    """Parse a PO file and return statistics"""
-    import polib
-
-    po = polib.pofile(file_path)
-    total = len(po)
-    translated = len(po.translated_entries())
+    """Count the entries of a PO file and return statistics"""
+    counts = get_po_entry_counts(file_path)
+    total = counts["total"]
+    translated = counts["translated"]
 
     # Get language from filename (more reliable than metadata)
-    filename = os.path.basename(file_path)
-    if filename.endswith('.po'):
-        language_parts = filename[:-3].split('.')  # Remove .po extension and split
-        language = language_parts[0]  # First part is the language code (e.g., 'th' from 'th.po')
-    else:
-        language = po.metadata.get("Language", "unknown")
+    language = language_from_filename(os.path.basename(file_path), "unknown")
 
     # Calculate translation status percentage
     translation_status = 0
@@ -704,73 +825,37 @@ def parse_po_file(file_path):
 def get_cached_po_files():
     """Get a list of all PO files from the database with automatic stale detection"""
     logger.info("Fetching cached PO files from database")
+    fields = [
+        "name",
+        "file_path",
+        "app_name as app",
+        "filename",
+        "language",
+        "total_entries",
+        "translated_entries",
+        "translation_status as translated_percentage",
+        "last_modified",
+        "last_scanned",
+    ]
     try:
-        po_files = frappe.get_all(
-            "PO File",
-            fields=[
-                "name",
-                "file_path",
-                "app_name as app",
-                "filename",
-                "language",
-                "total_entries",
-                "translated_entries",
-                "translation_status as translated_percentage",
-                "last_modified",
-                "last_scanned",
-            ],
-            order_by="app_name, filename",
-        )
-        
-        # Check for stale files and auto-refresh them
+        po_files = frappe.get_all("PO File", fields=fields, order_by="app_name, filename")
+
+        # Refresh the stats of files whose content changed since the last scan
         bench_path = get_bench_path()
-        stale_files = []
-        refreshed_count = 0
-        
-        for po_file in po_files:
-            try:
-                # Build full path
-                full_path = os.path.join(bench_path, po_file.file_path)
-                
-                if os.path.exists(full_path):
-                    # Check if file is newer than last scan
-                    file_modified = datetime.fromtimestamp(os.path.getmtime(full_path))
-                    last_scanned = po_file.last_scanned
-                    
-                    if isinstance(last_scanned, str):
-                        last_scanned = datetime.fromisoformat(last_scanned.replace('Z', '+00:00'))
-                    
-                    # If file is newer than last scan, refresh its stats
-                    if file_modified > last_scanned:
-                        logger.info(f"Auto-refreshing stale file: {po_file.file_path}")
-                        fresh_stats = parse_po_file(full_path)
-                        
-                        # Update database record
-                        frappe.db.set_value("PO File", po_file.name, {
-                            "total_entries": fresh_stats["total_entries"],
-                            "translated_entries": fresh_stats["translated_entries"],
-                            "translation_status": fresh_stats["translation_status"],
-                            "last_scanned": frappe.utils.now_datetime()
-                        })
-                        
-                        # Update the returned data too
-                        po_file.total_entries = fresh_stats["total_entries"]
-                        po_file.translated_entries = fresh_stats["translated_entries"]
-                        po_file.translated_percentage = fresh_stats["translation_status"]
-                        
-                        refreshed_count += 1
-                        stale_files.append(po_file.file_path)
-            except Exception as e:
-                logger.warning(f"Error checking file {po_file.file_path}: {str(e)}")
-                continue
-        
-        if refreshed_count > 0:
+        full_paths = [os.path.join(bench_path, po_file.file_path) for po_file in po_files]
+        rescan = rescan_po_files(
+            [path for path in full_paths if os.path.exists(path)], bench_path
+        )
+        stale_files = rescan["files"][CHANGED] + rescan["files"][TOUCHED]
+
+        if stale_files:
             frappe.db.commit()
-            logger.info(f"Auto-refreshed {refreshed_count} stale PO files: {stale_files}")
-        
+            logger.info(f"Auto-refreshed {len(stale_files)} stale PO files: {stale_files}")
+            po_files = frappe.get_all("PO File", fields=fields, order_by="app_name, filename")
+
         logger.debug(f"Found {len(po_files)} cached PO files")
         return po_files
-        
+
     except Exception as e:
         logger.error(f"Error fetching cached PO files: {str(e)}", exc_info=True)
         raise
@@ -802,17 +887,13 @@ def process_po_file(file_path, bench_path):
             "%Y-%m-%d %H:%M:%S"
         )
 
-        # Parse PO file
-        po = polib.pofile(file_path)
-        total = len(po)
-        translated = len(po.translated_entries())
+        # Count entries, a scan does not need the parsed catalog
+        counts = get_po_entry_counts(file_path)
+        total = counts["total"]
+        translated = counts["translated"]
         translation_status = int((translated / total) * 100) if total > 0 else 0
         # Extract language from filename (more reliable than metadata)
-        if filename.endswith('.po'):
-            language_parts = filename[:-3].split('.')  # Remove .po extension and split
-            language = language_parts[0]  # First part is the language code
-        else:
-            language = po.metadata.get("Language", "th")
+        language = language_from_filename(filename, "th")
 
         return {
             "app_name": app_name,
@@ -832,8 +913,14 @@ def process_po_file(file_path, bench_path):
 
 @frappe.whitelist()
 @enhanced_error_handler
-def scan_po_files():
-    """Scan the filesystem for PO files in site-specific installed apps and update the database"""
+def scan_po_files(dry_run=False):
+    """
+    Scan the filesystem for PO files in site-specific installed apps and update the database
+
+    Args:
+        dry_run (bool): Report which files would be reparsed without writing anything
+    """
+    dry_run = frappe.utils.sbool(dry_run)
     global SCAN_IN_PROGRESS
     if SCAN_IN_PROGRESS:
         logger.warning("Recursion detected in scan_po_files")
@@ -850,8 +937,6 @@ def scan_po_files():
     installed_apps = frappe.get_installed_apps()
     
     logger.info(f"Starting scan for PO files on site '{site}' - installed apps: {installed_apps}")
-    print(f"🔍 SCANNING PO FILES - Site: {site}")
-    print(f"📱 Apps to scan ({len(installed_apps)}): {', '.join(installed_apps)}")
 
     try:
         # Get the bench path
@@ -867,6 +952,7 @@ def scan_po_files():
             "total_files": 0,
             "new_files": 0,
             "updated_files": 0,
+            "unchanged_files": 0,
             "failed_files": 0,
         }
 
@@ -891,121 +977,31 @@ def scan_po_files():
                 matching_files.append(th_po_path)
         logger.info(f"Found {len(matching_files)} PO files to process")
 
-        # Process files in batches
-        for i, file_path in enumerate(matching_files):
-            if "translation_tools/translations" in file_path:
-                continue
-
-            stats["total_files"] += 1
-            logger.debug(f"Processing file {i + 1}/{len(matching_files)}: {file_path}")
-
-            file_data = process_po_file(file_path, bench_path)
-            if not file_data:
-                stats["failed_files"] += 1
-                continue
+        # Only files whose content changed since the last scan are parsed
+        files = [path for path in matching_files if "translation_tools/translations" not in path]
+        stats["total_files"] = len(files)
+        rescan = rescan_po_files(files, bench_path, dry_run=dry_run, import_memory=True)
+        stats.update(
+            new_files=len(rescan["files"][NEW]),
+            updated_files=len(rescan["files"][CHANGED]) + len(rescan["files"][TOUCHED]),
+            unchanged_files=len(rescan["files"][UNCHANGED]),
+            failed_files=len(rescan["files"]["failed"]),
+            reparse_rate=rescan["reparse_rate"],
+        )
+        if dry_run:
+            logger.info(f"Scan dry run: {rescan['reparse_rate']}% of files would be reparsed")
+            return {"success": True, "dry_run": True, "files": rescan["files"], **stats}
 
-            # Bulletproof duplicate handling to prevent SQL IntegrityError
-            print(f"🔍 Processing PO file [{i+1}/{len(matching_files)}]: {file_path}")
-            try:
-                file_data.update({"doctype": "PO File"})
-                
-                # Method 1: Check if document already exists by name (primary key)
-                # Use the relative path from file_data as the document name, not the absolute file_path
-                po_doc_name = file_data["file_path"]  # This is the relative path that serves as the primary key
-                print(f"   📋 Checking if exists in database: {po_doc_name}")
-                
-                if frappe.db.exists("PO File", po_doc_name):
-                    print(f"   ✅ FOUND - Document exists in database")
-                    # Document exists - check if we should update it
-                    try:
-                        existing_doc = frappe.get_doc("PO File", po_doc_name)
-                        print(f"   📊 Comparing: DB({existing_doc.translated_entries}/{existing_doc.total_entries}) vs File({file_data.get('translated_entries')}/{file_data.get('total_entries')})")
-                        
-                        # Update if file is newer or stats are different
-                        should_update = (
-                            file_data.get("last_modified") != existing_doc.last_modified or
-                            file_data.get("translated_entries") != existing_doc.translated_entries or
-                            file_data.get("total_entries") != existing_doc.total_entries
-                        )
-                        
-                        if should_update:
-                            print(f"   🔄 UPDATING - Changes detected, updating existing document")
-                            # Update existing document
-                            for key, value in file_data.items():
-                                if key != "doctype" and hasattr(existing_doc, key):
-                                    setattr(existing_doc, key, value)
-                            
-                            existing_doc.save(ignore_permissions=True, ignore_validate=True)
-                            stats["updated_files"] += 1
-                            logger.info(f"🔄 Updated existing th.po in database: {file_path}")
-                            print(f"   ✅ UPDATE SUCCESS - Document updated in database")
-                        else:
-                            stats["updated_files"] += 1
-                            logger.debug(f"⏭️ Skipping - th.po unchanged in database: {file_path}")
-                            print(f"   ⏭️ SKIPPING - No changes detected")
-                            
-                    except Exception as update_error:
-                        print(f"   ❌ UPDATE FAILED - Error: {str(update_error)}")
-                        logger.warning(f"⚠️ Could not update existing th.po {file_path}: {str(update_error)}")
-                        stats["failed_files"] += 1
-                else:
-                    print(f"   🆕 NEW - Document doesn't exist, creating new record")
-                    # Document doesn't exist - try to create it with duplicate protection
-                    try:
-                        new_doc = frappe.get_doc(file_data)
-                        new_doc.insert(ignore_permissions=True, ignore_if_duplicate=True)
-                        stats["new_files"] += 1
-                        logger.info(f"✅ Added new th.po to database: {file_path}")
-                        print(f"   ✅ INSERT SUCCESS - New document created in database")
-                        
-                    except frappe.DuplicateEntryError:
-                        print(f"   ⚠️ RACE CONDITION - Duplicate entry detected during insert (another process got there first)")
-                        # Handle race condition where another process inserted between our check and insert
-                        logger.info(f"⚠️ Duplicate entry detected during insert (race condition) - skipping: {file_path}")
-                        stats["updated_files"] += 1
-                        
-                    except Exception as insert_error:
-                        # Check if it's a duplicate error we can handle
-                        if "Duplicate entry" in str(insert_error) or "1062" in str(insert_error):
-                            print(f"   ⚠️ SQL DUPLICATE ERROR - MySQL error 1062 (race condition): {str(insert_error)}")
-                            logger.info(f"⚠️ SQL duplicate entry error (race condition) - skipping: {file_path}")
-                            stats["updated_files"] += 1
-                        else:
-                            print(f"   ❌ INSERT FAILED - Unexpected error: {str(insert_error)}")
-                            logger.error(f"❌ Failed to add th.po to database: {file_path} - {str(insert_error)}")
-                            stats["failed_files"] += 1
-                            
-            except Exception as e:
-                print(f"   💥 CRITICAL ERROR - Exception during processing: {str(e)}")
-                logger.error(f"❌ Critical error processing th.po file: {file_path} - {str(e)}")
-                stats["failed_files"] += 1
-
-            # Commit every BATCH_SIZE files to avoid long transactions
-            # Commit periodically to avoid long transactions
-            if i > 0 and i % BATCH_SIZE == 0:
-                frappe.db.commit()
-                logger.info(f"Committed {BATCH_SIZE} files to the database")
-                logger.debug(f"Committed {i} files so far")
-
-        frappe.db.commit()  # Final commit
+        frappe.db.commit()
         logger.info(
             f"Scan completed: {stats['total_files']} total, "
             f"{stats['new_files']} new, {stats['updated_files']} updated, "
-            f"{stats['failed_files']} failed"
+            f"{stats['unchanged_files']} unchanged, {stats['failed_files']} failed"
         )
-        print(f"🏁 SCAN COMPLETED - Summary:")
-        print(f"   📊 Total files processed: {stats['total_files']}")
-        print(f"   🆕 New files added: {stats['new_files']}")
-        print(f"   🔄 Files updated: {stats['updated_files']}")
-        print(f"   ❌ Files failed: {stats['failed_files']}")
-        print(f"✅ SCAN SUCCESS - All files processed without SQL errors!")
         return {"success": True, **stats}
 
     except Exception as e:
         logger.exception("Critical error during scan")
-        print(f"💥 SCAN FAILED - Critical error occurred:")
-        print(f"   ❌ Error: {str(e)}")
-        print(f"   🔄 Database rollback performed")
         frappe.db.rollback()
         return {
             "success": False,
@@ -1037,7 +1033,8 @@ def get_po_file_entries(file_path):
 
     try:
         logger.info(f"Reading PO file entries: {resolved_path}")
-        po = polib.pofile(resolved_path)
+        catalog = get_po_catalog(resolved_path)
+        po = catalog.po
 
         # Get file metadata
         metadata = {
@@ -1065,8 +1062,8 @@ def get_po_file_entries(file_path):
             )
 
         # Calculate statistics
-        total = len(po)
-        translated = len(po.translated_entries())
+        total = catalog.stats.total
+        translated = catalog.stats.translated
 
         logger.debug(f"Returning {len(entries)} entries from {file_path}")
 
@@ -1091,24 +1088,25 @@ def get_po_file_entries(file_path):
 def get_po_file_contents(file_path, limit=100, offset=0):
     """Get paginated entries from a PO file"""
 
-    validate_file_path(file_path)
+    resolved_path = validate_file_path(file_path)
 
-    if not os.path.exists(file_path):
-        logger.error(f"File not found: {file_path}")
+    if not os.path.exists(resolved_path):
+        logger.error(f"File not found: {resolved_path}")
         frappe.throw(_("File not found: {0}").format(file_path))
 
     try:
-        logger.info(f"Reading PO file contents: {file_path}")
+        logger.info(f"Reading PO file contents: {resolved_path}")
         # Load the PO file
-        po = polib.pofile(file_path)
+        catalog = get_po_catalog(resolved_path)
+        po = catalog.po
 
         # Extract metadata
         metadata = po.metadata
 
         # Calculate statistics
-        total = len(po)
-        translated = len(po.translated_entries())
-        fuzzy = len(po.fuzzy_entries())
+        total = catalog.stats.total
+        translated = catalog.stats.translated
+        fuzzy = catalog.stats.fuzzy
         untranslated = total - translated - fuzzy
 
         # Process entries with pagination
@@ -1193,81 +1191,41 @@ def save_translation(file_path, entry_id, translation, push_to_github=False, msg
 
     try:
         logger.info(f"Saving translation for entry {entry_id} in {resolved_path}")
-        # Load the PO file
-        po = polib.pofile(resolved_path)
-
-        # Find the entry - handle both numeric indices and hash IDs
-        entry = None
-        orig_index = None
-
-        # Find the entry by ID (index)
-        # index = int(entry_id)
-
-        # if index < 0 or index >= len(po):
-        #     logger.warning(f"Entry ID out of range: {index}")
-        #     frappe.log_error(f"Invalid entry ID: {entry_id}")
-        #     frappe.throw(_("Invalid entry ID"))
-
-        # Update translation
-        # entry = po[index]
-
-        for index, potential_entry in enumerate(po):
-            # Match the hash generation from get_po_file_entries_paginated
-            unique_string = f"{index}-{potential_entry.msgid}"
-            current_hash = hashlib.md5(unique_string.encode("utf-8")).hexdigest()
-
-            if current_hash == entry_id:
-                entry = potential_entry
-                orig_index = index
-                logger.info(f"Found entry by hash at index {index}")
-                break
-
-        # Fallback: If hash lookup failed, try msgid-based lookup
-        # This handles cases where the PO file was modified (index shifted)
-        if entry is None and msgid:
-            logger.warning(f"Entry with hash ID {entry_id} not found, trying msgid fallback with provided msgid...")
-
-            # Use the msgid provided by frontend for reliable lookup
-            for index, potential_entry in enumerate(po):
-                if potential_entry.msgid == msgid:
-                    entry = potential_entry
-                    orig_index = index
-                    logger.info(f"Found entry by exact msgid match at index {index} (fallback)")
-                    break
-
-        # Second fallback: try msgid-only hash if msgid wasn't provided
-        if entry is None:
-            logger.warning(f"Entry with hash ID {entry_id} not found, trying msgid hash fallback...")
-
-            for index, potential_entry in enumerate(po):
-                # Try matching just by msgid hash (without index)
-                msgid_only_hash = hashlib.md5(potential_entry.msgid.encode("utf-8")).hexdigest()
-
-                if msgid_only_hash == entry_id:
-                    entry = potential_entry
-                    orig_index = index
-                    logger.info(f"Found entry by msgid-only hash at index {index} (fallback)")
-                    break
-
-        if entry is None:
-            logger.warning(f"Entry with ID {entry_id} not found even with fallback. msgid provided: {bool(msgid)}")
-            frappe.throw(_("Entry not found. The file may have been modified. Please refresh the page and try again."))
-
-        # Check if this is a new translation (i.e., previously untranslated)
-        was_untranslated = entry is not None and not entry.msgstr
-
-        # Update the translation
-        if entry is not None:
-            entry.msgstr = translation
-        else:
-            logger.warning(f"Entry is None for entry_id: {entry_id}")
-            frappe.throw(_("Invalid entry ID or entry not found"))
+        # Load the PO file (shared with the editor through the catalog cache)
+        catalog = get_po_catalog(resolved_path)
+        po = catalog.po
+
+        # Hold the catalog lock so concurrent saves do not interleave edits
+        with catalog.lock:
+            # Find the entry by its stable ID, falling back to the msgid
+            # sent by the frontend in case the ID came from an older page load
+            orig_index, entry = catalog.find_entry(entry_id, msgid)
+
+            if entry is None:
+                logger.warning(f"Entry with ID {entry_id} not found. msgid provided: {bool(msgid)}")
+                frappe.throw(_("Entry not found. The file may have been modified. Please refresh the page and try again."))
+
+            # Check if this is a new translation (i.e., previously untranslated)
+            was_untranslated = entry is not None and not entry.msgstr
+
+            # Update the translation
+            if entry is not None:
+                catalog.set_msgstr(entry, translation)
+            else:
+                logger.warning(f"Entry is None for entry_id: {entry_id}")
+                frappe.throw(_("Invalid entry ID or entry not found"))
+
+            # Update metadata
+            po.metadata["PO-Revision-Date"] = datetime.now().strftime("%Y-%m-%d %H:%M%z")
 
-        # Update metadata
-        po.metadata["PO-Revision-Date"] = datetime.now().strftime("%Y-%m-%d %H:%M%z")
+            # Patch the changed msgstr into the file instead of rewriting it
+            try:
+                catalog.flush()
+            except Exception:
+                # The in-memory catalog no longer matches the file
+                get_catalog_cache().invalidate(resolved_path)
+                raise
 
-        # Save the file
-        po.save(resolved_path)
         logger.info(
             f"Successfully saved translation for entry {entry_id} (index {orig_index}) to local file"
         )
@@ -1984,7 +1942,6 @@ def save_translations(file_path, translations):
     resolved_path = validate_file_path(file_path)
 
     logger.info(f"resolved_path: {resolved_path}")
-    print(f"resolved_path ${resolved_path}")
 
     if not os.path.exists(resolved_path) or not file_path.endswith(".po"):
         logger.error(f"Invalid PO file path: {resolved_path}")
@@ -1994,32 +1951,30 @@ def save_translations(file_path, translations):
         logger.info(f"Saving translations to {resolved_path}")
 
         # Load the PO file
-        po = polib.pofile(resolved_path)
+        catalog = get_po_catalog(resolved_path)
+        po = catalog.po
         updated_count = 0
 
-        # Update entries
-        for translation in translations:
-            msgid = translation.get("msgid")
-            msgstr = translation.get("msgstr")
-
-            print(f"msgid: {msgid}")
-            print(f"msgstr: {msgstr}")
+        with catalog.lock:
+            # Update entries
+            for translation in translations:
+                msgid = translation.get("msgid")
+                msgstr = translation.get("msgstr")
 
-            if not msgid or not msgstr:
-                continue
+                if not msgid or not msgstr:
+                    continue
 
-            # Find corresponding entry
-            for entry in po:
-                if entry.msgid == msgid:
-                    entry.msgstr = msgstr
+                # Find corresponding entry
+                _index, entry = catalog.find_entry(None, msgid)
+                if entry is not None:
+                    catalog.set_msgstr(entry, msgstr)
                     updated_count += 1
-                    break
 
-        # Update metadata
-        po.metadata["PO-Revision-Date"] = datetime.now().strftime("%Y-%m-%d %H:%M%z")
+            # Update metadata
+            po.metadata["PO-Revision-Date"] = datetime.now().strftime("%Y-%m-%d %H:%M%z")
 
-        # Save the file
-        po.save(resolved_path)
+            # Write all changed entries in a single patch
+            catalog.flush()
 
         logger.info(f"Successfully saved {updated_count} translations")
         return {"success": True, "message": f"Updated {updated_count} translations"}
@@ -2318,36 +2273,30 @@ def force_refresh_po_stats():
     try:
         # Get all cached PO files
         po_files = frappe.get_all("PO File", fields=["name", "file_path"])
-        
-        updated_count = 0
+
+        full_paths = []
         failed_count = 0
-        
         for po_file in po_files:
             try:
-                # Get fresh stats from filesystem
                 full_path = validate_file_path(po_file.file_path)
-                if os.path.exists(full_path):
-                    fresh_stats = parse_po_file(full_path)
-                    
-                    # Update database record
-                    frappe.db.set_value("PO File", po_file.name, {
-                        "total_entries": fresh_stats["total_entries"],
-                        "translated_entries": fresh_stats["translated_entries"],
-                        "translation_status": fresh_stats["translation_status"],
-                        "last_scanned": frappe.utils.now_datetime()
-                    })
-                    updated_count += 1
-                else:
-                    # File doesn't exist, mark as failed
-                    failed_count += 1
-                    logger.warning(f"PO file not found: {po_file.file_path}")
-                    
             except Exception as e:
                 logger.error(f"Error updating {po_file.file_path}: {str(e)}")
                 failed_count += 1
-        
+                continue
+            if os.path.exists(full_path):
+                full_paths.append(full_path)
+            else:
+                # File doesn't exist, mark as failed
+                failed_count += 1
+                logger.warning(f"PO file not found: {po_file.file_path}")
+
+        # Reparse every file regardless of its fingerprint
+        rescan = rescan_po_files(full_paths, get_bench_path(), force=True, import_memory=True)
+        updated_count = len(rescan["files"][CHANGED])
+        failed_count += len(rescan["files"]["failed"])
+
         frappe.db.commit()
-        
+
         return {
             "success": True,
             "message": f"Force refreshed statistics for {updated_count} PO files",
@@ -2369,51 +2318,24 @@ def auto_refresh_stale_po_files():
         logger.info("Starting scheduled auto-refresh of stale PO files")
         
         # Get all cached PO files
-        po_files = frappe.get_all(
-            "PO File",
-            fields=["name", "file_path", "last_scanned"],
-        )
-        
+        po_files = frappe.get_all("PO File", fields=["file_path"])
+
         bench_path = get_bench_path()
-        refreshed_count = 0
-        
-        for po_file in po_files:
-            try:
-                full_path = os.path.join(bench_path, po_file.file_path)
-                
-                if os.path.exists(full_path):
-                    # Check if file is newer than last scan
-                    file_modified = datetime.fromtimestamp(os.path.getmtime(full_path))
-                    last_scanned = po_file.last_scanned
-                    
-                    if isinstance(last_scanned, str):
-                        last_scanned = datetime.fromisoformat(last_scanned.replace('Z', '+00:00'))
-                    
-                    # If file is newer than last scan (with 5 minute buffer to avoid constant updates)
-                    time_diff = (file_modified - last_scanned).total_seconds()
-                    if time_diff > 300:  # 5 minutes buffer
-                        logger.info(f"Scheduled refresh of stale file: {po_file.file_path}")
-                        fresh_stats = parse_po_file(full_path)
-                        
-                        # Update database record
-                        frappe.db.set_value("PO File", po_file.name, {
-                            "total_entries": fresh_stats["total_entries"],
-                            "translated_entries": fresh_stats["translated_entries"],
-                            "translation_status": fresh_stats["translation_status"],
-                            "last_scanned": frappe.utils.now_datetime()
-                        })
-                        
-                        refreshed_count += 1
-            except Exception as e:
-                logger.warning(f"Error in scheduled refresh for {po_file.file_path}: {str(e)}")
-                continue
-        
+        full_paths = [os.path.join(bench_path, po_file.file_path) for po_file in po_files]
+        rescan = rescan_po_files(
+            [path for path in full_paths if os.path.exists(path)], bench_path
+        )
+        refreshed_count = len(rescan["files"][CHANGED]) + len(rescan["files"][TOUCHED])
+
         if refreshed_count > 0:
             frappe.db.commit()
-            logger.info(f"Scheduled auto-refresh completed: {refreshed_count} files updated")
+            logger.info(
+                f"Scheduled auto-refresh completed: {refreshed_count} files updated, "
+                f"{len(rescan['files'][CHANGED])} reparsed"
+            )
         else:
             logger.debug("Scheduled auto-refresh: No stale files found")
-            
+
     except Exception as e:
         logger.error(f"Error in scheduled auto-refresh: {str(e)}")
 
@@ -2475,7 +2397,7 @@ def repair_po_file(file_path):
 
             # Verify if the file is now valid
             try:
-                po = polib.pofile(resolved_path)
+                po = load_po_file(resolved_path)
                 return {
                     "success": True,
                     "message": "PO file repaired successfully",
@@ -2504,7 +2426,7 @@ def repair_po_file(file_path):
 
                     # Verify if valid
                     try:
-                        po = polib.pofile(resolved_path)
+                        po = load_po_file(resolved_path)
                         return {
                             "success": True,
                             "message": f"PO file encoding converted from {encoding} to UTF-8",
@@ -5,6 +5,7 @@ from frappe import _
 from frappe.utils import cint, flt
 from frappe.utils.password import get_decrypted_password, get_encryption_key, encrypt
 from .common import logger, CONFIG_FILE, get_bench_path
+from translation_tools.utils.stub_provider import STUB_API_KEY, get_active_stub
 import configparser
 import requests
 
@@ -123,6 +124,10 @@ def get_decrypted_api_keys():
     """Internal function to get decrypted API keys - DO NOT expose as @frappe.whitelist()"""
     # This function is for internal server-side use only, never exposed to web API
     settings_doctype = "Translation Tools Settings"
+
+    # Real keys are never handed out while the offline stub provider is enabled
+    if get_active_stub():
+        return {"openai_api_key": STUB_API_KEY, "anthropic_api_key": STUB_API_KEY, "github_token": ""}
     
     if not frappe.db.exists(settings_doctype):
         return {"openai_api_key": "", "anthropic_api_key": "", "github_token": ""}
@@ -2,6 +2,7 @@ import hashlib
 import json
 import logging
 import os
+import queue
 import random
 import re
 import subprocess
@@ -14,12 +15,59 @@ import frappe
 import openai
 import polib
 from frappe import _
-from frappe.utils import now
+from frappe.utils import cint, flt, now
 
 from translation_tools.utils.thai_glossary import GLOSSARY
+from translation_tools.utils.translation_batching import (
+    CHUNK_RESPONSE_SCHEMA,
+    CHUNK_TOOL_NAME,
+    DEFAULT_TOKEN_BUDGET,
+    RETRY_MAX_ITEMS,
+    ChunkStreamParser,
+    ParseStats,
+    check_translation,
+    failure_rate,
+    chunk_payload,
+    estimate_tokens,
+    pack_chunks,
+    select_glossary_terms,
+    validate_chunk_response,
+)
+from translation_tools.utils.circuit_breaker import (
+    DEFAULT_FAILURE_THRESHOLD,
+    DEFAULT_OPEN_SECONDS,
+    DEFAULT_SLOW_CALL_SECONDS,
+    STATE_TTL as CIRCUIT_STATE_TTL,
+    call_with_failover,
+    get_circuit_breaker,
+)
+from translation_tools.utils.po_catalog import entry_key
+from translation_tools.utils.prompt_cache import (
+    PromptUsage,
+    anthropic_system,
+    record_usage,
+    variable_message,
+)
+from translation_tools.utils.provider_clients import (
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_TIMEOUT,
+    get_provider_client,
+)
+from translation_tools.utils.rate_limiter import (
+    DEFAULT_RPM,
+    DEFAULT_TPM,
+    RedisStateStore,
+    get_rate_limiter,
+)
+from translation_tools.utils.stub_provider import get_active_stub
+from translation_tools.utils.translation_dedup import plan_deduplicated_translation
+from translation_tools.utils.translation_journal import TranslationJournal
+from translation_tools.utils.translation_executor import DEFAULT_CONCURRENCY, TranslationExecutor
 
 from .common import _get_translation_config, get_bench_path, logger
-from .glossary import get_glossary_terms_dict
+from .glossary import get_glossary_terms_dict, get_glossary_version
+from .po_files import get_po_catalog, language_from_filename
+from .translation_memory import lookup_translations, remember_translations, translate_with_memory
 from .settings import get_translation_settings, get_decrypted_api_keys
 
 
@@ -28,6 +76,19 @@ MAX_RETRIES = 3
 RETRY_BASE_DELAY = 2  # seconds
 RETRY_MAX_DELAY = 30  # seconds
 
+# Output token limit of a multi-entry request
+BATCH_MAX_OUTPUT_TOKENS = 8000
+
+# Models used when work fails over to the other provider and its model is not set
+FAILOVER_MODELS = {
+    "openai": "gpt-4.1-mini-2025-04-14",
+    "claude": "claude-3-haiku-20240307",
+}
+
+# Seconds a background job waits for a provider to come back when no other
+# provider is available
+DEFAULT_FAILOVER_MAX_WAIT = 600
+
 # Exceptions that should trigger retry
 RETRYABLE_OPENAI_ERRORS = (
     openai.APIConnectionError,
@@ -43,6 +104,15 @@ RETRYABLE_ANTHROPIC_ERRORS = (
     anthropic.InternalServerError,
 )
 
+# Exceptions that count against a provider's circuit breaker; timeouts are
+# connection errors in both SDKs
+PROVIDER_FAILURE_ERRORS = (
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    anthropic.APIConnectionError,
+    anthropic.InternalServerError,
+)
+
 
 def retry_with_backoff(func, max_retries=MAX_RETRIES, retryable_errors=None):
     """
@@ -89,6 +159,173 @@ def retry_with_backoff(func, max_retries=MAX_RETRIES, retryable_errors=None):
     raise RuntimeError("Retry loop completed without success or exception")
 
 
+# Provider options read from the site config by prepare_providers(), used when
+# a client, limiter or breaker is first needed on a worker thread without a site
+_prepared_options = {}
+
+
+def get_provider_options():
+    """
+    Options of the provider clients, rate limiters and circuit breakers
+
+    Reads the site config and connects to Redis, so call it on the main thread.
+    """
+    options = {
+        "client": {
+            "timeout": cint(frappe.conf.get("ai_request_timeout")) or DEFAULT_TIMEOUT,
+            "max_connections": cint(frappe.conf.get("ai_max_connections")) or DEFAULT_MAX_CONNECTIONS,
+        },
+        "limiter": {
+            "logger": logger,
+            "default_rpm": cint(frappe.conf.get("ai_rate_limit_rpm")) or DEFAULT_RPM,
+            "default_tpm": cint(frappe.conf.get("ai_rate_limit_tpm")) or DEFAULT_TPM,
+        },
+        "breaker": {
+            "logger": logger,
+            "failure_threshold": cint(frappe.conf.get("ai_circuit_failure_threshold"))
+            or DEFAULT_FAILURE_THRESHOLD,
+            "slow_call_seconds": flt(frappe.conf.get("ai_circuit_slow_call_seconds"))
+            or DEFAULT_SLOW_CALL_SECONDS,
+            "open_seconds": flt(frappe.conf.get("ai_circuit_open_seconds")) or DEFAULT_OPEN_SECONDS,
+        },
+    }
+    # Stubbed runs must not touch the budgets and breakers of the real providers
+    if not get_active_stub():
+        try:
+            options["limiter"]["store"] = RedisStateStore(frappe.cache())
+            options["breaker"]["store"] = RedisStateStore(frappe.cache(), ttl=CIRCUIT_STATE_TTL)
+        except Exception as e:
+            logger.warning(f"Rate limits and circuit breakers without Redis, tracked per process: {e}")
+    return options
+
+
+def _configure(kind):
+    """Return a configure() callable of the provider registries"""
+
+    def configure():
+        try:
+            return get_provider_options()[kind]
+        except Exception:
+            # A worker thread has no site, use the options read before it started
+            if kind not in _prepared_options:
+                logger.warning(f"AI provider {kind} created without site config, using defaults")
+            return dict(_prepared_options.get(kind, {}))
+
+    return configure
+
+
+def prepare_providers(targets):
+    """
+    Create the clients, rate limiters and circuit breakers of the targets
+
+    Each is built from the site config the first time it is used, which must
+    not happen on a TranslationExecutor worker thread where frappe.conf is
+    not bound; call it on the main thread before starting one.
+
+    Args:
+        targets (list): (provider, api_key, model) tuples, see get_failover_targets()
+    """
+    _prepared_options.update(get_provider_options())
+    for provider, api_key, model in targets:
+        get_ai_client(provider, api_key)
+        get_provider_limiter(provider, model, api_key)
+        get_provider_breaker(provider)
+    return targets
+
+
+def get_ai_client(provider, api_key):
+    """
+    Pooled SDK client of a provider and API key, see utils/provider_clients.py
+
+    While a stub provider is enabled (utils/stub_provider.py), its client
+    is returned instead.
+    """
+    stub = get_active_stub()
+    if stub:
+        return stub.client(provider)
+    return get_provider_client(provider, api_key, _configure("client"))
+
+
+def get_provider_limiter(provider, model, api_key):
+    """Shared rate limiter of a provider/model/API key, see utils/rate_limiter.py"""
+    return get_rate_limiter(provider, model, api_key, _configure("limiter"))
+
+
+def get_provider_breaker(provider):
+    """Shared circuit breaker of a provider, see utils/circuit_breaker.py"""
+    if get_active_stub():
+        # A stub's injected errors must not open the real providers' breakers
+        provider = "stub:" + ("claude" if provider in ("claude", "anthropic") else provider)
+    return get_circuit_breaker(provider, _configure("breaker"))
+
+
+def get_failover_targets(provider, api_key, model):
+    """
+    Return the (provider, api_key, model) targets of a job in order of preference
+
+    The requested provider comes first, then the other configured provider
+    unless the ``ai_failover`` site config is 0. Reads the settings, so call
+    it on the main thread.
+    """
+    targets = [(provider, api_key, model)]
+    if not cint(frappe.conf.get("ai_failover", 1)):
+        return targets
+
+    other = "openai" if provider in ("claude", "anthropic") else "claude"
+    try:
+        other_key = get_decrypted_api_keys().get(
+            "openai_api_key" if other == "openai" else "anthropic_api_key"
+        )
+        other_model = frappe.db.get_single_value(
+            "Translation Tools Settings", "openai_model" if other == "openai" else "anthropic_model"
+        )
+    except Exception as e:
+        logger.warning(f"No failover provider: {e}")
+        return targets
+
+    if other_key:
+        targets.append((other, other_key, other_model or FAILOVER_MODELS[other]))
+    return targets
+
+
+def get_failover_max_wait():
+    """Seconds a background job pauses for an unavailable provider"""
+    value = frappe.conf.get("ai_failover_max_wait")
+    return DEFAULT_FAILOVER_MAX_WAIT if value is None else flt(value)
+
+
+def limited_create(provider, api_key, create, /, **kwargs):
+    """
+    Send an SDK request through the shared rate limiter of its provider/model/key
+
+    Raises ProviderUnavailable without sending anything while the provider's
+    circuit breaker is open.
+
+    Args:
+        create: The SDK's ``with_raw_response.create`` method
+        kwargs: Request arguments; the estimated token use is the prompt size
+            plus max_tokens
+
+    Returns:
+        The parsed SDK response
+    """
+    prompt = str(kwargs.get("system") or "") + "".join(
+        str(message.get("content") or "") for message in kwargs.get("messages", [])
+    )
+    breaker = get_provider_breaker(provider)
+
+    def send(**request):
+        # Only the request itself is timed, not the wait for the rate limiter
+        return breaker.call(lambda: create(**request), failure_errors=PROVIDER_FAILURE_ERRORS)
+
+    return get_provider_limiter(provider, kwargs.get("model"), api_key).call(
+        send,
+        estimate_tokens(prompt) + (kwargs.get("max_tokens") or 0),
+        throttle_errors=(openai.RateLimitError, anthropic.RateLimitError),
+        **kwargs,
+    )
+
+
 @frappe.whitelist()
 def translate_text(
     text,
@@ -232,16 +469,11 @@ def translate_single_entry(file_path, entry_id, model_provider="openai", model=N
 
     try:
         # Load the PO file
-        po = polib.pofile(full_path)
+        catalog = get_po_catalog(full_path)
+        po = catalog.po
 
-        # Find the entry by ID (hash)
-        entry = None
-        for index, potential_entry in enumerate(po):
-            unique_string = f"{index}-{potential_entry.msgid}"
-            current_hash = hashlib.md5(unique_string.encode("utf-8")).hexdigest()
-            if current_hash == entry_id:
-                entry = potential_entry
-                break
+        # Find the entry by its stable ID
+        _index, entry = catalog.find_entry(entry_id)
 
         if entry is None:
             frappe.throw(_("Entry not found"))
@@ -263,21 +495,16 @@ def translate_single_entry(file_path, entry_id, model_provider="openai", model=N
             else:
                 model = settings.get("default_model", "claude-3-haiku-20240307")
 
-        # Get API keys
-        api_key = None
+        # Get API keys, the settings only hold masked values
+        api_keys = get_decrypted_api_keys()
         if provider == "openai":
-            api_key = settings.get("openai_api_key")
+            api_key = api_keys.get("openai_api_key")
         else:
-            api_key = settings.get("anthropic_api_key")
+            api_key = api_keys.get("anthropic_api_key")
 
         if not api_key:
             frappe.throw(_("API key not configured for {0}").format(provider))
 
-        print(f"source_text {source_text}")
-        print(f"provider {provider}")
-        print(f"model {model}")
-        # print(f"temperature {settings.get("temperature")}")
-
         # Get translation
         translation = call_ai_translation_api(
             source_text=source_text,
@@ -285,20 +512,22 @@ def translate_single_entry(file_path, entry_id, model_provider="openai", model=N
             model=model,
             api_key=api_key,
             temperature=settings.get("temperature", 0.3),
+            context=entry.msgctxt,
         )
 
         logger.info(f"Translation result: {translation}")
 
         # Automatically save if enabled
         if settings.get("auto_save"):
-            # Update the translation
-            entry.msgstr = translation  # type: ignore
+            with catalog.lock:
+                # Update the translation
+                catalog.set_msgstr(entry, translation)
 
-            # Update metadata
-            po.metadata["PO-Revision-Date"] = time.strftime("%Y-%m-%d %H:%M%z")
+                # Update metadata
+                po.metadata["PO-Revision-Date"] = time.strftime("%Y-%m-%d %H:%M%z")
 
-            # Save the file
-            po.save(full_path)
+                # Save the file
+                catalog.flush()
 
             # Clear cache
             global PO_FILES_CACHE
@@ -345,10 +574,30 @@ def translate_single_entry(file_path, entry_id, model_provider="openai", model=N
         file_handler.close()
 
 
+def resolve_po_path(file_path):
+    """Absolute path of a PO file given absolute or relative to the bench, not the cwd"""
+    if not os.path.isabs(file_path):
+        file_path = os.path.join(get_bench_path(), file_path)
+    return os.path.normpath(file_path)
+
+
+def translation_journal_path(file_path):
+    """Path of the journal of a PO file's AI translation job"""
+    digest = hashlib.sha1(resolve_po_path(file_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(get_bench_path(), "logs", "translation_journal", f"{digest}.jsonl")
+
+
 @frappe.whitelist()
-def translate_po_file(file_path, model_provider="openai", model=None):
-    """Translate an entire PO file using AI"""
-    if not os.path.exists(file_path):
+def translate_po_file(file_path, model_provider="openai", model=None, concurrency=None):
+    """
+    Translate an entire PO file using AI
+
+    ``concurrency`` is the number of provider requests kept in flight,
+    defaulting to the ``translation_concurrency`` site config. Progress is
+    journaled, so a run that was interrupted resumes where it stopped.
+    """
+    full_path = resolve_po_path(file_path)
+    if not os.path.exists(full_path):
         frappe.throw(_("File not found: {0}").format(file_path))
 
     # Create a log file
@@ -364,11 +613,13 @@ def translate_po_file(file_path, model_provider="openai", model=None):
     logger.addHandler(file_handler)
     logger.setLevel(logging.DEBUG)
 
+    journal = None
     try:
         logger.info(f"Starting translation of {file_path}")
 
         # Load the PO file
-        po = polib.pofile(file_path)
+        catalog = get_po_catalog(full_path)
+        po = catalog.po
 
         # Get settings
         settings = get_translation_settings()
@@ -383,12 +634,12 @@ def translate_po_file(file_path, model_provider="openai", model=None):
             else:
                 model = settings.get("default_model", "claude-3-haiku")
 
-        # Get API keys
-        api_key = None
+        # Get API keys, the settings only hold masked values
+        api_keys = get_decrypted_api_keys()
         if provider == "openai":
-            api_key = settings.get("openai_api_key")
+            api_key = api_keys.get("openai_api_key")
         else:
-            api_key = settings.get("anthropic_api_key")
+            api_key = api_keys.get("anthropic_api_key")
 
         if not api_key:
             frappe.throw(_("API key not configured for {0}").format(provider))
@@ -396,45 +647,134 @@ def translate_po_file(file_path, model_provider="openai", model=None):
         # Get entries to translate
         entries_to_translate = [entry for entry in po if not entry.msgstr]
         total_entries = len(entries_to_translate)
-        translated_count = 0
 
         logger.info(f"Found {total_entries} entries to translate")
 
-        # Batch size from settings
-        batch_size = settings.get("batch_size", 10)
-
-        # Process in batches
-        for i in range(0, total_entries, batch_size):
-            batch = entries_to_translate[i : i + batch_size]
+        new_translations = []
+        applied_keys = []
+
+        # An interrupted run left translations it received but never saved
+        # in its journal; apply them instead of paying for them again
+        journal = TranslationJournal(translation_journal_path(file_path))
+        previous = journal.replay()
+        resumed = previous.started_at is not None and not previous.finished
+        if resumed:
+            by_key = {entry_key(entry): entry for entry in entries_to_translate}
+            for key, translation in previous.pending.items():
+                entry = by_key.get(key)
+                if entry is not None and not entry.msgstr:
+                    catalog.set_msgstr(entry, translation)
+                    new_translations.append((entry.msgid, entry.msgctxt, translation))
+                    applied_keys.append(key)
+            entries_to_translate = [entry for entry in entries_to_translate if not entry.msgstr]
+            total_entries = previous.total or total_entries
             logger.info(
-                f"Processing batch {i//batch_size + 1}, entries {i+1}-{min(i+batch_size, total_entries)}"
+                f"Resuming translation: {len(applied_keys)} entries recovered from the journal, "
+                f"{len(entries_to_translate)} left"
             )
+        recovered = len(applied_keys)
+        journal.start(total_entries, provider, model, resumed=resumed)
 
-            # Translate each entry in the batch
-            for entry in batch:
-                try:
-                    translation = call_ai_translation_api(
-                        source_text=entry.msgid,
-                        provider=provider,
-                        model=model,
-                        api_key=api_key,
-                        temperature=settings.get("temperature", 0.3),
-                    )
-
-                    entry.msgstr = translation  # type: ignore
-                    translated_count += 1
-                    logger.info(f"Translated: '{entry.msgid}' → '{translation}'")
-                except Exception as e:
-                    logger.error(f"Error translating entry: {e}")
+        # Worker threads have no database access, load the glossary once here
+        try:
+            glossary_terms = get_glossary_terms_dict()
+        except Exception as glossary_error:
+            logger.warning(f"Failed to load glossary for translate_po_file: {glossary_error}")
+            glossary_terms = {}
 
-            # Save progress after each batch
-            po.metadata["PO-Revision-Date"] = time.strftime("%Y-%m-%d %H:%M%z")
-            po.save(file_path)
-            logger.info(f"Saved progress after batch {i//batch_size + 1}")
+        temperature = settings.get("temperature", 0.3)
+
+        # While a provider's circuit breaker is open, work goes to the other
+        # configured provider, or waits for it to come back
+        targets = prepare_providers(get_failover_targets(provider, api_key, model))
+        max_wait = get_failover_max_wait()
+        prompt_usage = PromptUsage()
+
+        def translate(entry):
+            key = entry_key(entry)
+            journal.sent(key)
+            usage = {}
+            translation = call_with_failover(
+                lambda target: call_ai_translation_api(
+                    source_text=entry.msgid,
+                    provider=target[0],
+                    model=target[2],
+                    api_key=target[1],
+                    temperature=temperature,
+                    glossary_terms=glossary_terms,
+                    usage=usage,
+                    memory=False,
+                ),
+                targets,
+                max_wait=max_wait,
+            )
+            if usage:
+                prompt_usage.add(usage)
+            if translation:
+                journal.received(key, translation, usage.get("tokens", 0))
+            return translation, usage.get("tokens", 0)
+
+        # Strings translated before (in any app) come from the translation memory
+        language = language_from_filename(os.path.basename(file_path), "th")
+        glossary_version = get_glossary_version()
+        remembered = lookup_translations(
+            {i: (entry.msgid, entry.msgctxt) for i, entry in enumerate(entries_to_translate)},
+            language,
+            glossary_version,
+        )
+        for i, translation in remembered.items():
+            entry = entries_to_translate[i]
+            catalog.set_msgstr(entry, translation)
+            # Journaled like model results, so an interrupted run can resume them
+            journal.received(entry_key(entry), translation)
+            applied_keys.append(entry_key(entry))
+        entries_to_translate = [
+            entry for i, entry in enumerate(entries_to_translate) if i not in remembered
+        ]
+        logger.info(f"Translation memory served {len(remembered)} entries")
+
+        def apply(entry, translation):
+            catalog.set_msgstr(entry, translation)
+            new_translations.append((entry.msgid, entry.msgctxt, translation))
+            applied_keys.append(entry_key(entry))
+            logger.info(f"Translated: '{entry.msgid}' → '{translation}'")
+
+        def on_error(entry, error):
+            logger.error(f"Error translating entry '{entry.msgid[:50]}': {error}")
+
+        def checkpoint(stats):
+            # Save progress, patching only the new translations
+            with catalog.lock:
+                po.metadata["PO-Revision-Date"] = time.strftime("%Y-%m-%d %H:%M%z")
+                catalog.flush()
+            journal.applied(applied_keys)
+            applied_keys.clear()
+            remember_translations(
+                new_translations,
+                language,
+                provider=provider,
+                model=model,
+                glossary_version=glossary_version,
+            )
+            new_translations.clear()
+            frappe.db.commit()
+            logger.info(
+                f"Saved progress: {stats.translated}/{total_entries} entries, "
+                f"{stats.entries_per_sec} entries/s, {stats.tokens_per_sec} tokens/s"
+            )
 
-            # Sleep between batches to avoid rate limiting
-            if i + batch_size < total_entries:
-                time.sleep(2)
+        # Keep several provider requests in flight, results are applied in order
+        executor = TranslationExecutor(
+            translate,
+            concurrency=concurrency
+            or frappe.conf.get("translation_concurrency")
+            or DEFAULT_CONCURRENCY,
+            checkpoint_every=settings.get("batch_size", 10),
+            on_checkpoint=checkpoint,
+        )
+        run_stats = executor.run(entries_to_translate, apply, on_error=on_error)
+        translated_count = run_stats.translated + len(remembered) + recovered
+        journal.finish({**run_stats.as_dict(), "prompt_usage": prompt_usage.as_dict()})
 
         # Update PO File record in database
         if frappe.db.exists("PO File", {"file_path": file_path}):
@@ -448,7 +788,7 @@ def translate_po_file(file_path, model_provider="openai", model=None):
             if hasattr(file_doc, "translated_entries"):
                 if hasattr(file_doc, "translated_entries"):
                     if hasattr(file_doc, "translated_entries"):
-                        file_doc.translated_entries = len([entry for entry in po if entry.msgstr])  # type: ignore
+                        file_doc.translated_entries = catalog.stats.with_msgstr  # type: ignore
                     else:
                         logger.warning(
                             "The 'translated_entries' attribute does not exist in the 'PO File' doctype."
@@ -481,17 +821,26 @@ def translate_po_file(file_path, model_provider="openai", model=None):
             file_doc.modified = now()
             file_doc.save()
 
-        logger.info(f"Translation completed. Translated {translated_count} entries.")
+        logger.info(
+            f"Translation completed. Translated {translated_count} entries "
+            f"({run_stats.failed} failed) at {run_stats.entries_per_sec} entries/s, "
+            f"{run_stats.tokens_per_sec} tokens/s, "
+            f"{prompt_usage.as_dict()['cache_hit_ratio']:.0%} of input tokens from the prompt cache."
+        )
 
         return {
             "success": True,
             "translated_count": translated_count,
+            "throughput": run_stats.as_dict(),
+            "prompt_usage": prompt_usage.as_dict(),
             "log_file": log_file,
         }
     except Exception as e:
         logger.error(f"Error during translation: {e}")
         return {"success": False, "error": str(e), "log_file": log_file}
     finally:
+        if journal is not None:
+            journal.close()
         # Remove file handler
         logger.removeHandler(file_handler)
         file_handler.close()
@@ -508,7 +857,7 @@ def start_translation(
     if not frappe.has_permission("Translation Tools", "write"):
         frappe.throw(_("You do not have permission to use the translation tools"))
 
-    if not os.path.exists(po_file_path):
+    if not os.path.exists(resolve_po_path(po_file_path)):
         frappe.throw(_("PO file not found: {0}").format(po_file_path))
 
     # Get the API key from configuration
@@ -554,6 +903,15 @@ def translate_po_file_background(
         raise
 
 
+@frappe.whitelist()
+def get_translation_job_progress(file_path):
+    """Progress of the last AI translation job of a PO file, read from its journal"""
+    state = TranslationJournal(translation_journal_path(file_path)).replay()
+    if state.started_at is None:
+        return {"success": False, "error": "No translation job found for this file"}
+    return {"success": True, **state.as_dict()}
+
+
 @frappe.whitelist()
 def translate_batch(file_path, indices):
     """Translate multiple entries in a batch"""
@@ -575,27 +933,33 @@ def translate_batch(file_path, indices):
         )
 
         # Get the entries to translate
-        po = polib.pofile(file_path)
-        entries_to_translate = {}
-        for idx in indices:
-            if idx < len(po):
-                entries_to_translate[idx] = po[idx].msgid
-
-        # Use the appropriate translation service for batch
-        if model_provider == "claude":
-            translations = _batch_translate_with_claude(
-                api_key, model, entries_to_translate
-            )
-        else:
-            translations = _batch_translate_with_openai(
-                api_key, model, entries_to_translate
-            )
+        catalog = get_po_catalog(file_path)
+        po = catalog.po
+        with catalog.lock:
+            entries_to_translate = {
+                idx: (po[idx].msgid, po[idx].msgctxt) for idx in indices if idx < len(po)
+            }
 
-        # Update the PO file with translations
-        for idx, translation in translations.items():
-            po[idx].msgstr = translation
+        def translate_missing(missing):
+            # Use the appropriate translation service for batch
+            texts = {idx: msgid for idx, (msgid, _) in missing.items()}
+            if model_provider == "claude":
+                return _batch_translate_with_claude(api_key, model, texts)
+            return _batch_translate_with_openai(api_key, model, texts)
+
+        translations = translate_with_memory(
+            entries_to_translate,
+            translate_missing,
+            language=language_from_filename(os.path.basename(file_path), "th"),
+            provider=model_provider,
+            model=model,
+        )
 
-        po.save()
+        # Update the PO file with translations, in a single patch
+        with catalog.lock:
+            for idx, translation in translations.items():
+                catalog.set_msgstr(po[idx], translation)
+            catalog.flush()
 
         logger.info(f"Batch translation successful for {len(translations)} entries")
         return {"success": True, "translations": translations}
@@ -664,11 +1028,27 @@ def translate_entry(file_path, msgid, entry_id):
         logger.info(f"Translating single entry with {model_provider} ({model})")
         logger.info(f"Text to translate: {msgid}")
 
-        # Use the appropriate translation service with timeout handling
-        if model_provider == "claude":
-            translation = _translate_with_claude(api_key, model, msgid)
-        else:
-            translation = _translate_with_openai(api_key, model, msgid)
+        catalog = get_po_catalog(full_path)
+        with catalog.lock:
+            _index, entry = catalog.find_entry(entry_id, msgid)
+            if entry is None:
+                return {"error": "Entry not found"}
+            msgctxt = entry.msgctxt
+
+        # Use the appropriate translation service with timeout handling,
+        # unless the translation memory already has the text
+        def translate_missing(missing):
+            if model_provider == "claude":
+                return {0: _translate_with_claude(api_key, model, msgid)}
+            return {0: _translate_with_openai(api_key, model, msgid)}
+
+        translation = translate_with_memory(
+            {0: (msgid, msgctxt)},
+            translate_missing,
+            language=language_from_filename(os.path.basename(file_path), "th"),
+            provider=model_provider,
+            model=model,
+        ).get(0)
             
         logger.info(f"Translation result: {translation}")
         logger.info(f"Translation result repr: {repr(translation)}")
@@ -676,19 +1056,12 @@ def translate_entry(file_path, msgid, entry_id):
 
         if translation:
             # Update the PO file
-            po = polib.pofile(full_path)
-            entry_found = False
-            for i, entry in enumerate(po):
-                unique_string = f"{i}-{entry.msgid}"
-                current_hash = hashlib.md5(unique_string.encode("utf-8")).hexdigest()
-                if current_hash == entry_id:
-                    entry.msgstr = translation
-                    entry_found = True
-                    break
-            if entry_found:
-                po.save(full_path)
-            else:
-                return {"error": "Entry not found"}
+            with catalog.lock:
+                _index, entry = catalog.find_entry(entry_id, msgid)
+                if entry is None:
+                    return {"error": "Entry not found"}
+                catalog.set_msgstr(entry, translation)
+                catalog.flush()
 
             logger.info("Single entry translation successful")
             # Log the final translation being returned
@@ -923,61 +1296,76 @@ def analyze_logs(logs):
     return analysis
 
 
-def call_ai_translation_api(source_text, provider, model, api_key, temperature=0.3):
-    """Call the AI translation API"""
-    if provider == "openai":
-        import openai
+def call_ai_translation_api(
+    source_text,
+    provider,
+    model,
+    api_key,
+    temperature=0.3,
+    glossary_terms=None,
+    usage=None,
+    context=None,
+    memory=True,
+):
+    """
+    Call the AI translation API
+
+    The translation memory is consulted first and AI results are added to
+    it, unless ``memory`` is False. Worker threads have no database access:
+    they must pass ``memory=False`` and the ``glossary_terms``. Token usage
+    of the call is added to the ``usage`` dict under "tokens" when one is
+    given.
+    """
+    if not memory:
+        return _call_ai_provider(source_text, provider, model, api_key, temperature, glossary_terms, usage)
+
+    return translate_with_memory(
+        {0: (source_text, context)},
+        lambda missing: {
+            0: _call_ai_provider(
+                source_text, provider, model, api_key, temperature, glossary_terms, usage
+            )
+        },
+        provider=provider,
+        model=model,
+    ).get(0)
+
 
-        client = openai.OpenAI(api_key=api_key)
+def _call_ai_provider(
+    source_text, provider, model, api_key, temperature=0.3, glossary_terms=None, usage=None
+):
+    """Send a single text to the AI provider"""
+    if provider == "openai":
+        client = get_ai_client("openai", api_key)
 
         # Prepare glossary context with timeout protection
         try:
-            glossary_terms = get_glossary_terms_dict()
-            logger.info(f"Loaded glossary terms: {len(glossary_terms)} terms")
-            logger.info(f"Glossary terms: {list(glossary_terms.keys())[:10]}")  # First 10 terms
-            glossary_context = ""
-            if glossary_terms:
-                glossary_context = "Use these specific term translations:\n" + json.dumps(
-                    glossary_terms, indent=2
-                )
-            else:
+            if glossary_terms is None:
+                glossary_terms = get_glossary_terms_dict()
+            if not glossary_terms:
                 logger.warning("No approved glossary terms found!")
+            # Only the terms that occur in the text go into the prompt
+            glossary_terms = select_glossary_terms(glossary_terms, [source_text])
+            logger.info(f"Glossary terms in text: {list(glossary_terms.keys())[:10]}")
         except Exception as glossary_error:
             logger.warning(f"Failed to load glossary for call_ai_translation_api: {glossary_error}")
-            glossary_context = ""
-
-        # Create the prompt
-        system_message = f"""You are an expert Thai translator specializing in enterprise software and accounting systems.
-
-CONTEXT: You are translating ERPNext/Frappe framework interface text for Thai business users.
-
-TRANSLATION GUIDELINES:
-1. **ALWAYS USE PROVIDED GLOSSARY TERMS** - This is the most important rule
-2. Use formal, professional Thai appropriate for business software
-3. Translate to natural, fluent Thai - avoid literal word-by-word translation
-4. For terms not in glossary, use established Thai business terminology
-5. Maintain the structure and formatting of the original text
-6. Keep technical placeholders like {{% s }}, {{ }}, {{0}} unchanged
-
-{glossary_context}
-
-CRITICAL: If any English terms appear in the glossary above, you MUST use those exact Thai translations. Do not create alternative translations for glossary terms.
-
-Provide natural, professional Thai translation that Thai business users would understand.
-Only return the translation, no explanations."""
+            glossary_terms = {}
 
-        # Make the API call
-        response = client.chat.completions.create(
+        # The system prompt is the same for every entry, so the provider can
+        # serve it from its prompt cache
+        response = limited_create(
+            provider, api_key, client.chat.completions.with_raw_response.create,
             model=model,
             messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": source_text},
+                {"role": "system", "content": TRANSLATION_SYSTEM_PROMPT},
+                {"role": "user", "content": variable_message(source_text, glossary_terms)},
             ],
             temperature=temperature,
-            timeout=60,
         )
 
         raw_translation = response.choices[0].message.content.strip()  # type: ignore
+        if usage is not None:
+            record_usage(usage, getattr(response, "usage", None))
         
         # Fix OpenAI's inconsistent Unicode escape sequence output
         # Handle mixed encoding: some Thai characters + some Unicode escape sequences
@@ -1024,47 +1412,30 @@ Only return the translation, no explanations."""
             return raw_translation
 
     elif provider == "claude":
-        import anthropic
-
-        client = anthropic.Anthropic(api_key=api_key)
+        client = get_ai_client("claude", api_key)
 
         # Prepare glossary context with timeout protection
         try:
-            glossary_terms = get_glossary_terms_dict()
-            glossary_context = ""
-            if glossary_terms:
-                glossary_context = "Use these specific term translations:\n" + json.dumps(
-                    glossary_terms, indent=2
-                )
+            if glossary_terms is None:
+                glossary_terms = get_glossary_terms_dict()
+            glossary_terms = select_glossary_terms(glossary_terms, [source_text])
         except Exception as glossary_error:
             logger.warning(f"Failed to load glossary for call_ai_translation_api: {glossary_error}")
-            glossary_context = ""
-
-        # Create the prompt
-        prompt = f"""
-        You are an expert translator specializing in technical and software localization.
-        Translate the following text from English to Thai.
-        {glossary_context}
-        
-        Ensure proper tone and formality appropriate for business software.
-        Preserve any formatting placeholders like {{% s }}, {{ }}, or {{0}}.
-        For technical terms not in the glossary, you may keep them in English if that's conventional.
-        Return only the translation, without any explanations or notes.
-        
-        Text to translate:
-        {source_text}
-        """
+            glossary_terms = {}
 
-        # Make the API call
-        response = client.messages.create(
+        # Make the API call, with the system prompt cached by the provider
+        response = limited_create(
+            provider, api_key, client.messages.with_raw_response.create,
             model=model,
             max_tokens=2000,  # Increased to match OpenAI calls for consistency
             temperature=temperature,
-            messages=[{"role": "user", "content": prompt}],
-            timeout=60,
+            system=anthropic_system(TRANSLATION_SYSTEM_PROMPT),
+            messages=[{"role": "user", "content": variable_message(source_text, glossary_terms)}],
         )
 
         raw_translation = response.content[0].text.strip()  # type: ignore
+        if usage is not None:
+            record_usage(usage, getattr(response, "usage", None))
         
         # Fix Claude's inconsistent Unicode escape sequence output
         # Handle mixed encoding: some Thai characters + some Unicode escape sequences
@@ -1116,49 +1487,26 @@ Only return the translation, no explanations."""
 
 def _translate_with_openai(api_key, model, text):
     """Translate text using OpenAI API with automatic retry for transient errors"""
-    client = openai.OpenAI(api_key=api_key)
+    client = get_ai_client("openai", api_key)
 
     # Format the glossary with timeout protection
     try:
-        glossary_terms = get_glossary_terms_dict()
-        glossary_text = json.dumps(glossary_terms, indent=2)
+        glossary_terms = select_glossary_terms(get_glossary_terms_dict(), [text])
     except Exception as glossary_error:
         logger.warning(f"Failed to load glossary: {glossary_error}")
         glossary_terms = {}
-        glossary_text = "{}"
 
     def make_api_call():
         """Inner function for retry wrapper"""
-        return client.chat.completions.create(
+        return limited_create(
+            "openai", api_key, client.chat.completions.with_raw_response.create,
             model=model,
             messages=[
-                {
-                    "role": "system",
-                    "content": f"""You are an expert Thai translator specializing in enterprise software and accounting systems.
-
-CONTEXT: You are translating ERPNext/Frappe framework interface text for Thai business users.
-
-TRANSLATION GUIDELINES:
-1. **ALWAYS USE PROVIDED GLOSSARY TERMS** - This is the most important rule
-2. Use formal, professional Thai appropriate for business software
-3. Translate to natural, fluent Thai - avoid literal word-by-word translation
-4. For terms not in glossary, use established Thai business terminology
-5. Maintain the structure and formatting of the original text
-6. Keep technical placeholders like {{% s }}, {{ }}, {{0}} unchanged
-
-GLOSSARY - Use these exact translations:
-{glossary_text}
-
-CRITICAL: If any English terms appear in the glossary above, you MUST use those exact Thai translations. Do not create alternative translations for glossary terms.
-
-Provide natural, professional Thai translation that Thai business users would understand.
-Only respond with the translated text, nothing else.""",
-                },
-                {"role": "user", "content": text},
+                {"role": "system", "content": TRANSLATION_SYSTEM_PROMPT},
+                {"role": "user", "content": variable_message(text, glossary_terms)},
             ],
             temperature=0.3,
             max_tokens=2000,  # CRITICAL FIX: Allow enough tokens for long translations
-            timeout=60,
         )
 
     try:
@@ -1226,37 +1574,24 @@ Only respond with the translated text, nothing else.""",
 
 def _translate_with_claude(api_key, model, text):
     """Translate text using Anthropic Claude API with automatic retry for transient errors"""
-    client = anthropic.Anthropic(api_key=api_key)
+    client = get_ai_client("claude", api_key)
 
     # Format the glossary with timeout protection
     try:
-        glossary_terms = get_glossary_terms_dict()
-        glossary_text = json.dumps(glossary_terms, indent=2)
+        glossary_terms = select_glossary_terms(get_glossary_terms_dict(), [text])
     except Exception as glossary_error:
         logger.warning(f"Failed to load glossary: {glossary_error}")
         glossary_terms = {}
-        glossary_text = "{}"
 
     def make_api_call():
         """Inner function for retry wrapper"""
-        return client.messages.create(
+        return limited_create(
+            "claude", api_key, client.messages.with_raw_response.create,
             model=model or "claude-3-haiku-20240307",
             max_tokens=2000,  # Increased to match OpenAI fix
             temperature=0.3,
-            messages=[
-                {
-                    "role": "user",
-                    "content": f"""You are an expert translator specializing in technical and software localization.
-Translate the following from English to Thai.
-For Thai language translations, use these specific term translations:
-{glossary_text}
-
-Preserve any formatting placeholders like {{% s }}, {{ }}, or {{0}}.
-Only respond with the translated text, nothing else.
-
-Text to translate: {text}""",
-                }
-            ],
+            system=anthropic_system(TRANSLATION_SYSTEM_PROMPT),
+            messages=[{"role": "user", "content": variable_message(text, glossary_terms)}],
         )
 
     try:
@@ -1318,198 +1653,558 @@ Text to translate: {text}""",
         return None
 
 
-def _batch_translate_with_openai(api_key, model, entries, temperature=0.3):
-    """Translate multiple entries using OpenAI API with automatic retry for transient errors"""
-    client = openai.OpenAI(api_key=api_key)
-
-    # Format the glossary with timeout protection
+def _batch_translate_entries(provider, api_key, model, entries, temperature):
+    """Translate {idx: text} with the chunk JSON contract, see translate_chunked()"""
     try:
         glossary_terms = get_glossary_terms_dict()
-        glossary_text = json.dumps(glossary_terms, indent=2)
     except Exception as glossary_error:
         logger.warning(f"Failed to load glossary: {glossary_error}")
         glossary_terms = {}
-        glossary_text = "{}"
 
-    # Build a message with all entries
-    entries_list = [f"Entry {idx}: {text}" for idx, text in entries.items()]
-    entries_text = "\n\n".join(entries_list)
+    settings = get_translation_settings()
+    try:
+        translations, _ = translate_chunked(
+            list(entries.items()),
+            provider,
+            api_key,
+            model,
+            glossary_terms,
+            settings.get("temperature", temperature),
+        )
+    except Exception as e:
+        logger.error(f"{provider} batch translation error: {str(e)}", exc_info=True)
+        frappe.log_error(f"{provider} batch translation error: {str(e)}")
+        return {}
 
-    # Log entry details for debugging
-    logger.info(f"Translating {len(entries)} entries via OpenAI")
-    logger.debug(f"Entries to translate: {entries_list}")
+    logger.info(f"{provider} translated {len(translations)} entries out of {len(entries)}")
+    return translations
 
-    # Get the temperature from settings if available
-    settings = get_translation_settings()
-    temp = settings.get("temperature", temperature)
 
-    def make_api_call():
-        """Inner function for retry wrapper"""
-        return client.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": f"""You are an expert translator specializing in technical and software localization.
-Translate the following entries from English to Thai.
-For Thai language translations, use these specific term translations:
-{glossary_text}
-
-Preserve any formatting placeholders like {{% s }}, {{ }}, or {{0}}.
-For each entry, respond with 'Entry X: [Thai translation]' where X is the entry number.
-IMPORTANT: Translate the ENTIRE text for each entry, not just the first line or title.""",
-                },
-                {"role": "user", "content": entries_text},
-            ],
-            temperature=temp,
-            max_tokens=4000,  # Increase token limit for longer translations
-            timeout=120,  # Add 2-minute timeout to prevent hanging
-        )
+def _batch_translate_with_openai(api_key, model, entries, temperature=0.3):
+    """Translate multiple entries using OpenAI API"""
+    return _batch_translate_entries("openai", api_key, model, entries, temperature)
 
-    try:
-        # Use retry wrapper for transient errors
+
+def _batch_translate_with_claude(api_key, model, entries, temperature=0.3):
+    """Translate multiple entries using Anthropic Claude API"""
+    return _batch_translate_entries("claude", api_key, model or "claude-3-haiku-20240307", entries, temperature)
+
+
+# Prompts are a stable system prompt, cached by the providers, followed by
+# a user message with the glossary terms of the text and the text itself,
+# see utils/prompt_cache.py
+TRANSLATION_SYSTEM_PROMPT = """You are an expert Thai translator specializing in enterprise software and accounting systems.
+
+CONTEXT: You are translating ERPNext/Frappe framework interface text for Thai business users.
+
+TRANSLATION GUIDELINES:
+1. **ALWAYS USE PROVIDED GLOSSARY TERMS** - This is the most important rule
+2. Use formal, professional Thai appropriate for business software
+3. Translate to natural, fluent Thai - avoid literal word-by-word translation
+4. For terms not in glossary, use established Thai business terminology
+5. Maintain the structure and formatting of the original text
+6. Keep technical placeholders like {% s }, { }, {0} unchanged
+
+The user message may start with a GLOSSARY of the terms that occur in the
+TEXT that follows it.
+
+CRITICAL: If any English terms appear in the glossary, you MUST use those exact Thai translations. Do not create alternative translations for glossary terms.
+
+Provide natural, professional Thai translation that Thai business users would understand.
+Only return the translation, no explanations."""
+
+BATCH_SYSTEM_PROMPT = """You are an expert Thai translator specializing in enterprise software and accounting systems.
+
+CONTEXT: You are translating ERPNext/Frappe framework interface text for Thai business users.
+
+TRANSLATION GUIDELINES:
+1. **ALWAYS USE PROVIDED GLOSSARY TERMS** - This is the most important rule
+2. Use formal, professional Thai appropriate for business software
+3. Translate to natural, fluent Thai - avoid literal word-by-word translation
+4. Maintain the structure and formatting of the original text
+5. Keep technical placeholders like {% s }, { }, {0} unchanged
+6. Translate the ENTIRE text of every item, not just the first line
+
+The user message may start with a GLOSSARY of the terms that occur in the
+items; use those exact translations.
+
+INPUT: a JSON array of objects with "id" and "text".
+OUTPUT: a JSON object {"translations": [{"id": "<id>", "translation": "<Thai translation>"}]}
+with exactly one object for every input id, using the ids unchanged. Every
+placeholder of a text must appear unchanged in its translation."""
+
+
+def _stream_response_text(provider, stream, parser, on_translation, usage):
+    """Read a streamed chunk answer, passing completed items to on_translation"""
+    parts = []
+    start_output_tokens = 0
+    for event in stream:
+        text = None
+        if provider in ("claude", "anthropic"):
+            if event.type == "message_start":
+                record_usage(usage, event.message.usage)
+                start_output_tokens = event.message.usage.output_tokens or 0
+            elif event.type == "content_block_delta" and event.delta.type == "text_delta":
+                text = event.delta.text
+            elif event.type == "content_block_delta" and event.delta.type == "input_json_delta":
+                # The tool call's input is streamed as partial JSON
+                text = event.delta.partial_json
+            elif event.type == "message_delta" and event.usage:
+                # The output token count of message_delta is cumulative
+                output_tokens = (event.usage.output_tokens or 0) - start_output_tokens
+                usage["output_tokens"] = usage.get("output_tokens", 0) + output_tokens
+                usage["tokens"] = usage.get("tokens", 0) + output_tokens
+        else:
+            if event.usage:
+                record_usage(usage, event.usage)
+            if event.choices:
+                text = event.choices[0].delta.content
+        if text:
+            parts.append(text)
+            for item_id, translation in parser.feed(text):
+                on_translation(item_id, translation)
+    return "".join(parts)
+
+
+def _openai_response_format(model):
+    """Structured output where the model supports JSON schemas, JSON mode otherwise"""
+    if (model or "").startswith(("gpt-3.5", "gpt-4-")) or model == "gpt-4":
+        return {"type": "json_object"}
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": CHUNK_TOOL_NAME, "strict": True, "schema": CHUNK_RESPONSE_SCHEMA},
+    }
+
+
+def _anthropic_chunk_answer(response):
+    """Input of the forced tool call of a chunk answer, or its text"""
+    for block in response.content:
+        if block.type == "tool_use":
+            return block.input
+    return next((block.text for block in response.content if block.type == "text"), "")
+
+
+def _translate_chunk_json(
+    provider,
+    api_key,
+    model,
+    chunk,
+    glossary_terms,
+    temperature=0.3,
+    on_translation=None,
+    usage=None,
+    parse_stats=None,
+):
+    """
+    Translate a chunk of entries with a single request and a JSON response
+
+    The answer is constrained to CHUNK_RESPONSE_SCHEMA, a JSON schema
+    response format for OpenAI and a forced tool call for Anthropic, and
+    every item is checked with translation_batching.validate_chunk_response().
+    Safe to call from worker threads: the glossary is passed in and nothing
+    here touches the database.
+
+    Args:
+        chunk (list): (id, text) tuples, see translation_batching.pack_chunks()
+        glossary_terms (dict): Full glossary, trimmed to the terms in the chunk
+        on_translation: Callable taking (id, translation); when given, the
+            response is streamed and it is called, on this thread, for every
+            item as soon as it has been parsed
+        usage (dict): Token counts of the request are added to it, see
+            prompt_cache.record_usage()
+        parse_stats (ParseStats): Counts the missing and rejected items
+
+    Returns:
+        tuple: ({id: translation} for the valid items, tokens used)
+    """
+    terms = select_glossary_terms(glossary_terms, [text for _, text in chunk])
+    payload = variable_message(chunk_payload(chunk), terms, label="INPUT")
+    stream_options = {"stream": True} if on_translation else {}
+    request_usage = {}
+
+    if provider in ("claude", "anthropic"):
+        client = get_ai_client("claude", api_key)
         response = retry_with_backoff(
-            make_api_call,
+            lambda: limited_create(
+                provider, api_key, client.messages.with_raw_response.create,
+                model=model or "claude-3-haiku-20240307",
+                max_tokens=BATCH_MAX_OUTPUT_TOKENS,
+                temperature=temperature,
+                system=anthropic_system(BATCH_SYSTEM_PROMPT),
+                tools=[
+                    {
+                        "name": CHUNK_TOOL_NAME,
+                        "description": "Submit the Thai translation of every input item",
+                        "input_schema": CHUNK_RESPONSE_SCHEMA,
+                    }
+                ],
+                tool_choice={"type": "tool", "name": CHUNK_TOOL_NAME},
+                messages=[{"role": "user", "content": payload}],
+                timeout=120,
+                **stream_options,
+            ),
             max_retries=MAX_RETRIES,
-            retryable_errors=RETRYABLE_OPENAI_ERRORS
+            retryable_errors=RETRYABLE_ANTHROPIC_ERRORS,
         )
+        if not on_translation:
+            response_text = _anthropic_chunk_answer(response)
+            record_usage(request_usage, response.usage)
+    else:
+        if on_translation:
+            stream_options["stream_options"] = {"include_usage": True}
+        client = get_ai_client("openai", api_key)
+        response = retry_with_backoff(
+            lambda: limited_create(
+                provider, api_key, client.chat.completions.with_raw_response.create,
+                model=model,
+                messages=[
+                    {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                    {"role": "user", "content": payload},
+                ],
+                temperature=temperature,
+                max_tokens=BATCH_MAX_OUTPUT_TOKENS,
+                response_format=_openai_response_format(model),
+                timeout=120,
+                **stream_options,
+            ),
+            max_retries=MAX_RETRIES,
+            retryable_errors=RETRYABLE_OPENAI_ERRORS,
+        )
+        if not on_translation:
+            response_text = response.choices[0].message.content
+            record_usage(request_usage, response.usage)
 
-        # Parse the response to extract translations
-        response_text = response.choices[0].message.content
-        translations = {}
-        
-        # Log the full response for debugging
-        logger.info(f"Full OpenAI response: {response_text}")
+    if on_translation:
+        response_text = _stream_response_text(
+            provider, response, ChunkStreamParser(chunk), on_translation, request_usage
+        )
 
-        # Improved parsing: handle multi-line translations
-        if response_text:
-            # Split by "Entry " to get each entry's response
-            entry_blocks = response_text.split("Entry ")[1:]  # Skip the first empty part
-            
-            for block in entry_blocks:
-                try:
-                    # Find the first colon to separate entry number from translation
-                    colon_index = block.find(":")
-                    if colon_index == -1:
-                        continue
-                        
-                    entry_part = block[:colon_index].strip()
-                    translation = block[colon_index + 1:].strip()
-                    
-                    # Extract entry index
-                    try:
-                        idx = int(entry_part)
-                        if idx in entries and translation:
-                            translations[idx] = translation
-                            logger.info(f"Parsed entry {idx}: {translation[:100]}...")
-                    except ValueError:
-                        continue
-                        
-                except Exception as e:
-                    logger.error(f"Error parsing OpenAI response block: {e}")
-                    continue
-
-        return translations
-    except Exception as e:
-        logger.error(f"OpenAI batch translation error: {str(e)}", exc_info=True)
-        frappe.log_error(f"OpenAI batch translation error: {str(e)}")
-        return {}
+    if usage is not None:
+        for name, value in request_usage.items():
+            usage[name] = usage.get(name, 0) + value
+
+    translations, invalid = validate_chunk_response(response_text, chunk)
+    if parse_stats is not None:
+        parse_stats.add(model, len(chunk), invalid)
+    if invalid:
+        logger.warning(
+            f"Chunk translation returned {len(translations)} of {len(chunk)} items, "
+            f"rejected: {sorted(set(invalid.values()))}"
+        )
+    return translations, request_usage.get("tokens", 0)
 
 
-def _batch_translate_with_claude(api_key, model, entries, temperature=0.3):
-    """Translate multiple entries using Anthropic Claude API"""
+PARSE_STATS_KEY = "translation_tools:parse_stats"
+
+
+def record_parse_stats(parse_stats):
+    """Add a run's ParseStats to the per-model counters in Redis, ignoring Redis errors"""
     try:
-        client = anthropic.Anthropic(api_key=api_key)
+        cache = frappe.cache()
+        pipe = cache.pipeline()
+        for model, counts in parse_stats.as_dict().items():
+            for name, value in counts.items():
+                pipe.hincrby(cache.make_key(PARSE_STATS_KEY), f"{model}|{name}", value)
+        pipe.execute()
+    except Exception as e:
+        logger.debug(f"Could not update parse stats: {e}")
 
-        # Format the glossary with timeout protection
-        try:
-            glossary_terms = get_glossary_terms_dict()
-            glossary_text = json.dumps(glossary_terms, indent=2)
-        except Exception as glossary_error:
-            logger.warning(f"Failed to load glossary: {glossary_error}")
-            glossary_terms = {}
-            glossary_text = "{}"
 
-        # Build a message with all entries
-        entries_list = [f"Entry {idx}: {text}" for idx, text in entries.items()]
-        entries_text = "\n\n".join(entries_list)
+def get_parse_stats():
+    """
+    Chunk answer counters per model
 
-        # Get the temperature from settings if available
-        settings = get_translation_settings()
-        temp = settings.get("temperature", temperature)
+    Returns:
+        dict: model -> requests, items, missing, empty, placeholders and
+        failure_rate in percent of the items
+    """
+    cache = frappe.cache()
+    # Raw pipeline commands, the counters are plain integers, not pickles
+    raw_counters = cache.pipeline().hgetall(cache.make_key(PARSE_STATS_KEY)).execute()[0]
+    models = {}
+    for field, value in raw_counters.items():
+        model, _, name = field.decode("utf-8").rpartition("|")
+        models.setdefault(model, {})[name] = int(value)
+    for counts in models.values():
+        counts["failure_rate"] = failure_rate(counts)
+    return models
+
+
+def translate_chunked(
+    items,
+    provider,
+    api_key,
+    model,
+    glossary_terms,
+    temperature=0.3,
+    concurrency=None,
+    on_translation=None,
+    max_wait=0,
+    prompt_usage=None,
+):
+    """
+    Translate source texts with multi-entry requests run on the executor
 
-        response = client.messages.create(
-            model=model or "claude-3-haiku-20240307",
-            max_tokens=4000,  # Increase token limit for longer translations
-            temperature=temp,
-            messages=[
-                {
-                    "role": "user",
-                    "content": f"""You are an expert translator specializing in technical and software localization.
-Translate the following entries from English to Thai.
-For Thai language translations, use these specific term translations:
-{glossary_text}
-
-Preserve any formatting placeholders like {{% s }}, {{ }}, or {{0}}.
-For each entry, respond with 'Entry X: [Thai translation]' where X is the entry number.
-IMPORTANT: Translate the ENTIRE text for each entry, not just the first line or title.
-
-{entries_text}""",
-                }
-            ],
-        )
+    Items missing from a chunk's answer, or rejected by the validation, are
+    sent again in smaller chunks and, if that fails too, one at a time.
+    While the provider's circuit breaker is open, chunks go to the other
+    configured provider. Parse failures are added to the per-model counters
+    of get_parse_stats().
 
-        # Parse the response to extract translations
-        response_text = response.content[0].text  # type: ignore
-        translations = {}
-        
-        # Log the full response for debugging
-        logger.info(f"Full Claude response: {response_text}")
+    Args:
+        items (list): (id, source text) tuples
+        glossary_terms (dict): Full glossary, loaded on the calling thread
+        concurrency (int): Requests in flight, defaults to the
+            ``translation_concurrency`` site config
+        on_translation: Callable taking (id, translation); when given, the
+            responses are streamed and it is called on the calling thread
+            for each item as soon as it has been parsed, at most once per item
+        max_wait (float): Seconds to wait for an unavailable provider when no
+            other provider is available, for background jobs
+        prompt_usage (PromptUsage): Job counters the chunk requests' token
+            usage is added to
 
-        # Improved parsing: handle multi-line translations
-        if response_text:
-            # Split by "Entry " to get each entry's response
-            entry_blocks = response_text.split("Entry ")[1:]  # Skip the first empty part
-            
-            for block in entry_blocks:
-                try:
-                    # Find the first colon to separate entry number from translation
-                    colon_index = block.find(":")
-                    if colon_index == -1:
-                        continue
-                        
-                    entry_part = block[:colon_index].strip()
-                    translation = block[colon_index + 1:].strip()
-                    
-                    # Extract entry index
-                    try:
-                        idx = int(entry_part)
-                        if idx in entries and translation:
-                            translations[idx] = translation
-                            logger.info(f"Parsed Claude entry {idx}: {translation[:100]}...")
-                    except ValueError:
-                        continue
-                        
-                except Exception as e:
-                    logger.error(f"Error parsing Claude response block: {e}")
-                    continue
+    Returns:
+        tuple: ({id: translation}, number of provider requests)
+    """
+    token_budget = int(frappe.conf.get("translation_batch_token_budget") or DEFAULT_TOKEN_BUDGET)
+    chunks = pack_chunks(items, token_budget=token_budget)
+    logger.info(f"Packed {len(items)} entries into {len(chunks)} requests")
+
+    translated = {}
+    # Items parsed by the workers while their response is still streaming
+    streamed = queue.SimpleQueue()
+
+    def deliver(item_id, translation):
+        if item_id not in translated:
+            translated[item_id] = translation
+            if on_translation:
+                on_translation(item_id, translation)
+
+    def drain():
+        while True:
+            try:
+                deliver(*streamed.get_nowait())
+            except queue.Empty:
+                return
+
+    def apply(chunk, translations):
+        drain()
+        for item_id, translation in translations.items():
+            deliver(item_id, translation)
+        # The complete answer wins over what was previewed while streaming
+        translated.update(translations)
+
+    def on_error(chunk, error):
+        drain()
+        logger.error(f"Chunk of {len(chunk)} entries failed: {error}")
+
+    targets = prepare_providers(get_failover_targets(provider, api_key, model))
+    if prompt_usage is None:
+        prompt_usage = PromptUsage()
+    parse_stats = ParseStats()
+
+    def translate_chunk(chunk):
+        usage = {}
+        try:
+            return call_with_failover(
+                lambda target: _translate_chunk_json(
+                    target[0],
+                    target[1],
+                    target[2],
+                    chunk,
+                    glossary_terms,
+                    temperature,
+                    on_translation=(lambda *item: streamed.put(item)) if on_translation else None,
+                    usage=usage,
+                    parse_stats=parse_stats,
+                ),
+                targets,
+                max_wait=max_wait,
+            )
+        finally:
+            if usage:
+                prompt_usage.add(usage)
+
+    executor = TranslationExecutor(
+        translate_chunk,
+        concurrency=concurrency or frappe.conf.get("translation_concurrency") or DEFAULT_CONCURRENCY,
+        on_poll=drain if on_translation else None,
+    )
+    run_stats = executor.run(chunks, apply, on_error=on_error)
 
+    # Send only the missing and rejected items again, in smaller chunks
+    retry_chunks = pack_chunks(
+        [(item_id, text) for item_id, text in items if item_id not in translated],
+        token_budget=max(1, token_budget // 4),
+        max_items=RETRY_MAX_ITEMS,
+    )
+    if retry_chunks:
         logger.info(
-            f"Claude translated {len(translations)} entries out of {len(entries)}"
+            f"Resending {sum(len(chunk) for chunk in retry_chunks)} entries "
+            f"in {len(retry_chunks)} smaller requests"
         )
+        executor.run(retry_chunks, apply, on_error=on_error)
+
+    # Then one at a time
+    retry = [(item_id, text) for item_id, text in items if item_id not in translated]
+    if retry:
+        logger.info(f"Retrying {len(retry)} entries individually")
+    for item_id, text in retry:
+        usage = {}
+        try:
+            # Through the breakers too, an unavailable provider fails over here as well
+            translation = call_with_failover(
+                lambda target: call_ai_translation_api(
+                    source_text=text,
+                    provider="claude" if target[0] in ("claude", "anthropic") else target[0],
+                    model=target[2],
+                    api_key=target[1],
+                    temperature=temperature,
+                    glossary_terms=glossary_terms,
+                    usage=usage,
+                    memory=False,
+                ),
+                targets,
+                max_wait=max_wait,
+            )
+        except Exception as e:
+            logger.warning(f"Entry {item_id} translation failed: {e}")
+            continue
+        finally:
+            if usage:
+                prompt_usage.add(usage)
+
+        if translation and not check_translation(text, translation):
+            deliver(item_id, translation)
+        else:
+            logger.warning(f"Entry {item_id} translation failed")
+
+    record_parse_stats(parse_stats)
+    cache_stats = prompt_usage.as_dict()
+    logger.info(
+        f"{len(chunks)} requests, {len(retry_chunks)} resent, {len(retry)} retried, "
+        f"{run_stats.tokens} tokens, "
+        f"{cache_stats['cached_input_tokens']} input tokens from the prompt cache"
+    )
+    return translated, len(chunks) + len(retry_chunks) + len(retry)
+
+
+def translate_po_files_deduplicated(file_paths, model_provider=None, model=None, concurrency=None):
+    """
+    Translate the untranslated entries of several PO files at once
+
+    Entries are grouped across all files by source text, msgctxt and
+    language (see utils/translation_dedup.py); each unique string goes
+    through the translation memory and the provider once and its
+    translation is written to every entry of its group.
 
-        # If we didn't get all translations, log the issue
-        if len(translations) < len(entries):
-            logger.warning(
-                f"Claude only translated {len(translations)} out of {len(entries)} entries"
+    Args:
+        file_paths (list): Full paths of the PO files
+        model_provider (str): Defaults to the Translation Tools Settings
+        model (str): Defaults to the Translation Tools Settings
+
+    Returns:
+        dict: Entry counts, unique strings, ``calls_saved`` by the
+        deduplication, provider requests and the files written
+    """
+    settings = get_translation_settings()
+    api_keys = get_decrypted_api_keys()
+    provider = model_provider or settings.get("default_model_provider", "openai")
+    model = model or settings.get("default_model", "gpt-4.1-mini-2025-04-14")
+    if provider in ("claude", "anthropic"):
+        api_key = api_keys.get("anthropic_api_key")
+    else:
+        api_key = api_keys.get("openai_api_key")
+    if not api_key:
+        return {"success": False, "error": f"API key not configured for {provider}"}
+
+    catalogs = {}
+    occurrences = []
+    for file_path in file_paths:
+        if not os.path.exists(file_path):
+            logger.warning(f"Skipping missing PO file {file_path}")
+            continue
+        catalog = catalogs[file_path] = get_po_catalog(file_path)
+        language = language_from_filename(os.path.basename(file_path), "th")
+        with catalog.lock:
+            occurrences.extend(
+                ((file_path, entry), entry.msgid, entry.msgctxt, language)
+                for entry in catalog.po
+                if entry.msgid
+                and not entry.msgstr
+                and not entry.msgid_plural
+                and not entry.obsolete
             )
-            logger.debug(f"Claude response: {response_text[:500]}...")
 
-        return translations
-    except Exception as e:
-        logger.error(f"Claude batch translation error: {str(e)}", exc_info=True)
-        frappe.log_error(f"Claude batch translation error: {str(e)}")
-        return {}
-        logger.error(f"Claude batch translation error: {str(e)}", exc_info=True)
-        frappe.log_error(f"Claude batch translation error: {str(e)}")
-        return {}
+    plan = plan_deduplicated_translation(occurrences)
+    logger.info(
+        f"{plan.occurrences} untranslated entries in {len(catalogs)} files, "
+        f"{len(plan.groups)} unique strings"
+    )
+
+    try:
+        glossary_terms = get_glossary_terms_dict()
+    except Exception as glossary_error:
+        logger.warning(f"Failed to load glossary: {glossary_error}")
+        glossary_terms = {}
+    temperature = settings.get("temperature", 0.3)
+
+    requests_made = 0
+    prompt_usage = PromptUsage()
+    translated_groups = 0
+    touched = set()
+    for language, groups in plan.by_language().items():
+
+        def translate_missing(missing):
+            nonlocal requests_made
+            translated, requests = translate_chunked(
+                [(i, source) for i, (source, _) in missing.items()],
+                provider,
+                api_key,
+                model,
+                glossary_terms,
+                temperature,
+                concurrency,
+                max_wait=get_failover_max_wait(),
+                prompt_usage=prompt_usage,
+            )
+            requests_made += requests
+            return translated
+
+        translations = translate_with_memory(
+            {i: (group.source, group.context) for i, group in enumerate(groups)},
+            translate_missing,
+            language=language,
+            provider=provider,
+            model=model,
+        )
+
+        # Fan each translation out to every entry of its group
+        for i, translation in translations.items():
+            translated_groups += 1
+            for file_path, entry in groups[i].targets:
+                catalogs[file_path].set_msgstr(entry, translation)
+                touched.add(file_path)
+
+    for file_path in touched:
+        catalog = catalogs[file_path]
+        with catalog.lock:
+            catalog.po.metadata["PO-Revision-Date"] = time.strftime("%Y-%m-%d %H:%M%z")
+            catalog.flush()
+
+    summary = {
+        "success": True,
+        **plan.as_dict(),
+        "translated_unique": translated_groups,
+        "failed_unique": len(plan.groups) - translated_groups,
+        "provider_requests": requests_made,
+        "prompt_usage": prompt_usage.as_dict(),
+        "files": len(catalogs),
+        "files_updated": sorted(touched),
+    }
+    logger.info(
+        f"Deduplicated translation: {translated_groups}/{len(plan.groups)} unique strings, "
+        f"{plan.calls_saved} calls saved, {requests_made} provider requests"
+    )
+    return summary
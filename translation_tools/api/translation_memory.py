@@ -0,0 +1,323 @@
+"""
+Translation memory (TM) consulted before any AI provider call.
+
+Translations are stored in the Translation Memory Entry doctype, keyed by
+target language, glossary version, msgctxt and normalised source text (see
+utils/translation_memory.py). Recently used entries are also kept in a Redis
+hash, bounded by a sorted set of last-use times, so repeated strings like
+"Company" or "Posting Date" are usually served without touching the
+database either.
+"""
+
+import os
+import time
+
+import frappe
+from frappe.utils import cint
+
+from translation_tools.utils.translation_memory import make_tm_key, normalize_source
+
+from .common import logger
+from .glossary import get_glossary_version
+
+TM_DOCTYPE = "Translation Memory Entry"
+
+# Redis keys of the hot tier
+HOT_ENTRIES_KEY = "translation_tools:tm:entries"
+HOT_INDEX_KEY = "translation_tools:tm:last_used"
+STATS_KEY = "translation_tools:tm:stats"
+
+DEFAULT_HOT_SIZE = 20000
+
+# Rows per bulk insert when importing PO files
+IMPORT_CHUNK_SIZE = 1000
+
+
+def _hot_size():
+    return cint(frappe.conf.get("translation_memory_hot_size")) or DEFAULT_HOT_SIZE
+
+
+def _redis_keys():
+    # Hot tier values are plain strings, so raw pipeline commands are used
+    # instead of the pickling helpers of frappe's cache wrapper
+    cache = frappe.cache()
+    return cache, cache.make_key(HOT_ENTRIES_KEY), cache.make_key(HOT_INDEX_KEY)
+
+
+def _count(**counters):
+    """Add to the TM hit/miss counters, ignoring Redis errors"""
+    try:
+        cache = frappe.cache()
+        pipe = cache.pipeline()
+        for name, value in counters.items():
+            if value:
+                pipe.hincrby(cache.make_key(STATS_KEY), name, value)
+        pipe.execute()
+    except Exception as e:
+        logger.debug(f"Could not update translation memory stats: {e}")
+
+
+def _hot_get(keys):
+    """Read keys from the Redis tier and mark the hits as recently used"""
+    if not keys:
+        return {}
+    try:
+        cache, entries_key, index_key = _redis_keys()
+        values = cache.pipeline().hmget(entries_key, keys).execute()[0]
+        hits = {key: value.decode("utf-8") for key, value in zip(keys, values) if value is not None}
+        if hits:
+            now = time.time()
+            cache.pipeline().zadd(index_key, {key: now for key in hits}).execute()
+        return hits
+    except Exception as e:
+        logger.warning(f"Translation memory hot tier unavailable: {e}")
+        return {}
+
+
+def _hot_set(translations):
+    """Add entries to the Redis tier and trim it to the configured size"""
+    if not translations:
+        return
+    try:
+        cache, entries_key, index_key = _redis_keys()
+        now = time.time()
+        pipe = cache.pipeline()
+        pipe.hset(entries_key, mapping=translations)
+        pipe.zadd(index_key, {key: now for key in translations})
+        pipe.zcard(index_key)
+        size = pipe.execute()[-1]
+
+        excess = size - _hot_size()
+        if excess > 0:
+            # Drop the least recently used entries
+            popped = cache.pipeline().zpopmin(index_key, excess).execute()[0]
+            evicted = [member for member, _ in popped]
+            if evicted:
+                cache.pipeline().hdel(entries_key, *evicted).execute()
+    except Exception as e:
+        logger.warning(f"Translation memory hot tier unavailable: {e}")
+
+
+def lookup_translations(items, language="th", glossary_version=None):
+    """
+    Find stored translations for source texts
+
+    Args:
+        items (dict): key -> (source text, msgctxt or None)
+        language (str): Target language
+        glossary_version (int): Defaults to the current glossary version
+
+    Returns:
+        dict: key -> translation for the items found in the TM
+    """
+    if not items:
+        return {}
+    if glossary_version is None:
+        glossary_version = get_glossary_version()
+
+    tm_keys = {
+        key: make_tm_key(source, context, language, glossary_version)
+        for key, (source, context) in items.items()
+    }
+    wanted = list(set(tm_keys.values()))
+
+    found = _hot_get(wanted)
+    hot_hits = len(found)
+
+    missing = [tm_key for tm_key in wanted if tm_key not in found]
+    db_found = {}
+    if missing:
+        db_found = {
+            row.name: row.translation
+            for row in frappe.get_all(
+                TM_DOCTYPE,
+                filters={"name": ["in", missing]},
+                fields=["name", "translation"],
+            )
+        }
+        _hot_set(db_found)
+        found.update(db_found)
+
+    results = {key: found[tm_key] for key, tm_key in tm_keys.items() if tm_key in found}
+    _count(
+        hot_hits=hot_hits,
+        db_hits=len(db_found),
+        misses=len(wanted) - len(found),
+    )
+    return results
+
+
+def lookup_translation(source, context=None, language="th"):
+    """Return the stored translation of a single source text, or None"""
+    return lookup_translations({0: (source, context)}, language).get(0)
+
+
+def remember_translations(
+    records, language="th", origin="AI", provider=None, model=None, glossary_version=None
+):
+    """
+    Store translations in the TM, existing entries are kept
+
+    Args:
+        records (list): (source text, msgctxt or None, translation) tuples
+        origin (str): "AI" or "PO File"
+
+    Returns:
+        int: Number of records submitted
+    """
+    if glossary_version is None:
+        glossary_version = get_glossary_version()
+
+    rows = {}
+    for source, context, translation in records:
+        if not source or not translation:
+            continue
+        tm_key = make_tm_key(source, context, language, glossary_version)
+        rows[tm_key] = (normalize_source(source), context, translation)
+    if not rows:
+        return 0
+
+    now = frappe.utils.now_datetime()
+    user = frappe.session.user
+    tm_keys = list(rows)
+    for start in range(0, len(tm_keys), IMPORT_CHUNK_SIZE):
+        frappe.db.bulk_insert(
+            TM_DOCTYPE,
+            fields=[
+                "name", "owner", "modified_by", "creation", "modified",
+                "tm_key", "language", "context", "glossary_version",
+                "source_text", "translation", "origin", "provider", "model",
+            ],
+            values=[
+                [
+                    tm_key, user, user, now, now,
+                    tm_key, language, rows[tm_key][1], glossary_version,
+                    rows[tm_key][0], rows[tm_key][2], origin, provider, model,
+                ]
+                for tm_key in tm_keys[start : start + IMPORT_CHUNK_SIZE]
+            ],
+            ignore_duplicates=True,
+        )
+
+    if origin == "AI":
+        # Fresh AI results are likely to be asked for again soon
+        _hot_set({tm_key: row[2] for tm_key, row in rows.items()})
+    _count(stored=len(rows))
+    return len(rows)
+
+
+def translate_with_memory(
+    items, translate_missing, language="th", provider=None, model=None, on_hits=None
+):
+    """
+    Serve what the TM knows and send only the rest to a translator
+
+    Args:
+        items (dict): key -> (source text, msgctxt or None)
+        translate_missing: Callable taking the items the TM did not have and
+            returning key -> translation
+        language (str): Target language
+        on_hits: Callable taking the key -> translation served by the TM,
+            called before the rest is sent to translate_missing
+
+    Returns:
+        dict: key -> translation, from the TM or from translate_missing
+    """
+    glossary_version = get_glossary_version()
+    results = lookup_translations(items, language, glossary_version)
+    if on_hits and results:
+        on_hits(dict(results))
+
+    missing = {key: item for key, item in items.items() if key not in results}
+    if missing:
+        translated = translate_missing(missing) or {}
+        results.update(translated)
+        remember_translations(
+            [
+                (missing[key][0], missing[key][1], translation)
+                for key, translation in translated.items()
+                if key in missing
+            ],
+            language,
+            provider=provider,
+            model=model,
+            glossary_version=glossary_version,
+        )
+
+    if items:
+        logger.info(f"Translation memory served {len(items) - len(missing)} of {len(items)} entries")
+    return results
+
+
+def populate_from_po_file(file_path, language=None):
+    """
+    Import the translated entries of a PO file into the TM
+
+    Fuzzy and obsolete entries are skipped, so only reviewed translations
+    are reused.
+    """
+    from .po_files import get_po_catalog, language_from_filename
+
+    language = language or language_from_filename(os.path.basename(file_path), "th")
+    catalog = get_po_catalog(file_path)
+    with catalog.lock:
+        records = [
+            (entry.msgid, entry.msgctxt, entry.msgstr)
+            for entry in catalog.po
+            if entry.msgid and entry.msgstr and not entry.fuzzy and not entry.obsolete
+        ]
+    count = remember_translations(records, language, origin="PO File")
+    frappe.db.commit()
+    logger.info(f"Imported {count} translations from {file_path} into translation memory")
+    return count
+
+
+@frappe.whitelist()
+def import_po_files_to_memory(file_paths=None):
+    """Queue a TM import of the given PO files, or of every known PO file"""
+    frappe.only_for("System Manager")
+    from .common import get_bench_path
+
+    if isinstance(file_paths, str):
+        file_paths = frappe.parse_json(file_paths)
+    if not file_paths:
+        file_paths = frappe.get_all("PO File", pluck="file_path")
+
+    bench_path = get_bench_path()
+    for file_path in file_paths:
+        frappe.enqueue(
+            populate_from_po_file,
+            queue="long",
+            file_path=os.path.join(bench_path, file_path),
+        )
+    return {"success": True, "queued": len(file_paths)}
+
+
+@frappe.whitelist()
+def get_translation_memory_stats():
+    """Return TM size and hit/miss counters"""
+    frappe.only_for("System Manager")
+    try:
+        cache = frappe.cache()
+        # Raw pipeline commands, the counters are plain integers, not pickles
+        raw_counters, hot_entries = (
+            cache.pipeline()
+            .hgetall(cache.make_key(STATS_KEY))
+            .zcard(cache.make_key(HOT_INDEX_KEY))
+            .execute()
+        )
+        counters = {name.decode("utf-8"): int(value) for name, value in raw_counters.items()}
+    except Exception as e:
+        logger.warning(f"Could not read translation memory stats: {e}")
+        counters = {}
+        hot_entries = None
+
+    hits = counters.get("hot_hits", 0) + counters.get("db_hits", 0)
+    lookups = hits + counters.get("misses", 0)
+    return {
+        "entries": frappe.db.count(TM_DOCTYPE),
+        "hot_entries": hot_entries,
+        "hot_size": _hot_size(),
+        **counters,
+        "hit_rate": round(hits / lookups * 100, 1) if lookups else 0,
+    }
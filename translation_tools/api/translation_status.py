@@ -1,9 +1,10 @@
 import frappe
 from frappe import _
 import os
-import polib
 from frappe.utils import get_bench_path
 
+from translation_tools.api.po_files import get_po_catalog
+
 
 def get_site_apps_with_po_files():
     """Get list of site-specific installed apps that have PO files"""
@@ -82,11 +83,12 @@ def get_translation_stats(app=None):
         for po_file in po_files:
             try:
                 rel_path = os.path.relpath(po_file, apps_path)
-                po = polib.pofile(po_file)
+                catalog = get_po_catalog(po_file)
+                po = catalog.po
 
-                total_strings = len(po)
-                translated = len(po.translated_entries())
-                untranslated = len(po.untranslated_entries())
+                total_strings = catalog.stats.total
+                translated = catalog.stats.translated
+                untranslated = catalog.stats.untranslated
                 percentage = (
                     (translated / total_strings * 100) if total_strings > 0 else 0
                 )
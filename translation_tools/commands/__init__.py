@@ -8,4 +8,9 @@ setup_translation_override()
 from .compile_mo_files import *
 from .update_translations import *
 from .cleanup_translations import cleanup_non_asean_translations
-from .gen_po import *  # Generate PO files command
\ No newline at end of file
+from .gen_po import gen_po  # Generate PO files command
+from .benchmark_translation import benchmark_translation
+
+# Frappe registers only this module's commands list; the star imports above
+# bring lists of their own, which must not replace it
+commands = [gen_po, benchmark_translation]
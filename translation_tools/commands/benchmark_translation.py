@@ -0,0 +1,90 @@
+# Copyright (c) 2025, Manot Luijiu and contributors
+# For license information, please see license.txt
+
+"""
+Bench command for benchmarking translation throughput against the offline stub provider
+Usage: bench --site site-name benchmark-translation [--sizes 1000,10000] [--targets po_file,csv]
+"""
+
+import click
+import frappe
+
+
+def _split(value, cast=str):
+    return tuple(cast(part.strip()) for part in value.split(",") if part.strip())
+
+
+@click.command('benchmark-translation')
+@click.option('--sizes', default='1000,10000,50000', help='Comma separated catalog sizes in entries')
+@click.option('--targets', default='po_file,batch,csv', help='Comma separated: po_file, batch, csv')
+@click.option('--provider', default='openai', type=click.Choice(['openai', 'claude']), help='Provider the stub imitates')
+@click.option('--latency', default=0.05, type=float, help='Simulated seconds per request')
+@click.option('--error-rate', default=0.0, type=float, help='Share of requests failing with a 500')
+@click.option('--rate-limit-rpm', default=0, type=int, help='Requests per minute before the stub answers 429')
+@click.option('--concurrency', default=None, type=int, help='Requests in flight for translate_po_file')
+@click.option('--seed', default=0, type=int, help='Seed of the synthetic catalogs and stub draws')
+@click.pass_context
+def benchmark_translation(
+    ctx, sizes, targets, provider, latency, error_rate, rate_limit_rpm, concurrency, seed
+):
+    """
+    Measure translation throughput without calling a real AI provider
+
+    Examples:
+        bench --site site-name benchmark-translation
+        bench --site site-name benchmark-translation --sizes 1000 --targets po_file --concurrency 8
+        bench --site site-name benchmark-translation --error-rate 0.05 --rate-limit-rpm 600
+    """
+    site = ctx.obj["sites"][0] if ctx.obj.get("sites") else None
+
+    if not site:
+        click.echo("❌ No site specified. Use: bench --site site-name benchmark-translation")
+        return
+
+    try:
+        frappe.init(site=site)
+        frappe.connect()
+
+        from translation_tools.utils.translation_benchmark import TARGETS, run_benchmark
+
+        target_list = _split(targets)
+        unknown = [target for target in target_list if target not in TARGETS]
+        if unknown:
+            click.echo(f"❌ Unknown targets: {', '.join(unknown)}. Use: {', '.join(TARGETS)}")
+            return
+
+        header = f"{'target':<10}{'entries':>9}{'done':>9}{'seconds':>10}{'calls':>8}{'errors':>8}{'429s':>7}{'entries/s':>11}"
+        click.echo(f"🔄 Benchmarking against the stub provider ({provider}, {latency}s per request)")
+        click.echo(header)
+        click.echo("-" * len(header))
+
+        def show(result):
+            click.echo(
+                f"{result['target']:<10}{result['entries']:>9}{result['translated']:>9}"
+                f"{result['wall_time']:>10}{result['calls']:>8}{result['errors']:>8}"
+                f"{result['throttled']:>7}{result['entries_per_sec']:>11}"
+            )
+
+        run_benchmark(
+            sizes=_split(sizes, int),
+            targets=target_list,
+            provider=provider,
+            latency=latency,
+            error_rate=error_rate,
+            rate_limit_rpm=rate_limit_rpm,
+            concurrency=concurrency,
+            seed=seed,
+            on_result=show,
+        )
+        click.echo("✅ Benchmark finished")
+
+    except Exception as e:
+        click.echo(f"❌ Error: {str(e)}")
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        frappe.destroy()
+
+
+commands = [benchmark_translation]
@@ -72,6 +72,7 @@ commands = [
     "translation_tools.commands.update_translations",
     "translation_tools.commands.migrate_csv_with_spa",  # CSV to PO migration with SPA support
     "translation_tools.commands.gen_po",  # Generate PO files for custom apps
+    "translation_tools.commands.benchmark_translation",  # Throughput benchmark against the stub provider
 ]
 
 website_route_rules = [
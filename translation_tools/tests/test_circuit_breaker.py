@@ -0,0 +1,60 @@
+# Copyright (c) 2025, Manot Luijiu and contributors
+# For license information, please see license.txt
+
+import time
+import unittest
+
+from translation_tools.utils.circuit_breaker import (
+    ProviderCircuitBreaker,
+    ProviderUnavailable,
+    allow,
+    call_with_failover,
+    record,
+    state_name,
+)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_circuit_breaker_and_failover(self):
+        """Test that a breaker opens, lets one probe through and fails over"""
+        state = {}
+        for _ in range(4):
+            record(state, 100, ok=False, failure_threshold=5, open_seconds=60)
+        self.assertEqual(state_name(state, 100), "closed")
+        self.assertTrue(record(state, 100, ok=False, failure_threshold=5, open_seconds=60))
+        self.assertEqual(allow(state, 130), 30)
+
+        # After the cooldown exactly one probe is let through
+        self.assertEqual(allow(state, 161), 0)
+        self.assertGreater(allow(state, 161), 0)
+        # A failed probe reopens for twice as long
+        self.assertTrue(record(state, 162, ok=False, failure_threshold=5, open_seconds=60))
+        self.assertEqual(allow(state, 162), 120)
+        record(state, 170, ok=True)
+        self.assertEqual(state_name(state, 170), "open")
+        self.assertEqual(allow(state, 283), 0)
+        record(state, 284, ok=True)
+        self.assertEqual((state_name(state, 284), allow(state, 284)), ("closed", 0))
+
+        def call(target):
+            if target == "openai":
+                raise ProviderUnavailable(target, 30)
+            return target
+
+        self.assertEqual(call_with_failover(call, ["openai", "claude"]), "claude")
+        with self.assertRaises(ProviderUnavailable):
+            call_with_failover(call, ["openai"])
+
+    def test_probe_with_uncounted_error_frees_slot(self):
+        """Test that a half-open probe failing with an uncounted error records an outcome"""
+        breaker = ProviderCircuitBreaker("openai")
+        breaker._update(lambda state: state.update(failures=5, opens=1, opened_until=time.time() - 1))
+        self.assertEqual(breaker.status()["state"], "half_open")
+
+        def bad_request():
+            raise ValueError("400 Bad Request")
+
+        with self.assertRaises(ValueError):
+            breaker.call(bad_request, failure_errors=(ConnectionError,))
+        self.assertEqual(breaker.status()["state"], "closed")
+        self.assertEqual(breaker.call(lambda: "ok", failure_errors=(ConnectionError,)), "ok")
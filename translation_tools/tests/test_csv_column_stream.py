@@ -0,0 +1,54 @@
+# Copyright (c) 2025, Manot Luijiu and contributors
+# For license information, please see license.txt
+
+import csv
+import io
+import unittest
+
+from translation_tools.utils.csv_column_stream import parse_numbered_translations, translate_csv_stream
+
+
+class TestCsvColumnStream(unittest.TestCase):
+    def test_csv_column_stream(self):
+        """Test that CSV rows are streamed in blocks and repeated values sent once"""
+        source = io.StringIO("name,name_th\nBox,\nUnit,\nBox,กล่อง\nBox,\n,\nUnit,\nFail,\n")
+        output = io.StringIO()
+        sent = []
+
+        def translate_texts(texts):
+            sent.append(list(texts))
+            return {text: f"th:{text}" for text in texts if text != "Fail"}
+
+        reader = csv.DictReader(source)
+        writer = csv.DictWriter(output, fieldnames=reader.fieldnames)
+        writer.writeheader()
+        blocks = []
+        stats = translate_csv_stream(
+            reader, writer, "name", "name_th", translate_texts, block_rows=3,
+            on_block=lambda stats: blocks.append(stats.rows),
+        )
+
+        self.assertEqual(sent, [["Box", "Unit"], ["Fail"]])
+        self.assertEqual(blocks, [3, 6, 7])
+        rows = list(csv.reader(io.StringIO(output.getvalue())))
+        self.assertEqual(
+            [row[1] for row in rows[1:]],
+            ["th:Box", "th:Unit", "กล่อง", "th:Box", "", "th:Unit", ""],
+        )
+        self.assertEqual(
+            (stats.translated, stats.skipped, stats.failed, stats.sent, stats.reused), (4, 2, 1, 3, 2)
+        )
+
+    def test_parse_numbered_translations(self):
+        """Test that numbered answers are matched by number and mismatches rejected"""
+        self.assertEqual(
+            parse_numbered_translations("2) 2024 งบประมาณ\n\n1. กล่อง\n", 2), ["กล่อง", "2024 งบประมาณ"]
+        )
+        for answer in (
+            "1. กล่อง",
+            "1. กล่อง\n2. หน่วย\n3. ชิ้น",
+            "Here are the translations:\n1. กล่อง\n2. หน่วย",
+            "1. กล่อง\n1. หน่วย",
+        ):
+            with self.assertRaises(ValueError):
+                parse_numbered_translations(answer, 2)
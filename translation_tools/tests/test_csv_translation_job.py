@@ -0,0 +1,74 @@
+# Copyright (c) 2025, Manot Luijiu and contributors
+# For license information, please see license.txt
+
+import csv
+import os
+import unittest
+from functools import partial
+from unittest.mock import patch
+
+import frappe
+
+from translation_tools.api.csv_translation import (
+    get_csv_translation_progress,
+    translate_csv_column_background,
+)
+from translation_tools.api.translation_memory import TM_DOCTYPE
+from translation_tools.utils.stub_provider import STUB_API_KEY, STUB_MODEL, disable, enable, stub_translate
+from translation_tools.utils.translation_benchmark import synthetic_csv
+
+SOURCES = ["CSV job test box", "CSV job test unit", "CSV job test box"]
+
+
+class TestCsvTranslationJob(unittest.TestCase):
+    def setUp(self):
+        enable(latency=0)
+        self.file_url = None
+
+    def tearDown(self):
+        disable()
+        if self.file_url:
+            for name in frappe.get_all("File", filters={"file_url": self.file_url}, pluck="name"):
+                frappe.delete_doc("File", name, force=True)
+        frappe.db.delete(TM_DOCTYPE, {"model": STUB_MODEL})
+        frappe.db.commit()
+
+    def test_background_job_runs(self):
+        """Test that the queued job translates the column, saves a File and removes its input"""
+        published = []
+
+        def publish_realtime(event, message=None, **kwargs):
+            published.append((event, message))
+
+        with patch("frappe.enqueue", partial(frappe.enqueue, now=True)), patch(
+            "frappe.publish_realtime", publish_realtime
+        ), patch(
+            "translation_tools.api.csv_translation.get_decrypted_api_keys",
+            return_value={"openai_api_key": STUB_API_KEY},
+        ):
+            result = translate_csv_column_background(
+                "source",
+                "target",
+                file_content=synthetic_csv(SOURCES),
+                direction="en_to_th",
+                model_provider="openai",
+                model=STUB_MODEL,
+            )
+
+        self.assertTrue(result["success"])
+        job_id = result["job_id"]
+        progress = get_csv_translation_progress(job_id)
+        self.assertEqual(progress["status"], "completed")
+        self.assertEqual((progress["translated_count"], progress["unique_sent"]), (3, 2))
+        self.file_url = progress["file_url"]
+        self.assertEqual([event for event, _ in published], ["csv_translation_complete"])
+        self.assertEqual(published[0][1]["job_id"], job_id)
+        self.assertEqual(published[0][1]["status"], "completed")
+
+        self.assertFalse(
+            os.path.exists(frappe.get_site_path("private", "files", f"csv_translation_{job_id}_input.csv"))
+        )
+        self.assertTrue(frappe.db.exists("File", {"file_url": self.file_url}))
+        with open(frappe.get_site_path(self.file_url.lstrip("/")), encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row["target"] for row in rows], [stub_translate(source) for source in SOURCES])
@@ -0,0 +1,27 @@
+# Copyright (c) 2025, Manot Luijiu and contributors
+# For license information, please see license.txt
+
+import unittest
+
+from translation_tools.utils.glossary_matcher import get_glossary_matcher
+from translation_tools.utils.translation_batching import select_glossary_terms
+
+
+class TestGlossaryMatcher(unittest.TestCase):
+    def test_glossary_matcher(self):
+        """Test that only the glossary terms occurring in the texts are selected"""
+        glossary = {
+            "Tax": "ภาษี",
+            "Sales Invoice": "ใบแจ้งหนี้การขาย",
+            "Invoice": "ใบแจ้งหนี้",
+            "Item": "สินค้า",
+            "": "ว่าง",
+        }
+
+        self.assertEqual(
+            select_glossary_terms(glossary, ["Submit the sales invoice", "Taxes and Charges"]),
+            {"Tax": "ภาษี", "Sales Invoice": "ใบแจ้งหนี้การขาย", "Invoice": "ใบแจ้งหนี้"},
+        )
+        # Terms must start at a word boundary
+        self.assertEqual(select_glossary_terms(glossary, ["Syntax error"]), {})
+        self.assertIs(get_glossary_matcher(dict(glossary)), get_glossary_matcher(glossary))
@@ -0,0 +1,297 @@
+# Copyright (c) 2025, Manot Luijiu and contributors
+# For license information, please see license.txt
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import polib
+
+from translation_tools.utils.po_catalog import (
+    CatalogCache,
+    entry_key,
+    file_signature,
+    load_po_file,
+    parse_po_content,
+)
+from translation_tools.utils.po_scanner import count_po_entries
+
+PO_CONTENT = """msgid ""
+msgstr ""
+"Content-Type: text/plain; charset=UTF-8\\n"
+"Language: th\\n"
+"PO-Revision-Date: 2025-01-01 00:00+0000\\n"
+
+msgid "Customer"
+msgstr "ลูกค้า"
+
+msgid "Supplier"
+msgstr ""
+
+msgctxt "Navbar"
+msgid "Customer"
+msgstr ""
+"""
+
+
+class TestPOCatalogCache(unittest.TestCase):
+    def setUp(self):
+        """Create a scratch directory with a small PO file"""
+        self.tmpdir = tempfile.mkdtemp()
+        self.po_path = os.path.join(self.tmpdir, "th.po")
+        self.write_po(PO_CONTENT)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def write_po(self, content, bom=False):
+        data = content.encode("utf-8")
+        if bom:
+            data = b"\xef\xbb\xbf" + data
+        with open(self.po_path, "wb") as f:
+            f.write(data)
+
+    def test_repeated_get_is_a_hit(self):
+        """Test that an unchanged file is parsed only once"""
+        cache = CatalogCache()
+        first = cache.get(self.po_path)
+        second = cache.get(self.po_path)
+
+        self.assertIs(first, second)
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hits, 1)
+        # Per-file load locks do not outlive the load
+        self.assertEqual(cache._load_locks, {})
+
+    def test_external_change_invalidates(self):
+        """Test that a file edited on disk is reparsed"""
+        cache = CatalogCache()
+        first = cache.get(self.po_path)
+
+        self.write_po(PO_CONTENT.replace('msgstr ""\n', 'msgstr "ผู้จำหน่าย"\n'))
+        second = cache.get(self.po_path)
+
+        self.assertIsNot(first, second)
+        self.assertEqual(cache.invalidations, 1)
+        self.assertEqual(second.po.find("Supplier").msgstr, "ผู้จำหน่าย")
+
+    def test_own_save_keeps_catalog(self):
+        """Test that mark_saved keeps the catalog valid after our own write"""
+        cache = CatalogCache()
+        catalog = cache.get(self.po_path)
+
+        with catalog.lock:
+            catalog.po.find("Supplier").msgstr = "ผู้จำหน่าย"
+            catalog.po.save(self.po_path)
+            catalog.mark_saved()
+
+        self.assertIs(cache.get(self.po_path), catalog)
+
+    def test_eviction_respects_budget(self):
+        """Test that least recently used catalogs are evicted"""
+        other_path = os.path.join(self.tmpdir, "other.po")
+        shutil.copy(self.po_path, other_path)
+
+        cache = CatalogCache(memory_budget=1)
+        cache.get(self.po_path)
+        cache.get(other_path)
+
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.stats()["files"], [os.path.realpath(other_path)])
+
+    def test_load_with_bom(self):
+        """Test that a UTF-8 BOM does not break parsing"""
+        self.write_po(PO_CONTENT, bom=True)
+        po = load_po_file(self.po_path)
+
+        self.assertIsInstance(po, polib.POFile)
+        self.assertEqual(po.find("Customer").msgstr, "ลูกค้า")
+        self.assertEqual(po.fpath, self.po_path)
+
+    def test_parse_content_in_memory(self):
+        """Test parsing bytes and text, with and without a BOM"""
+        for data in (
+            PO_CONTENT.encode("utf-8"),
+            b"\xef\xbb\xbf" + PO_CONTENT.encode("utf-8"),
+            "\ufeff" + PO_CONTENT,
+        ):
+            po = parse_po_content(data)
+            self.assertEqual(len(po), 3)
+            self.assertEqual(po.find("Customer").msgstr, "ลูกค้า")
+            self.assertIsNone(po.fpath)
+
+    def test_entry_key_is_stable(self):
+        """Test that entry IDs depend on msgctxt and msgid, not position"""
+        po = load_po_file(self.po_path)
+        keys = [entry_key(entry) for entry in po]
+
+        reordered = polib.POFile()
+        for entry in reversed(list(po)):
+            reordered.append(entry)
+
+        self.assertEqual(len(set(keys)), 3)
+        self.assertEqual(sorted(keys), sorted(entry_key(entry) for entry in reordered))
+
+    def test_find_entry(self):
+        """Test lookups by stable ID and by msgid fallback"""
+        catalog = CatalogCache().get(self.po_path)
+        navbar = catalog.po[2]
+
+        self.assertEqual(catalog.find_entry(entry_key(navbar)), (2, navbar))
+        self.assertEqual(catalog.find_entry("stale-id", "Supplier")[0], 1)
+        self.assertEqual(catalog.find_entry("stale-id"), (None, None))
+
+    def test_flush_patches_changed_entries(self):
+        """Test that flush rewrites only the changed msgstr blocks and header date"""
+        catalog = CatalogCache().get(self.po_path)
+
+        catalog.set_msgstr(catalog.po[1], "ผู้จำหน่าย")
+        catalog.set_msgstr(catalog.po[2], "ลูกค้า\nบรรทัดที่สอง")
+        catalog.po.metadata["PO-Revision-Date"] = "2025-06-01 10:00+0700"
+
+        self.assertEqual(catalog.flush(), 2)
+        self.assertEqual(catalog.flush(), 0)
+        self.assertTrue(catalog.is_fresh(file_signature(self.po_path)))
+
+        with open(self.po_path, encoding="utf-8") as f:
+            content = f.read()
+        expected = (
+            PO_CONTENT.replace("2025-01-01 00:00+0000", "2025-06-01 10:00+0700")
+            .replace('msgstr ""\n\nmsgctxt', 'msgstr "ผู้จำหน่าย"\n\nmsgctxt')
+            .replace('"Customer"\nmsgstr ""\n', '"Customer"\nmsgstr ""\n"ลูกค้า\\n"\n"บรรทัดที่สอง"\n')
+        )
+        self.assertEqual(content, expected)
+
+    def test_flush_keeps_crlf_line_endings(self):
+        """Test that patching a CRLF catalog does not mix in LF line endings"""
+        with open(self.po_path, "wb") as f:
+            f.write(PO_CONTENT.replace("\n", "\r\n").encode("utf-8"))
+        catalog = CatalogCache().get(self.po_path)
+
+        catalog.set_msgstr(catalog.po[2], "ลูกค้า\nบรรทัดที่สอง")
+        self.assertEqual(catalog.flush(), 1)
+
+        with open(self.po_path, "rb") as f:
+            data = f.read()
+        self.assertEqual(data.count(b"\n"), data.count(b"\r\n"))
+        self.assertIn('"บรรทัดที่สอง"\r\n'.encode("utf-8"), data)
+
+    def test_flush_on_externally_changed_file(self):
+        """Test that a flush keeps edits made to the file by someone else"""
+        catalog = CatalogCache().get(self.po_path)
+
+        external = polib.pofile(self.po_path)
+        external[0].msgstr = "ลูกค้า (แก้ไข)"
+        external.save(self.po_path)
+
+        catalog.set_msgstr(catalog.po[1], "ผู้จำหน่าย")
+        catalog.flush()
+
+        saved = polib.pofile(self.po_path)
+        self.assertEqual(saved[0].msgstr, "ลูกค้า (แก้ไข)")
+        self.assertEqual(saved[1].msgstr, "ผู้จำหน่าย")
+        self.assertFalse(catalog.is_fresh(file_signature(self.po_path)))
+
+    def test_unpatchable_flush_keeps_external_changes(self):
+        """Test that a file someone else changed is never rewritten from our copy"""
+        catalog = CatalogCache().get(self.po_path)
+
+        external = polib.pofile(self.po_path)
+        external[0].msgstr = "ลูกค้า (แก้ไข)"
+        external.remove(external[2])
+        external.save(self.po_path)
+
+        catalog.set_msgstr(catalog.po[1], "ผู้จำหน่าย")
+        catalog.set_msgstr(catalog.po[2], "ลูกค้า")
+        catalog.flush()
+
+        saved = polib.pofile(self.po_path)
+        self.assertEqual([entry.msgstr for entry in saved], ["ลูกค้า (แก้ไข)", "ผู้จำหน่าย"])
+        self.assertFalse(catalog.is_fresh(file_signature(self.po_path)))
+
+    def test_search(self):
+        """Test ranked substring search across msgid, msgstr and msgctxt"""
+        catalog = CatalogCache().get(self.po_path)
+
+        self.assertEqual(catalog.search("customer"), [0, 2])
+        self.assertEqual(catalog.search("ลูกค้า"), [0])
+        self.assertEqual(catalog.search("navbar"), [2])
+        self.assertEqual(catalog.search("navbar CUSTOMER"), [2])
+        self.assertEqual(catalog.search("supp"), [1])
+        self.assertEqual(catalog.search("   "), [])
+
+        # Saved translations are searchable straight away, replaced ones are not
+        catalog.set_msgstr(catalog.po[1], "ผู้จำหน่าย")
+        self.assertEqual(catalog.search("จำหน่าย"), [1])
+        catalog.set_msgstr(catalog.po[1], "ผู้ขาย")
+        self.assertEqual(catalog.search("จำหน่าย"), [])
+        self.assertEqual(catalog.search("ผู้ขาย"), [1])
+        # Tokens share trigrams with an entry without occurring in it
+        self.assertEqual(catalog.search("custcust"), [])
+
+    def test_stats_follow_saves(self):
+        """Test that catalog stats match polib and are updated by delta"""
+        catalog = CatalogCache().get(self.po_path)
+        stats = catalog.stats
+
+        self.assertEqual(stats.total, 3)
+        self.assertEqual(stats.translated, len(catalog.po.translated_entries()))
+        self.assertEqual(stats.untranslated, 2)
+        self.assertEqual(stats.with_msgstr, 1)
+
+        catalog.set_msgstr(catalog.po[1], "ผู้จำหน่าย")
+        self.assertEqual((stats.translated, stats.untranslated, stats.without_msgstr), (2, 1, 1))
+
+        catalog.set_msgstr(catalog.po[0], "")
+        self.assertEqual((stats.translated, stats.untranslated, stats.without_msgstr), (1, 2, 2))
+
+    def test_untranslated_navigation(self):
+        """Test next/previous/n-th untranslated lookups as entries are saved"""
+        catalog = CatalogCache().get(self.po_path)
+
+        self.assertEqual(catalog.untranslated_positions, [1, 2])
+        self.assertEqual(catalog.next_untranslated(2), 2)
+        self.assertIsNone(catalog.next_untranslated(3))
+        self.assertEqual(catalog.previous_untranslated(2), 1)
+        self.assertIsNone(catalog.previous_untranslated(1))
+        self.assertEqual(catalog.nth_untranslated(1), 2)
+
+        catalog.set_msgstr(catalog.po[1], "ผู้จำหน่าย")
+        catalog.set_msgstr(catalog.po[0], "")
+        self.assertEqual(catalog.untranslated_positions, [0, 2])
+        self.assertEqual(catalog.untranslated_rank(2), 1)
+
+    def test_streaming_counts_match_polib(self):
+        """Test that the streaming counter agrees with polib's entry classes"""
+        self.write_po(
+            PO_CONTENT
+            + """
+#, fuzzy, python-format
+msgid "Item %s"
+msgstr "สินค้า %s"
+
+msgid "Day"
+msgid_plural "Days"
+msgstr[0] "วัน"
+msgstr[1] ""
+
+#~| msgid "Old"
+#~ msgid "Removed"
+#~ msgstr "ลบแล้ว"
+"""
+        )
+        po = polib.pofile(self.po_path)
+
+        self.assertEqual(
+            count_po_entries(self.po_path),
+            {
+                "total": len(po),
+                "translated": len(po.translated_entries()),
+                "untranslated": len(po.untranslated_entries()),
+                "fuzzy": len(po.fuzzy_entries()),
+                "obsolete": len(po.obsolete_entries()),
+                "with_msgstr": sum(1 for entry in po if entry.msgstr),
+            },
+        )
+        self.assertEqual(count_po_entries(self.po_path)["total"], 6)
@@ -0,0 +1,87 @@
+# Copyright (c) 2025, Manot Luijiu and contributors
+# For license information, please see license.txt
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from translation_tools.utils.po_file_sync import (
+    CHANGED,
+    NEW,
+    TOUCHED,
+    UNCHANGED,
+    classify_rescan,
+    plan_po_file_sync,
+)
+
+PO_CONTENT = """msgid ""
+msgstr ""
+"Content-Type: text/plain; charset=UTF-8\\n"
+"Language: th\\n"
+
+msgid "Supplier"
+msgstr ""
+"""
+
+
+class TestPOFileSync(unittest.TestCase):
+    def setUp(self):
+        """Create a scratch directory with a small PO file"""
+        self.tmpdir = tempfile.mkdtemp()
+        self.po_path = os.path.join(self.tmpdir, "th.po")
+        self.write_po(PO_CONTENT)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def write_po(self, content):
+        with open(self.po_path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def test_plan_po_file_sync(self):
+        """Test the diff of scanned rows against existing PO File records"""
+        row = {
+            "file_path": "apps/erpnext/erpnext/locale/th.po",
+            "app_name": "erpnext",
+            "filename": "th.po",
+            "language": "th",
+            "total_entries": 10,
+            "translated_entries": 5,
+            "translation_status": 50,
+            "last_modified": "2025-01-01 10:00:00",
+        }
+        existing = {
+            **row,
+            "name": row["file_path"],
+            "translation_status": 50.0,
+            "last_modified": datetime(2025, 1, 1, 10, 0, 0),
+        }
+        changed = {**row, "file_path": "apps/hrms/hrms/locale/th.po", "translated_entries": 6}
+        new = {**row, "file_path": "apps/crm/crm/locale/th.po"}
+
+        inserts, updates, unchanged = plan_po_file_sync(
+            [row, changed, new],
+            [existing, {**existing, "name": changed["file_path"]}],
+        )
+
+        self.assertEqual(inserts, [new])
+        self.assertEqual(updates, {changed["file_path"]: {"translated_entries": 6}})
+        self.assertEqual(unchanged, [row["file_path"]])
+
+    def test_classify_rescan(self):
+        """Test that files are hashed after a stat change and reparsed after a content change"""
+        state, fingerprint = classify_rescan(self.po_path, None)
+        self.assertEqual(state, NEW)
+        record = dict(fingerprint)
+
+        self.assertEqual(classify_rescan(self.po_path, record)[0], UNCHANGED)
+        self.assertEqual(classify_rescan(self.po_path, record, force=True)[0], CHANGED)
+
+        # Same content, new mtime
+        os.utime(self.po_path, ns=(0, int(record["file_mtime_ns"]) + 1_000_000_000))
+        self.assertEqual(classify_rescan(self.po_path, record)[0], TOUCHED)
+
+        self.write_po(PO_CONTENT.replace('msgstr ""\n', 'msgstr "ผู้จำหน่าย"\n'))
+        self.assertEqual(classify_rescan(self.po_path, record)[0], CHANGED)
@@ -0,0 +1,41 @@
+# Copyright (c) 2025, Manot Luijiu and contributors
+# For license information, please see license.txt
+
+import unittest
+from types import SimpleNamespace
+
+from translation_tools.utils.prompt_cache import PromptUsage, record_usage, variable_message
+
+
+class TestPromptCache(unittest.TestCase):
+    def test_prompt_cache_usage(self):
+        """Test that cached and uncached input tokens are told apart per provider"""
+        openai_usage = SimpleNamespace(
+            prompt_tokens=1500,
+            completion_tokens=40,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=1280),
+        )
+        anthropic_usage = SimpleNamespace(
+            input_tokens=60,
+            output_tokens=30,
+            cache_read_input_tokens=0,
+            cache_creation_input_tokens=1100,
+        )
+        first, second = {}, {}
+        record_usage(first, openai_usage)
+        record_usage(second, anthropic_usage)
+        self.assertEqual((first["input_tokens"], first["cached_input_tokens"], first["tokens"]), (220, 1280, 1540))
+        self.assertEqual((second["cache_write_tokens"], second["tokens"]), (1100, 1190))
+
+        job = PromptUsage()
+        job.add(first)
+        job.add(second)
+        stats = job.as_dict()
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["cache_hit_ratio"], round(1280 / 2660, 3))
+
+        # The glossary belongs to the variable part, after the cached prefix
+        self.assertEqual(variable_message("Sales Invoice"), "Sales Invoice")
+        message = variable_message("Sales Invoice", {"Invoice": "ใบแจ้งหนี้"})
+        self.assertTrue(message.startswith("GLOSSARY"))
+        self.assertTrue(message.endswith("TEXT:\nSales Invoice"))
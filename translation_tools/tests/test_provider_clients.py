@@ -0,0 +1,19 @@
+# Copyright (c) 2025, Manot Luijiu and contributors
+# For license information, please see license.txt
+
+import importlib.util
+import unittest
+
+
+class TestProviderClients(unittest.TestCase):
+    @unittest.skipUnless(importlib.util.find_spec("openai"), "openai is not installed")
+    def test_provider_client_registry(self):
+        """Test that provider clients are reused per key and rebuilt after a fork"""
+        from translation_tools.utils import provider_clients
+
+        client = provider_clients.get_provider_client("openai", "sk-test")
+        self.assertIs(provider_clients.get_provider_client("openai", "sk-test"), client)
+        self.assertIsNot(provider_clients.get_provider_client("openai", "sk-other"), client)
+
+        provider_clients._reset_after_fork()
+        self.assertIsNot(provider_clients.get_provider_client("openai", "sk-test"), client)
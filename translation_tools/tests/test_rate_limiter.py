@@ -0,0 +1,60 @@
+# Copyright (c) 2025, Manot Luijiu and contributors
+# For license information, please see license.txt
+
+import threading
+import unittest
+
+from translation_tools.utils.rate_limiter import (
+    get_rate_limiter,
+    observe,
+    parse_rate_limit_headers,
+    take,
+)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_rate_limiter_bucket(self):
+        """Test the token bucket, header parsing and backoff of the provider rate limiter"""
+        limits = parse_rate_limit_headers(
+            {
+                "x-ratelimit-limit-requests": "60",
+                "x-ratelimit-limit-tokens": "6000",
+                "x-ratelimit-remaining-requests": "59",
+                "x-ratelimit-reset-tokens": "6m0.5s",
+                "retry-after": "20ms",
+            }
+        )
+        self.assertEqual((limits["rpm"], limits["tpm"], limits["remaining_requests"]), (60, 6000, 59))
+        self.assertEqual((limits["reset_tokens"], limits["retry_after"]), (360.5, 0.02))
+
+        state = {}
+        observe(state, 0, limits)
+        self.assertEqual(take(state, 0, 3000), 0)
+        self.assertEqual(take(state, 0, 3000), 0)
+        # The token bucket refills at 100 tokens per second
+        self.assertAlmostEqual(take(state, 0, 500), 5)
+        self.assertEqual(take(state, 5, 500), 0)
+
+        # A 429 halves the usable share and pauses until retry-after
+        observe(state, 5, {"retry_after": 2}, throttled=True)
+        self.assertEqual(state["factor"], 0.5)
+        self.assertAlmostEqual(take(state, 6, 1), 1)
+        self.assertEqual(take(state, 7.5, 1), 0)
+
+    def test_limiter_used_from_worker_thread(self):
+        """Test that a limiter created on the main thread keeps its options on worker threads"""
+        limiter = get_rate_limiter(
+            "openai", "gpt-4.1-mini", "sk-worker-test", lambda: {"default_rpm": 60, "default_tpm": 6000}
+        )
+        seen = []
+
+        def worker():
+            # Workers have no site config, their configure() would only give defaults
+            seen.append(get_rate_limiter("openai", "gpt-4.1-mini", "sk-worker-test", dict))
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        self.assertIs(seen[0], limiter)
+        self.assertEqual((seen[0].default_rpm, seen[0].default_tpm), (60, 6000))
@@ -0,0 +1,70 @@
+# Copyright (c) 2025, Manot Luijiu and contributors
+# For license information, please see license.txt
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from functools import partial
+from unittest.mock import patch
+
+import frappe
+
+from translation_tools.api.ai_translation import stream_translate_batch
+from translation_tools.api.common import get_bench_path
+from translation_tools.api.translation_memory import TM_DOCTYPE
+from translation_tools.utils.po_catalog import entry_key
+from translation_tools.utils.stub_provider import STUB_API_KEY, STUB_MODEL, disable, enable, stub_translate
+from translation_tools.utils.translation_benchmark import write_catalog
+
+
+class TestStreamTranslateBatch(unittest.TestCase):
+    def setUp(self):
+        """Create a PO file inside the bench and answer requests with the stub provider"""
+        bench_path = get_bench_path()
+        self.tmpdir = tempfile.mkdtemp(dir=os.path.join(bench_path, "logs"))
+        po_path = os.path.join(self.tmpdir, "th.po")
+        self.po = write_catalog(po_path, ["Streamed test customer", "Streamed test supplier"])
+        self.file_path = os.path.relpath(po_path, bench_path)
+        enable(latency=0)
+
+    def tearDown(self):
+        disable()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+        frappe.db.delete(TM_DOCTYPE, {"model": STUB_MODEL})
+        frappe.db.commit()
+
+    def test_job_publishes_events(self):
+        """Test that the queued job runs and tags its events with the client's id"""
+        published = []
+
+        def publish_realtime(event, message=None, **kwargs):
+            published.append((event, message))
+
+        with patch("frappe.enqueue", partial(frappe.enqueue, now=True)), patch(
+            "frappe.publish_realtime", publish_realtime
+        ), patch(
+            "translation_tools.api.ai_translation.get_decrypted_api_keys",
+            return_value={"openai_api_key": STUB_API_KEY},
+        ):
+            result = stream_translate_batch(
+                self.file_path,
+                json.dumps([entry_key(entry) for entry in self.po]),
+                model_provider="openai",
+                model=STUB_MODEL,
+                stream_job_id="stream-test-job",
+            )
+
+        self.assertEqual(result["job_id"], "stream-test-job")
+        events = [event for event, _ in published]
+        self.assertIn("translation_stream", events)
+        self.assertEqual(events[-1], "translation_stream_complete")
+
+        complete = published[-1][1]
+        self.assertTrue(complete["success"])
+        self.assertTrue(all(message["job_id"] == "stream-test-job" for _, message in published))
+        self.assertEqual(
+            complete["translations"],
+            {entry_key(entry): stub_translate(entry.msgid) for entry in self.po},
+        )
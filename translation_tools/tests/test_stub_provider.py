@@ -0,0 +1,35 @@
+# Copyright (c) 2025, Manot Luijiu and contributors
+# For license information, please see license.txt
+
+import importlib.util
+import json
+import unittest
+
+from translation_tools.utils.stub_provider import StubProvider, answer, stub_translate
+
+
+class TestStubProvider(unittest.TestCase):
+    def test_stub_provider(self):
+        """Test that the stub provider answers each prompt format and throttles"""
+        chunk_answer = json.loads(
+            answer(
+                'OUTPUT: only a JSON object of the form {"translations": {...}}',
+                'INPUT:\n[{"id": "a1", "text": "Customer"}]',
+            )
+        )
+        self.assertEqual(
+            chunk_answer, {"translations": [{"id": "a1", "translation": stub_translate("Customer")}]}
+        )
+        csv_prompt = "Example format:\n1. [translated text]\n\nTranslate from English to Thai:\n\n1. Tax\n2. Price\n\nThai translations (numbered list only):"
+        self.assertEqual(answer("", csv_prompt), f"1. {stub_translate('Tax')}\n2. {stub_translate('Price')}")
+
+        stub = StubProvider(latency=0, rate_limit_rpm=2)
+        create = stub.client("openai").chat.completions.with_raw_response.create
+        response = create(model="stub-model", messages=[{"role": "user", "content": "Warehouse"}])
+        self.assertEqual(response.parse().choices[0].message.content, stub_translate("Warehouse"))
+        self.assertEqual(response.headers["x-ratelimit-remaining-requests"], "1")
+        create(model="stub-model", messages=[{"role": "user", "content": "Stock"}])
+        if importlib.util.find_spec("openai") and importlib.util.find_spec("httpx"):
+            with self.assertRaises(Exception):
+                create(model="stub-model", messages=[{"role": "user", "content": "Ledger"}])
+            self.assertEqual(stub.stats(), {"calls": 3, "errors": 0, "throttled": 1})
@@ -0,0 +1,101 @@
+# Copyright (c) 2025, Manot Luijiu and contributors
+# For license information, please see license.txt
+
+import json
+import unittest
+
+from translation_tools.utils.translation_batching import (
+    EMPTY,
+    MISSING,
+    PLACEHOLDERS,
+    ChunkStreamParser,
+    ParseStats,
+    check_translation,
+    failure_rate,
+    item_cost,
+    pack_chunks,
+    parse_chunk_response,
+    validate_chunk_response,
+)
+
+
+class TestTranslationBatching(unittest.TestCase):
+    def test_pack_chunks_by_token_budget(self):
+        """Test that chunks respect the token budget and item cap, in order"""
+        items = [(f"id{n}", "Sales Invoice " * (1 + n % 4)) for n in range(40)]
+        budget = 300
+
+        chunks = pack_chunks(items, token_budget=budget, max_items=8)
+
+        self.assertEqual([item for chunk in chunks for item in chunk], items)
+        for chunk in chunks:
+            self.assertLessEqual(len(chunk), 8)
+            self.assertLessEqual(sum(item_cost(text) for _, text in chunk), budget)
+
+        # An item over budget still gets sent, on its own
+        huge = ("big", "x" * 5000)
+        self.assertEqual(
+            pack_chunks([items[0], huge, items[1]], token_budget=budget),
+            [[items[0]], [huge], [items[1]]],
+        )
+
+    def test_parse_chunk_response(self):
+        """Test the accepted JSON shapes and that bad items are left for retry"""
+        chunk = [("a", "Customer"), ("b", "Supplier"), ("c", "Item")]
+
+        self.assertEqual(
+            parse_chunk_response('{"translations": {"a": "ลูกค้า", "b": " ", "x": "?"}}', chunk),
+            {"a": "ลูกค้า"},
+        )
+        self.assertEqual(
+            parse_chunk_response('```json\n[{"id": "c", "translation": "สินค้า"}]\n```', chunk),
+            {"c": "สินค้า"},
+        )
+        self.assertEqual(parse_chunk_response('{"b": "ผู้จำหน่าย"}', chunk), {"b": "ผู้จำหน่าย"})
+        self.assertEqual(parse_chunk_response("Entry a: ลูกค้า", chunk), {})
+
+    def test_chunk_stream_parser(self):
+        """Test that streamed JSON answers yield each item once it is complete"""
+        chunk = [(0, "Customer"), (1, "Supplier"), (2, "Item")]
+        answer = '```json\n{"translations": {"0": "ลูกค้า", "1": "ผู้จำหน่าย \\"A\\"", "2": "", "7": "x"}}\n```'
+        parser = ChunkStreamParser(chunk)
+        seen = []
+        for start in range(0, len(answer), 5):
+            for item in parser.feed(answer[start : start + 5]):
+                seen.append((start, item))
+
+        self.assertEqual([item for _, item in seen], [(0, "ลูกค้า"), (1, 'ผู้จำหน่าย "A"')])
+        # The first item is available long before the answer is complete
+        self.assertLess(seen[0][0], answer.index('"1"'))
+        self.assertEqual(parse_chunk_response(answer, chunk), dict(item for _, item in seen))
+
+    def test_validate_chunk_response(self):
+        """Test that missing, empty and placeholder-breaking items are rejected"""
+        chunk = [("a", "Row {0}: {1} not found"), ("b", "%(count)s items"), ("c", "Item"), ("d", "Tax")]
+        answer = {
+            "translations": [
+                {"id": "a", "translation": "แถว {0}: ไม่พบ {1}"},
+                {"id": "b", "translation": "%s รายการ"},
+                {"id": "c", "translation": " "},
+                {"id": "x", "translation": "?"},
+            ]
+        }
+        translations, invalid = validate_chunk_response(answer, chunk)
+        self.assertEqual(translations, {"a": "แถว {0}: ไม่พบ {1}"})
+        self.assertEqual(invalid, {"b": PLACEHOLDERS, "c": EMPTY, "d": MISSING})
+        self.assertEqual(validate_chunk_response("not json", chunk)[1]["a"], MISSING)
+        self.assertIsNone(check_translation("100% sure", "มั่นใจ 100%"))
+
+        # Items of the schema's list are streamed as soon as they complete
+        parser = ChunkStreamParser(chunk)
+        streamed = json.dumps(answer, ensure_ascii=False)
+        self.assertEqual(
+            [item for start in range(0, len(streamed), 7) for item in parser.feed(streamed[start : start + 7])],
+            [("a", "แถว {0}: ไม่พบ {1}")],
+        )
+
+        stats = ParseStats()
+        stats.add("gpt-4.1-mini", len(chunk), invalid)
+        counts = stats.as_dict()["gpt-4.1-mini"]
+        self.assertEqual((counts["items"], counts[MISSING]), (4, 1))
+        self.assertEqual(failure_rate(counts), 75)
@@ -0,0 +1,29 @@
+# Copyright (c) 2025, Manot Luijiu and contributors
+# For license information, please see license.txt
+
+import unittest
+
+from translation_tools.utils.translation_dedup import plan_deduplicated_translation
+
+
+class TestTranslationDedup(unittest.TestCase):
+    def test_plan_deduplicated_translation(self):
+        """Test grouping of untranslated entries across catalogs"""
+        plan = plan_deduplicated_translation(
+            [
+                (("erpnext/th.po", 1), "Company", None, "th"),
+                (("hrms/th.po", 9), "Company", "Report", "th"),
+                (("erpnext/vi.po", 1), "Company", None, "vi"),
+                (("frappe/th.po", 4), "Company", None, "th"),
+            ]
+        )
+
+        self.assertEqual(plan.as_dict(), {"occurrences": 4, "unique": 3, "calls_saved": 1})
+        self.assertEqual(
+            plan.groups[0].targets,
+            [("erpnext/th.po", 1), ("frappe/th.po", 4)],
+        )
+        self.assertEqual(
+            {language: len(groups) for language, groups in plan.by_language().items()},
+            {"th": 2, "vi": 1},
+        )
@@ -0,0 +1,48 @@
+# Copyright (c) 2025, Manot Luijiu and contributors
+# For license information, please see license.txt
+
+import threading
+import time
+import unittest
+
+from translation_tools.utils.translation_executor import TranslationExecutor
+
+
+class TestTranslationExecutor(unittest.TestCase):
+    def test_translation_executor(self):
+        """Test bounded concurrency, ordered results, failures and checkpoints"""
+        lock = threading.Lock()
+        in_flight = []
+        peak = []
+
+        def translate(n):
+            with lock:
+                in_flight.append(n)
+                peak.append(len(in_flight))
+            time.sleep(0.002 * (n % 3))
+            with lock:
+                in_flight.remove(n)
+            if n == 7:
+                raise ValueError("provider error")
+            return f"t{n}", 10
+
+        applied = []
+        failed = []
+        checkpoints = []
+        executor = TranslationExecutor(
+            translate,
+            concurrency=3,
+            checkpoint_every=4,
+            on_checkpoint=lambda stats: checkpoints.append(stats.translated),
+        )
+        stats = executor.run(
+            range(12),
+            lambda n, text: applied.append((n, text)),
+            on_error=lambda n, e: failed.append(n),
+        )
+
+        self.assertEqual(applied, [(n, f"t{n}") for n in range(12) if n != 7])
+        self.assertEqual(failed, [7])
+        self.assertLessEqual(max(peak), 3)
+        self.assertEqual(checkpoints, [4, 8, 11])
+        self.assertEqual((stats.translated, stats.failed, stats.tokens), (11, 1, 110))
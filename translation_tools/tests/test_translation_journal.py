@@ -0,0 +1,50 @@
+# Copyright (c) 2025, Manot Luijiu and contributors
+# For license information, please see license.txt
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from translation_tools.utils.translation_journal import TranslationJournal
+
+
+class TestTranslationJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_translation_journal_resume(self):
+        """Test that a journal replays received but unsaved translations"""
+        path = os.path.join(self.tmpdir, "journal", "job.jsonl")
+        journal = TranslationJournal(path)
+        journal.start(3, "openai", "gpt-4.1-mini")
+        for key, msgstr in (("a", "ลูกค้า"), ("b", "ผู้จำหน่าย")):
+            journal.sent(key)
+            journal.received(key, msgstr, tokens=10)
+        journal.sent("c")
+        journal.applied(["a"])
+        journal.close()
+        # A worker killed mid-write leaves a torn line
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"event": "rece')
+
+        state = TranslationJournal(path).replay()
+        self.assertEqual(state.pending, {"b": "ผู้จำหน่าย"})
+        self.assertEqual(
+            {k: state.as_dict()[k] for k in ("total", "sent", "received", "applied", "tokens", "finished")},
+            {"total": 3, "sent": 3, "received": 2, "applied": 1, "tokens": 20, "finished": False},
+        )
+
+        journal = TranslationJournal(path)
+        journal.start(3, resumed=True)
+        journal.applied(["b"])
+        journal.finish()
+        self.assertTrue(TranslationJournal(path).replay().finished)
+
+        # The next job starts a fresh journal
+        journal.start(5)
+        journal.close()
+        self.assertEqual(TranslationJournal(path).replay().as_dict()["sent"], 0)
@@ -0,0 +1,22 @@
+# Copyright (c) 2025, Manot Luijiu and contributors
+# For license information, please see license.txt
+
+import unittest
+
+from translation_tools.utils.translation_memory import make_tm_key
+
+
+class TestTranslationMemory(unittest.TestCase):
+    def test_tm_key(self):
+        """Test which differences in a source text share a translation memory key"""
+        key = make_tm_key("Posting Date", None, "th", 3)
+
+        # Whitespace is part of the text a translation has to reproduce
+        self.assertNotEqual(make_tm_key("Posting Date ", None, "th", 3), key)
+        self.assertNotEqual(make_tm_key("Posting\nDate", None, "th", 3), key)
+        self.assertNotEqual(make_tm_key("posting date", None, "th", 3), key)
+        self.assertNotEqual(make_tm_key("Posting Date", "Report", "th", 3), key)
+        self.assertNotEqual(make_tm_key("Posting Date", None, "vi", 3), key)
+        self.assertNotEqual(make_tm_key("Posting Date", None, "th", 4), key)
+        # Composed and decomposed forms of the same text
+        self.assertEqual(make_tm_key("Caf\u00e9", None, "th", 0), make_tm_key("Cafe\u0301", None, "th", 0))
@@ -1,9 +1,108 @@
 # Copyright (c) 2025, Manot Luijiu and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from translation_tools.api.glossary import (
+	GLOSSARY_TERMS_KEY,
+	GLOSSARY_VERSION_KEY,
+	bump_glossary_version,
+	get_glossary_terms_dict,
+	get_glossary_version,
+)
+
+TEST_SOURCE_TERM = "Test Glossary Posting Date"
+
 
 class TestTranslationGlossaryTerm(FrappeTestCase):
-	pass
+	def setUp(self):
+		self.delete_test_terms()
+
+	def tearDown(self):
+		self.delete_test_terms()
+
+	def delete_test_terms(self):
+		for name in frappe.get_all(
+			"Translation Glossary Term", filters={"source_term": TEST_SOURCE_TERM}, pluck="name"
+		):
+			frappe.delete_doc("Translation Glossary Term", name, force=True)
+		frappe.db.commit()
+
+	def make_term(self, thai_translation="วันที่ผ่านรายการ"):
+		term = frappe.get_doc(
+			{
+				"doctype": "Translation Glossary Term",
+				"source_term": TEST_SOURCE_TERM,
+				"thai_translation": thai_translation,
+				"is_approved": 1,
+			}
+		).insert()
+		frappe.db.commit()
+		return term
+
+	def test_version_counter(self):
+		"""Test that bumps increment the version and survive a Redis flush"""
+		version = get_glossary_version()
+		self.assertEqual(bump_glossary_version(), version + 1)
+		self.assertEqual(get_glossary_version(), version + 1)
+
+		cache = frappe.cache()
+		cache.delete(cache.make_key(GLOSSARY_VERSION_KEY))
+		self.assertEqual(get_glossary_version(), version + 1)
+
+	def test_bump_waits_for_commit(self):
+		"""Test that a saved term bumps the version once, after the commit"""
+		version = get_glossary_version()
+		term = frappe.get_doc(
+			{
+				"doctype": "Translation Glossary Term",
+				"source_term": TEST_SOURCE_TERM,
+				"thai_translation": "วันที่ผ่านรายการ",
+				"is_approved": 1,
+			}
+		).insert()
+		term.thai_translation = "วันที่บันทึกบัญชี"
+		term.save()
+
+		self.assertEqual(get_glossary_version(), version)
+		frappe.db.commit()
+		self.assertEqual(get_glossary_version(), version + 1)
+
+	def test_unrelated_change_keeps_version(self):
+		"""Test that fields outside the glossary do not invalidate it"""
+		term = self.make_term()
+		version = get_glossary_version()
+
+		term.category = "Business"
+		term.save()
+		frappe.db.commit()
+
+		self.assertEqual(get_glossary_version(), version)
+
+	def test_edit_invalidates_cached_glossary(self):
+		"""Test that the process and Redis copies are not served after an edit"""
+		term = self.make_term()
+		self.assertEqual(get_glossary_terms_dict()[TEST_SOURCE_TERM], "วันที่ผ่านรายการ")
+		version = get_glossary_version()
+
+		term.thai_translation = "วันที่บันทึกบัญชี"
+		term.save()
+		frappe.db.commit()
+
+		self.assertEqual(get_glossary_version(), version + 1)
+		self.assertEqual(frappe.cache().get_value(GLOSSARY_TERMS_KEY)["version"], version)
+		self.assertEqual(get_glossary_terms_dict()[TEST_SOURCE_TERM], "วันที่บันทึกบัญชี")
+		self.assertEqual(frappe.cache().get_value(GLOSSARY_TERMS_KEY)["version"], version + 1)
+
+	def test_delete_invalidates_cached_glossary(self):
+		"""Test that a deleted term is gone from the next lookup"""
+		term = self.make_term()
+		self.assertIn(TEST_SOURCE_TERM, get_glossary_terms_dict())
+		version = get_glossary_version()
+
+		frappe.delete_doc("Translation Glossary Term", term.name)
+		frappe.db.commit()
+
+		self.assertEqual(get_glossary_version(), version + 1)
+		self.assertNotIn(TEST_SOURCE_TERM, get_glossary_terms_dict())
@@ -5,6 +5,8 @@ import frappe
 from frappe.model.document import Document
 from frappe.model.naming import make_autoname
 
+from translation_tools.api.glossary import queue_glossary_version_bump
+
 
 class TranslationGlossaryTerm(Document):
 	def autoname(self):
@@ -15,3 +17,14 @@ class TranslationGlossaryTerm(Document):
 		source = frappe.scrub(source).replace("_", "-")
 		# Generate sequential number
 		self.name = make_autoname(f"TERM-{source}-.####")
+
+	def on_update(self):
+		"""Invalidate cached glossaries when a term's translation changes"""
+		if any(
+			self.has_value_changed(field)
+			for field in ("source_term", "thai_translation", "is_approved")
+		):
+			queue_glossary_version_bump()
+
+	def on_trash(self):
+		queue_glossary_version_bump()
@@ -0,0 +1,10 @@
+# Copyright (c) 2025, Manot Luijiu and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class TranslationMemoryEntry(Document):
+	# Records are written in bulk by translation_tools.api.translation_memory
+	pass
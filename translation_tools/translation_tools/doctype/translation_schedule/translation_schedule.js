@@ -125,7 +125,8 @@ frappe.ui.form.on("Translation Schedule", {
             'update_po': __('Update PO translation files with new strings from the POT template'),
             'compile_mo': __('Compile PO files into binary MO files for runtime usage'),
             'migrate_csv_to_po': __('Migrate legacy CSV translations to the PO format'),
-            'full_workflow': __('Run complete translation workflow: Generate POT → Update PO → Compile MO')
+            'full_workflow': __('Run complete translation workflow: Generate POT → Update PO → Compile MO'),
+            'translate_untranslated': __('AI translate untranslated PO entries, translating each unique string once')
         };
         
         if (descriptions[frm.doc.command_type]) {
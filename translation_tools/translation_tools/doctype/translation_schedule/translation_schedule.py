@@ -230,14 +230,15 @@ class TranslationSchedule(Document):
             "update_po": f"update-po-files --app {self.app_name}",
             "compile_mo": f"compile-po-to-mo --app {self.app_name}",
             "migrate_csv_to_po": f"migrate-csv-to-po --app {self.app_name}",
-            "full_workflow": None  # Special handling
+            "full_workflow": None,  # Special handling
+            "translate_untranslated": None  # Special handling
         }
         
         base_command = command_map.get(self.command_type)
         
-        if self.command_type == "full_workflow":
+        if self.command_type in ("full_workflow", "translate_untranslated"):
             # Will be handled separately
-            return "full_workflow"
+            return self.command_type
             
         if not base_command:
             frappe.throw(f"Unknown command type: {self.command_type}")
@@ -252,6 +253,8 @@ class TranslationSchedule(Document):
         """Execute a bench command and return the result"""
         if command == "full_workflow":
             return self.run_full_workflow()
+        if command == "translate_untranslated":
+            return self.run_ai_translation()
             
         # Get the bench path
         bench_path = frappe.utils.get_bench_path()
@@ -312,6 +315,27 @@ class TranslationSchedule(Document):
             results.append(f"Error: {str(e)}")
             raise Exception("\n\n".join(results))
     
+    def run_ai_translation(self):
+        """AI translate the untranslated entries of the app's PO files, each unique string once"""
+        import os
+        from translation_tools.api.bulk_translation import AI_TRANSLATION_LOCALES
+        from translation_tools.api.translation import translate_po_files_deduplicated
+
+        locale_dir = os.path.join(frappe.utils.get_bench_path(), "apps", self.app_name, self.app_name, "locale")
+        locales = [self.locale] if self.locale and self.locale != "all" else AI_TRANSLATION_LOCALES
+        file_paths = [os.path.join(locale_dir, f"{locale}.po") for locale in locales]
+
+        summary = translate_po_files_deduplicated(file_paths)
+        if not summary.get("success"):
+            raise Exception(summary.get("error") or "AI translation failed")
+
+        return (
+            f"AI Translation: {summary['translated_unique']}/{summary['unique']} unique strings "
+            f"for {summary['occurrences']} entries in {summary['files']} files\n"
+            f"Calls saved by deduplication: {summary['calls_saved']}\n"
+            f"Provider requests: {summary['provider_requests']}"
+        )
+    
     def handle_execution_error(self, error, command):
         """Handle errors during command execution"""
         self.retry_count = (self.retry_count or 0) + 1
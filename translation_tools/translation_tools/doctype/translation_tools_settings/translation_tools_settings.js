@@ -1,8 +1,57 @@
 // Copyright (c) 2025, Manot Luijiu and contributors
 // For license information, please see license.txt
 
+const PROVIDER_LABELS = { openai: 'OpenAI', claude: 'Claude' };
+const CIRCUIT_COLORS = { closed: 'green', half_open: 'orange', open: 'red' };
+
+function show_provider_health(frm) {
+  frappe.call({
+    method: 'translation_tools.api.ai_translation.get_provider_health',
+    callback: function (r) {
+      if (!r.message || !r.message.providers) return;
+
+      let tripped = [];
+      r.message.providers.forEach(function (provider) {
+        let label = PROVIDER_LABELS[provider.provider] || provider.provider;
+        let status = {
+          closed: __('Healthy'),
+          half_open: __('Recovering'),
+          open: __('Unavailable, retry in {0}s', [provider.retry_in]),
+        }[provider.state];
+        frm.dashboard.add_indicator(
+          __('{0}: {1}', [label, status]),
+          CIRCUIT_COLORS[provider.state] || 'gray'
+        );
+        if (provider.state !== 'closed') tripped.push(provider.provider);
+      });
+
+      if (tripped.length) {
+        frm.add_custom_button(
+          __('Reset Circuit Breakers'),
+          function () {
+            Promise.all(
+              tripped.map(function (provider) {
+                return frappe.call({
+                  method:
+                    'translation_tools.api.ai_translation.reset_provider_circuit',
+                  args: { provider: provider },
+                });
+              })
+            ).then(function () {
+              frm.reload_doc();
+            });
+          },
+          __('More Actions')
+        );
+      }
+    },
+  });
+}
+
 frappe.ui.form.on('Translation Tools Settings', {
   refresh: function (frm) {
+    show_provider_health(frm);
+
     frm.add_custom_button(__('Test OpenAI'), function () {
       if (!frm.doc.openai_api_key) {
         frappe.msgprint(__('Please enter an OpenAI API key first'));
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark full polib parsing against the streaming entry counter
+Compares time and peak memory of polib.pofile() and count_po_entries() on the
+ERPNext and HRMS catalogs, and checks that both report the same counts.
+
+Usage:
+  python benchmark_po_parsing.py [options] [po_file_path ...]
+
+Options:
+  --bench-path=<path>   Bench directory used for the default catalogs (default: current directory)
+  --language=<code>     Catalog language for the default catalogs (default: th)
+  --repeat=<n>          Timed runs per parser, the best one is reported (default: 3)
+  --help                Show this help message
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import polib
+
+from translation_tools.utils.po_scanner import count_po_entries
+
+DEFAULT_APPS = ("erpnext", "hrms")
+
+
+def setup_argparse() -> argparse.Namespace:
+    """Set up command line argument parsing."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark polib parsing against the streaming PO entry counter"
+    )
+    parser.add_argument(
+        "po_file_paths",
+        nargs="*",
+        help="PO files to benchmark (default: ERPNext and HRMS catalogs of the bench)",
+    )
+    parser.add_argument(
+        "--bench-path", default=os.getcwd(), help="Bench directory (default: current directory)"
+    )
+    parser.add_argument("--language", default="th", help="Catalog language (default: th)")
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Timed runs per parser (default: 3)"
+    )
+    return parser.parse_args()
+
+
+def polib_counts(path):
+    """Entry counts computed from a full polib parse"""
+    po = polib.pofile(path)
+    return {
+        "total": len(po),
+        "translated": len(po.translated_entries()),
+        "untranslated": len(po.untranslated_entries()),
+        "fuzzy": len(po.fuzzy_entries()),
+        "obsolete": len(po.obsolete_entries()),
+        "with_msgstr": sum(1 for entry in po if entry.msgstr),
+    }
+
+
+def measure(func, path, repeat):
+    """Return (result, best time in seconds, peak traced memory in bytes)"""
+    best = None
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        result = func(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Memory is traced in a separate run, tracing slows the parsers down
+    tracemalloc.start()
+    try:
+        func(path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, best, peak
+
+
+def benchmark_file(path, repeat):
+    """Benchmark both parsers on one file and print the comparison"""
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    print(f"\n{path} ({size_mb:.1f} MB)")
+
+    expected, polib_time, polib_peak = measure(polib_counts, path, repeat)
+    counts, scan_time, scan_peak = measure(count_po_entries, path, repeat)
+
+    print(f"  {'parser':<16}{'time':>10}{'peak memory':>16}")
+    print(f"  {'polib.pofile':<16}{polib_time:>9.3f}s{polib_peak / 1024 / 1024:>14.1f}MB")
+    print(f"  {'streaming':<16}{scan_time:>9.3f}s{scan_peak / 1024 / 1024:>14.1f}MB")
+    if scan_time:
+        print(f"  speedup: {polib_time / scan_time:.1f}x, entries: {counts['total']}")
+
+    if counts != expected:
+        print(f"  MISMATCH: polib={expected} streaming={counts}")
+        return False
+    return True
+
+
+def main():
+    args = setup_argparse()
+    paths = args.po_file_paths or [
+        os.path.join(args.bench_path, "apps", app, app, "locale", f"{args.language}.po")
+        for app in DEFAULT_APPS
+    ]
+
+    ok = True
+    for path in paths:
+        if not os.path.isfile(path):
+            print(f"\nSkipping {path}: file not found")
+            continue
+        ok = benchmark_file(path, args.repeat) and ok
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+"""
+Per-provider circuit breakers for AI translation requests.
+
+When a provider degrades, every request waits for its timeout and is then
+retried, so a long job slows to a crawl. A breaker counts consecutive
+failed or slow requests of its provider and, past a threshold, opens: new
+requests fail at once with ProviderUnavailable, which callers use to route
+work to another provider or to pause. After a cooldown a single probe
+request is let through; its success closes the breaker, its failure opens
+it again for twice as long.
+
+The state is shared by all workers through the rate limiter's Redis state
+store, falling back to process state without Redis.
+"""
+
+import threading
+import time
+
+from translation_tools.utils.rate_limiter import LocalStateStore
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Consecutive failures that open the breaker
+DEFAULT_FAILURE_THRESHOLD = 5
+
+# A successful request slower than this counts as a failure
+DEFAULT_SLOW_CALL_SECONDS = 30
+
+# First cooldown, doubled on every reopening up to MAX_OPEN_SECONDS
+DEFAULT_OPEN_SECONDS = 60
+MAX_OPEN_SECONDS = 900
+
+# A half-open probe that never reports back frees its slot after this long
+PROBE_TIMEOUT = 180
+
+# Longest single sleep while waiting for a breaker
+MAX_SLEEP = 5
+
+# Breaker state outlives the longest cooldown
+STATE_TTL = 3600
+
+KEY_PREFIX = "translation_tools:circuit"
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+class ProviderUnavailable(Exception):
+    """Raised instead of sending a request while a provider's breaker is open"""
+
+    def __init__(self, provider, retry_in):
+        self.provider = provider
+        self.retry_in = retry_in
+        super().__init__(f"{provider} is unavailable, retry in {retry_in:.0f}s")
+
+
+def allow(state, now):
+    """
+    Check whether a request may be sent, taking the probe slot when half open
+
+    Returns:
+        float: 0 when allowed, otherwise seconds until the next attempt
+    """
+    opened_until = state.get("opened_until", 0)
+    if not opened_until:
+        return 0.0
+    if opened_until > now:
+        return opened_until - now
+    probe_until = state.get("probe_until", 0)
+    if probe_until > now:
+        return probe_until - now
+    state["probe_until"] = now + PROBE_TIMEOUT
+    return 0.0
+
+
+def record(
+    state,
+    now,
+    ok,
+    failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+    open_seconds=DEFAULT_OPEN_SECONDS,
+):
+    """
+    Update a breaker state with the outcome of a request
+
+    Returns:
+        bool: True when this outcome opened the breaker
+    """
+    if ok:
+        # A request sent before the breaker opened does not close it
+        if state.get("opened_until", 0) <= now:
+            state.update(failures=0, opened_until=0, probe_until=0, opens=0)
+        return False
+
+    failures = state.get("failures", 0) + 1
+    state["failures"] = failures
+    state["last_failure"] = now
+    probing = bool(state.get("opened_until")) and state["opened_until"] <= now
+    if not probing and (state.get("opened_until", 0) > now or failures < failure_threshold):
+        return False
+
+    opens = state.get("opens", 0) + 1
+    state["opens"] = opens
+    state["opened_until"] = now + min(open_seconds * 2 ** (opens - 1), MAX_OPEN_SECONDS)
+    state["probe_until"] = 0
+    return True
+
+
+def state_name(state, now):
+    """CLOSED, OPEN or HALF_OPEN"""
+    opened_until = state.get("opened_until", 0)
+    if not opened_until:
+        return CLOSED
+    return OPEN if opened_until > now else HALF_OPEN
+
+
+class ProviderCircuitBreaker:
+    """
+    Breaker of one AI provider
+
+    Args:
+        provider (str): Provider name, also the breaker's key
+        store: RedisStateStore or LocalStateStore
+        failure_threshold (int): Consecutive failures that open the breaker
+        slow_call_seconds (float): Latency counted as a failure
+        open_seconds (float): First cooldown
+    """
+
+    def __init__(
+        self,
+        provider,
+        store=None,
+        failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+        slow_call_seconds=DEFAULT_SLOW_CALL_SECONDS,
+        open_seconds=DEFAULT_OPEN_SECONDS,
+        logger=None,
+    ):
+        self.provider = provider
+        self.key = f"{KEY_PREFIX}:{provider}"
+        self.store = store or LocalStateStore()
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.logger = logger
+        self._fallback = None
+
+    def _update(self, change):
+        try:
+            return self.store.update(self.key, change)
+        except Exception as e:
+            if self._fallback is None:
+                self._fallback = LocalStateStore()
+                if self.logger:
+                    self.logger.warning(f"Circuit breaker {self.key} falling back to process state: {e}")
+            return self._fallback.update(self.key, change)
+
+    def before_call(self):
+        """Raise ProviderUnavailable unless a request may be sent now"""
+        now = time.time()
+        wait = self._update(lambda state: allow(state, now))
+        if wait > 0:
+            raise ProviderUnavailable(self.provider, wait)
+
+    def record_success(self, latency=0):
+        """Record a completed request; a slow one counts as a failure"""
+        if latency > self.slow_call_seconds:
+            self.record_failure(f"slow response ({latency:.1f}s)")
+            return
+        now = time.time()
+        self._update(lambda state: record(state, now, True))
+
+    def record_failure(self, reason=None):
+        """Record a failed request, opening the breaker past the threshold"""
+        now = time.time()
+        opened = self._update(
+            lambda state: record(state, now, False, self.failure_threshold, self.open_seconds)
+        )
+        if opened and self.logger:
+            self.logger.warning(f"Circuit breaker of {self.provider} opened after {reason or 'failures'}")
+
+    def call(self, func, failure_errors=(Exception,)):
+        """
+        Run func() unless the breaker is open
+
+        Args:
+            failure_errors (tuple): Exception types that count as a provider
+                failure; anything else, e.g. a 400, means the provider answered
+                and is recorded like a success
+        """
+        self.before_call()
+        started = time.monotonic()
+        failed = False
+        try:
+            return func()
+        except failure_errors as e:
+            failed = True
+            self.record_failure(type(e).__name__)
+            raise
+        finally:
+            # Every outcome is recorded, or a half-open probe would hold its slot
+            if not failed:
+                self.record_success(time.monotonic() - started)
+
+    def status(self):
+        """State, consecutive failures and seconds until the next attempt"""
+        now = time.time()
+        state = self._update(lambda state: dict(state))
+        return {
+            "provider": self.provider,
+            "state": state_name(state, now),
+            "failures": int(state.get("failures", 0)),
+            "retry_in": round(max(0, state.get("opened_until", 0) - now), 1),
+            "last_failure": state.get("last_failure") or None,
+        }
+
+    def reset(self):
+        """Close the breaker"""
+        self._update(lambda state: state.update(failures=0, opened_until=0, probe_until=0, opens=0))
+
+
+def call_with_failover(call, targets, max_wait=0):
+    """
+    Call the first target whose provider is available
+
+    Args:
+        call: Callable taking a target and raising ProviderUnavailable when
+            its provider's breaker is open
+        targets (list): Targets in order of preference, e.g.
+            (provider, api_key, model) tuples
+        max_wait (float): Seconds to wait for a breaker to close when every
+            target is unavailable; 0 to raise right away
+
+    Returns:
+        The result of call()
+    """
+    deadline = time.monotonic() + max_wait
+    while True:
+        retry_in = None
+        for target in targets:
+            try:
+                return call(target)
+            except ProviderUnavailable as e:
+                unavailable = e
+                retry_in = e.retry_in if retry_in is None else min(retry_in, e.retry_in)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise unavailable
+        time.sleep(min(retry_in, remaining, MAX_SLEEP))
+
+
+def get_circuit_breaker(provider, configure=None):
+    """
+    Return the process-wide breaker of a provider
+
+    Args:
+        configure: Callable returning ProviderCircuitBreaker keyword arguments;
+            only called when the breaker is created
+    """
+    provider = "claude" if provider in ("claude", "anthropic") else provider
+    with _breakers_lock:
+        breaker = _breakers.get(provider)
+        if breaker is None:
+            breaker = _breakers[provider] = ProviderCircuitBreaker(
+                provider, **(configure() if configure else {})
+            )
+    return breaker
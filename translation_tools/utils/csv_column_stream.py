@@ -0,0 +1,154 @@
+"""
+Streaming translation of one CSV column.
+
+translate_csv_column() holds every row in memory and answers in one
+response, which does not scale to imports of 100k rows. Here rows are read
+and written in blocks: the distinct source values of a block that have not
+been seen before are translated together, every row of the block is filled
+from the result and written out before the next block is read. Values
+repeated across the file (units, statuses, category names) are translated
+once and reused from a bounded cache.
+"""
+
+import re
+from collections import OrderedDict
+
+DEFAULT_BLOCK_ROWS = 2000
+
+# Distinct source values remembered for reuse across blocks
+DEFAULT_DEDUP_CACHE_SIZE = 50000
+
+# "1. text", "1) text" or "1 - text" line of a numbered answer
+_NUMBERED_LINE = re.compile(r"^(\d+)[.)\-\s]+(.*)$")
+
+
+def source_to_translate(row, source_column, target_column, skip_empty=True, skip_existing=True):
+    """Source value of a row that needs a translation, or None"""
+    source_value = (row.get(source_column) or "").strip()
+    target_value = (row.get(target_column) or "").strip()
+    if skip_empty and not source_value:
+        return None
+    if skip_existing and target_value and target_value != "-":
+        return None
+    return source_value
+
+
+def parse_numbered_translations(text, count):
+    """
+    Parse a numbered list answer into translations keyed by their number
+
+    Returns:
+        list: The ``count`` translations in order
+
+    Raises:
+        ValueError: Unless every line is numbered and 1 to ``count`` appear
+            exactly once, so no translation can end up in another row
+    """
+    translations = {}
+    for line in (text or "").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        match = _NUMBERED_LINE.match(line)
+        if not match or int(match.group(1)) in translations:
+            raise ValueError(f"Unexpected line in numbered translations: {line[:100]}")
+        translations[int(match.group(1))] = match.group(2).strip()
+
+    if sorted(translations) != list(range(1, count + 1)):
+        raise ValueError(f"Expected {count} numbered translations, got {len(translations)}")
+    return [translations[number] for number in range(1, count + 1)]
+
+
+class CsvStreamStats:
+    """Counters of a streamed CSV translation"""
+
+    def __init__(self):
+        self.rows = 0
+        self.translated = 0
+        self.skipped = 0
+        self.failed = 0
+        self.sent = 0
+        self.reused = 0
+
+    def as_dict(self):
+        return {
+            "total_rows": self.rows,
+            "translated_count": self.translated,
+            "skipped_count": self.skipped,
+            "failed_count": self.failed,
+            "unique_sent": self.sent,
+            "reused_count": self.reused,
+        }
+
+
+def translate_csv_stream(
+    reader,
+    writer,
+    source_column,
+    target_column,
+    translate_texts,
+    skip_empty=True,
+    skip_existing=True,
+    block_rows=DEFAULT_BLOCK_ROWS,
+    dedup_cache_size=DEFAULT_DEDUP_CACHE_SIZE,
+    on_block=None,
+):
+    """
+    Translate a column from a csv.DictReader into a csv.DictWriter, block by block
+
+    Args:
+        reader: Iterable of row dicts
+        writer: csv.DictWriter whose header was written already
+        translate_texts: Callable taking a list of distinct source texts and
+            returning text -> translation; missing or empty ones count as failed
+        block_rows (int): Rows read, translated and written at a time
+        dedup_cache_size (int): Translations kept for values repeated later
+        on_block: Callable taking the CsvStreamStats after each written block
+
+    Returns:
+        CsvStreamStats: Counters of the run
+    """
+    stats = CsvStreamStats()
+    known = OrderedDict()
+
+    def flush(block):
+        sources = [source for _, source in block if source]
+        wanted = [text for text in dict.fromkeys(sources) if text not in known]
+        translated = translate_texts(wanted) if wanted else {}
+        resolved = {text: known[text] for text in set(sources) if text in known}
+        resolved.update((text, translated.get(text) or "") for text in wanted)
+        stats.sent += len(wanted)
+        stats.reused += len(sources) - len(wanted)
+
+        # Failed values are not remembered, a later block sends them again
+        known.update((text, resolved[text]) for text in wanted if resolved[text])
+        while len(known) > dedup_cache_size:
+            known.popitem(last=False)
+
+        for row, source in block:
+            if source:
+                if resolved[source]:
+                    row[target_column] = resolved[source]
+                    stats.translated += 1
+                else:
+                    stats.failed += 1
+            writer.writerow(row)
+        if on_block:
+            on_block(stats)
+
+    block = []
+    for row in reader:
+        stats.rows += 1
+        source = source_to_translate(row, source_column, target_column, skip_empty, skip_existing)
+        if not source:
+            source = None
+            stats.skipped += 1
+        elif source in known:
+            known.move_to_end(source)
+        block.append((row, source))
+        if len(block) >= block_rows:
+            flush(block)
+            block = []
+    if block:
+        flush(block)
+    return stats
@@ -0,0 +1,112 @@
+"""
+Multi-pattern matcher over glossary source terms.
+
+Prompts only need the glossary terms that occur in the text being
+translated. GlossaryMatcher compiles all source terms into an Aho-Corasick
+automaton, so finding the relevant terms costs one pass over the text no
+matter how large the glossary is. Matching is case-insensitive and a term
+has to start at a word boundary ("Tax" matches "Taxes" but not "Syntax").
+"""
+
+import threading
+from collections import deque
+
+# Compiled matchers kept per process, keyed by the glossary content
+MATCHER_CACHE_SIZE = 4
+
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == "_"
+
+
+class GlossaryMatcher:
+    """Aho-Corasick automaton over the casefolded source terms of a glossary"""
+
+    def __init__(self, glossary_terms):
+        self.terms = glossary_terms
+        # Node 0 is the root; per node: transitions, failure link and the
+        # (term, length) pairs that end there, including via failure links
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for term in self.terms:
+            pattern = (term or "").casefold()
+            if not pattern.strip():
+                continue
+            node = 0
+            for char in pattern:
+                following = self._goto[node].get(char)
+                if following is None:
+                    following = len(self._goto)
+                    self._goto[node][char] = following
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = following
+            self._out[node].append((term, len(pattern)))
+
+        # Breadth-first failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, following in self._goto[node].items():
+                queue.append(following)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[following] = target if target != following else 0
+                self._out[following] = self._out[following] + self._out[self._fail[following]]
+
+    def find(self, text):
+        """Return the set of source terms that occur in a text"""
+        found = set()
+        haystack = (text or "").casefold()
+        node = 0
+        for end, char in enumerate(haystack):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for term, length in self._out[node]:
+                start = end - length + 1
+                if term not in found and (start == 0 or not _is_word_char(haystack[start - 1])):
+                    found.add(term)
+        return found
+
+    def select(self, texts):
+        """Return {source term: translation} for the terms occurring in any of the texts"""
+        found = set()
+        for text in texts:
+            found |= self.find(text)
+        return {term: self.terms[term] for term in self.terms if term in found}
+
+
+def get_glossary_matcher(glossary_terms):
+    """
+    Return a compiled matcher for a glossary, reusing one built before
+
+    Thread safe, workers share the matcher of the glossary they were given.
+    The cached glossary of a version is a single dict, so it is recognised
+    without hashing its terms. The dict must not be modified afterwards.
+    """
+    with _matchers_lock:
+        for matcher in _matchers.values():
+            if matcher.terms is glossary_terms:
+                return matcher
+
+    key = hash(frozenset(glossary_terms.items()))
+    with _matchers_lock:
+        matcher = _matchers.get(key)
+    if matcher is not None and matcher.terms == glossary_terms:
+        return matcher
+
+    matcher = GlossaryMatcher(glossary_terms)
+    with _matchers_lock:
+        if len(_matchers) >= MATCHER_CACHE_SIZE:
+            _matchers.pop(next(iter(_matchers)))
+        _matchers[key] = matcher
+    return matcher
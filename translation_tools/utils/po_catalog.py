@@ -0,0 +1,446 @@
+"""
+Process-wide cache of parsed PO catalogs.
+
+Parsing a large catalog such as ERPNext's th.po (~30k entries) with polib
+takes seconds, and the translation editor used to do it on every page click.
+Catalogs are kept here in an LRU bounded by a memory budget and reused for
+as long as the file on disk is unchanged (same mtime, size and inode).
+
+This module only depends on polib so it can be used from background jobs,
+the CLI scripts and the whitelisted API alike.
+"""
+
+import bisect
+import os
+import threading
+from collections import OrderedDict
+
+import polib
+
+from translation_tools.utils.po_scanner import UTF8_BOM, make_entry_key, scan_entry_spans
+from translation_tools.utils.po_search import SearchIndex
+from translation_tools.utils.po_stats import CatalogStats, entry_state
+from translation_tools.utils.po_writer import (
+    apply_patches,
+    atomic_write,
+    detect_newline,
+    render_msgstr,
+    render_revision_date,
+    shift_spans,
+)
+
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024  # 256 MB
+
+# A parsed catalog costs several times its size on disk (one POEntry object
+# graph per entry); used to estimate how much memory a cached catalog holds.
+MEMORY_FACTOR = 8
+
+
+def file_signature(path):
+    """Return the (mtime_ns, size, inode) tuple used to detect file changes"""
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def entry_key(entry):
+    """
+    Return the stable ID of a PO entry
+
+    The key only depends on msgctxt and msgid, so it survives reordering and
+    other edits to the file. Entries without a context hash their msgid alone,
+    which is the same as the old msgid-only fallback ID.
+    """
+    return make_entry_key(entry.msgctxt, entry.msgid)
+
+
+def parse_po_content(data, path=None):
+    """
+    Parse PO content held in memory with polib
+
+    A leading UTF-8 BOM is dropped while decoding, so the content never has to
+    be copied to a temporary file first.
+
+    Args:
+        data (bytes|str): Raw file content or already decoded text
+        path (str, optional): File path to record as ``po.fpath``
+    """
+    if isinstance(data, bytes):
+        if data.startswith(UTF8_BOM):
+            data = data[len(UTF8_BOM):]
+        encoding = polib.detect_encoding(data)
+        text = data.decode(encoding)
+    else:
+        encoding = polib.detect_encoding(data)
+        text = data.lstrip("\ufeff")
+
+    po = polib.pofile(text, encoding=encoding)
+    po.fpath = path
+    return po
+
+
+def load_po_file(path):
+    """Parse a PO file with polib, removing a UTF-8 BOM if present"""
+    with open(path, "rb") as f:
+        return parse_po_content(f.read(), path)
+
+
+class POCatalog:
+    """A parsed PO file together with the file signature it was parsed from"""
+
+    def __init__(self, path, po, signature):
+        self.path = path
+        self.po = po
+        self.signature = signature
+        self.cost = signature[1] * MEMORY_FACTOR
+        # Held while mutating or saving the catalog, shared by all requests
+        self.lock = threading.RLock()
+        self._positions = None
+        self._msgid_positions = None
+        # Byte spans of msgstr blocks on disk, found on the first flush
+        self._spans = None
+        self._revision_span = None
+        # Entries changed since the last flush, by stable ID
+        self._dirty = {}
+        self._search_index = None
+        self._stats = None
+        self._untranslated = None
+
+    def __len__(self):
+        return len(self.po)
+
+    def __iter__(self):
+        return iter(self.po)
+
+    def _build_index(self):
+        positions = {}
+        msgid_positions = {}
+        for index, entry in enumerate(self.po):
+            # Keep the first occurrence of duplicated entries, like polib.find
+            positions.setdefault(entry_key(entry), index)
+            msgid_positions.setdefault(entry.msgid, index)
+        self._msgid_positions = msgid_positions
+        self._positions = positions
+
+    def position(self, entry_id):
+        """Return the index of the entry with the given stable ID, or None"""
+        if self._positions is None:
+            with self.lock:
+                if self._positions is None:
+                    self._build_index()
+        return self._positions.get(entry_id)
+
+    def find_entry(self, entry_id, msgid=None):
+        """
+        Look up an entry by stable ID, falling back to its msgid
+
+        Returns:
+            tuple: (index, entry) or (None, None) if not found
+        """
+        index = self.position(entry_id)
+        if index is None and msgid:
+            index = self._msgid_positions.get(msgid)
+        if index is None:
+            return None, None
+        return index, self.po[index]
+
+    def position_of(self, entry):
+        """Return the index of an entry object of this catalog"""
+        index = self.position(entry_key(entry))
+        if index is not None and self.po[index] is entry:
+            return index
+        # Duplicated msgctxt + msgid, only the first one is in the index
+        return next(i for i, e in enumerate(self.po) if e is entry)
+
+    @property
+    def search_index(self):
+        """SearchIndex over this catalog, built on first use"""
+        if self._search_index is None:
+            with self.lock:
+                if self._search_index is None:
+                    self._search_index = SearchIndex(self.po)
+        return self._search_index
+
+    def search(self, term):
+        """Return entry positions matching term, best matches first"""
+        index = self.search_index
+        with self.lock:
+            return index.search(term)
+
+    @property
+    def stats(self):
+        """CatalogStats for this catalog, counted once and then kept up to date"""
+        if self._stats is None:
+            with self.lock:
+                if self._stats is None:
+                    self._stats = CatalogStats(self.po)
+        return self._stats
+
+    @property
+    def untranslated_positions(self):
+        """Sorted positions of the entries without an msgstr"""
+        if self._untranslated is None:
+            with self.lock:
+                if self._untranslated is None:
+                    self._untranslated = [
+                        index for index, entry in enumerate(self.po) if not entry.msgstr
+                    ]
+        return self._untranslated
+
+    def next_untranslated(self, start=0):
+        """Return the position of the first untranslated entry at or after start"""
+        positions = self.untranslated_positions
+        i = bisect.bisect_left(positions, start)
+        return positions[i] if i < len(positions) else None
+
+    def previous_untranslated(self, before):
+        """Return the position of the last untranslated entry before ``before``"""
+        positions = self.untranslated_positions
+        i = bisect.bisect_left(positions, before)
+        return positions[i - 1] if i > 0 else None
+
+    def untranslated_rank(self, position):
+        """Return how many untranslated entries come before position"""
+        return bisect.bisect_left(self.untranslated_positions, position)
+
+    def nth_untranslated(self, n):
+        """Return the position of the n-th (0-based) untranslated entry"""
+        positions = self.untranslated_positions
+        return positions[n] if 0 <= n < len(positions) else None
+
+    def set_msgstr(self, entry, msgstr):
+        """Change an entry's translation; it is written on the next flush()"""
+        with self.lock:
+            before = entry_state(entry)
+            was_untranslated = not entry.msgstr
+            entry.msgstr = msgstr
+            self._dirty[entry_key(entry)] = entry
+
+            # Keep the derived data that was already built in sync
+            if self._stats is not None:
+                self._stats.update(before, entry)
+            if self._search_index is None and self._untranslated is None:
+                return
+            position = self.position_of(entry)
+            if self._search_index is not None:
+                self._search_index.update(position, entry)
+            if self._untranslated is not None and was_untranslated != (not msgstr):
+                i = bisect.bisect_left(self._untranslated, position)
+                if was_untranslated:
+                    del self._untranslated[i]
+                else:
+                    self._untranslated.insert(i, position)
+
+    def flush(self):
+        """
+        Write all pending set_msgstr() changes to disk in one atomic write
+
+        Only the msgstr blocks of the changed entries and the PO-Revision-Date
+        header line are rewritten. If the file was changed by someone else
+        since it was parsed, the patch is applied on top of their version and
+        the catalog is marked stale so the cache reparses it. When their
+        version cannot be patched, it is reparsed and the changes are applied
+        to it instead; changes to entries it no longer has are dropped.
+
+        Returns:
+            int: Number of entries written
+        """
+        with self.lock:
+            if not self._dirty:
+                return 0
+
+            stale = not self.is_fresh(file_signature(self.path))
+            with open(self.path, "rb") as f:
+                data = f.read()
+
+            if stale or self._spans is None:
+                self._spans, self._revision_span = scan_entry_spans(data)
+
+            # Patches keep the file's own line endings
+            newline = detect_newline(data)
+            patches = self._build_patches(newline)
+            if patches is None:
+                # Entry layout changed in a way we cannot patch, rewrite it all;
+                # never from our copy when someone else changed the file
+                po = self._reapply_to(parse_po_content(data, self.path)) if stale else self.po
+                content = po.__unicode__().replace("\n", newline)
+                atomic_write(self.path, content.encode(po.encoding))
+                self._spans = self._revision_span = None
+            else:
+                atomic_write(self.path, apply_patches(data, patches))
+                self._spans = shift_spans(self._spans, patches)
+                if self._revision_span is not None:
+                    self._revision_span = shift_spans(
+                        {"revision": self._revision_span}, patches
+                    )["revision"]
+
+            written = len(self._dirty)
+            self._dirty = {}
+            if stale:
+                # Our parsed entries do not reflect the other changes
+                self.signature = None
+                self._spans = self._revision_span = None
+            else:
+                self._record_signature()
+            return written
+
+    def _reapply_to(self, po):
+        """Apply the pending changes and revision date to another parse of the file"""
+        entries = {entry_key(entry): entry for entry in po}
+        for key, entry in self._dirty.items():
+            if key in entries:
+                entries[key].msgstr = entry.msgstr
+        revision_date = self.po.metadata.get("PO-Revision-Date")
+        if revision_date:
+            po.metadata["PO-Revision-Date"] = revision_date
+        return po
+
+    def _build_patches(self, newline="\n"):
+        encoding = self.po.encoding
+        patches = []
+        for key, entry in self._dirty.items():
+            span = self._spans.get(key)
+            if span is None or entry.obsolete:
+                return None
+            msgstr = render_msgstr(entry, self.po.wrapwidth, newline)
+            patches.append((span[0], span[1], msgstr.encode(encoding)))
+
+        revision_date = self.po.metadata.get("PO-Revision-Date")
+        if revision_date and self._revision_span is not None:
+            start, end = self._revision_span
+            patches.append((start, end, render_revision_date(revision_date).encode(encoding)))
+        return patches
+
+    def is_fresh(self, signature):
+        return self.signature == signature
+
+    def mark_saved(self):
+        """Record the signature of the file after po.save() rewrote all of it"""
+        self._dirty = {}
+        self._spans = self._revision_span = None
+        # Entries may have been edited directly, rebuild derived data lazily
+        self._search_index = None
+        self._stats = None
+        self._untranslated = None
+        self._record_signature()
+
+    def _record_signature(self):
+        self.signature = file_signature(self.path)
+        self.cost = self.signature[1] * MEMORY_FACTOR
+
+
+class CatalogCache:
+    """LRU cache of POCatalog objects keyed by real path"""
+
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET, loader=load_po_file):
+        self.memory_budget = memory_budget
+        self.loader = loader
+        self._catalogs = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, path):
+        """Return the catalog for ``path``, parsing it only when it changed"""
+        key = os.path.realpath(path)
+        signature = file_signature(key)
+
+        with self._lock:
+            catalog = self._catalogs.get(key)
+            if catalog is not None:
+                if catalog.is_fresh(signature):
+                    self._catalogs.move_to_end(key)
+                    self.hits += 1
+                    return catalog
+                del self._catalogs[key]
+                self.invalidations += 1
+            self.misses += 1
+            # [lock, number of callers using it]
+            load_lock = self._load_locks.setdefault(key, [threading.Lock(), 0])
+            load_lock[1] += 1
+
+        # Parse outside the cache lock so other catalogs stay available;
+        # concurrent misses on the same file wait for a single parse.
+        try:
+            with load_lock[0]:
+                with self._lock:
+                    catalog = self._catalogs.get(key)
+                    if catalog is not None and catalog.is_fresh(signature):
+                        self._catalogs.move_to_end(key)
+                        return catalog
+
+                signature = file_signature(key)
+                catalog = POCatalog(key, self.loader(key), signature)
+
+                with self._lock:
+                    self._catalogs[key] = catalog
+                    self._evict()
+        finally:
+            # The lock is dropped once no caller waits for it
+            with self._lock:
+                load_lock[1] -= 1
+                if not load_lock[1]:
+                    del self._load_locks[key]
+
+        return catalog
+
+    def peek(self, path):
+        """Return the cached catalog for ``path`` if it is fresh, without loading it"""
+        key = os.path.realpath(path)
+        signature = file_signature(key)
+        with self._lock:
+            catalog = self._catalogs.get(key)
+            if catalog is not None and catalog.is_fresh(signature):
+                return catalog
+        return None
+
+    def invalidate(self, path):
+        """Drop the cached catalog for ``path``, if any"""
+        key = os.path.realpath(path)
+        with self._lock:
+            if self._catalogs.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._catalogs.clear()
+
+    def memory_used(self):
+        return sum(catalog.cost for catalog in self._catalogs.values())
+
+    def _evict(self):
+        # Always keep the most recently used catalog, even if it is over budget
+        while len(self._catalogs) > 1 and self.memory_used() > self.memory_budget:
+            self._catalogs.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0,
+                "catalogs": len(self._catalogs),
+                "memory_used": self.memory_used(),
+                "memory_budget": self.memory_budget,
+                "files": list(self._catalogs.keys()),
+            }
+
+
+_catalog_cache = None
+_catalog_cache_lock = threading.Lock()
+
+
+def get_catalog_cache():
+    """Return the process-wide catalog cache"""
+    global _catalog_cache
+    if _catalog_cache is None:
+        with _catalog_cache_lock:
+            if _catalog_cache is None:
+                _catalog_cache = CatalogCache()
+    return _catalog_cache
@@ -0,0 +1,132 @@
+"""
+Set-based synchronisation of scanned PO files with the PO File doctype.
+
+A scan produces one row per file. Instead of checking and saving documents
+one by one, the rows are diffed against the existing records (fetched in a
+single query) and the result is written with bulk inserts and updates.
+
+Each record also keeps a fingerprint of its file (size, mtime_ns and a
+content hash). A rescan stats the file first, hashes it only when the stat
+changed and counts entries only when the hash changed.
+"""
+
+import hashlib
+import os
+from datetime import datetime
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Rescan outcomes, see classify_rescan()
+NEW = "new"
+UNCHANGED = "unchanged"
+TOUCHED = "touched"
+CHANGED = "changed"
+
+# PO File columns written from a scanned row, the record name is file_path
+PO_FILE_FIELDS = (
+    "file_path",
+    "app_name",
+    "filename",
+    "language",
+    "total_entries",
+    "translated_entries",
+    "translation_status",
+    "last_modified",
+    "file_size",
+    "file_mtime_ns",
+    "content_hash",
+)
+
+# Columns whose change means the record has to be updated
+COMPARED_FIELDS = PO_FILE_FIELDS[1:]
+
+
+def _normalize(value):
+    # The database returns datetimes where scans produce formatted strings
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+
+def plan_po_file_sync(scanned_rows, existing_rows):
+    """
+    Diff scanned rows against existing PO File records
+
+    Args:
+        scanned_rows (list): Dicts with the PO_FILE_FIELDS of each scanned file
+        existing_rows (list): Existing records with ``name`` and COMPARED_FIELDS
+
+    Returns:
+        tuple: (rows to insert, {name: changed values} to update,
+        names of unchanged records)
+    """
+    existing = {row["name"]: row for row in existing_rows}
+    # A file scanned twice keeps its last row
+    scanned = {row["file_path"]: row for row in scanned_rows}
+
+    inserts = []
+    updates = {}
+    unchanged = []
+    for name, row in scanned.items():
+        current = existing.get(name)
+        if current is None:
+            inserts.append(row)
+            continue
+
+        changes = {
+            field: row[field]
+            for field in COMPARED_FIELDS
+            if field in row and _normalize(row[field]) != _normalize(current.get(field))
+        }
+        if changes:
+            updates[name] = changes
+        else:
+            unchanged.append(name)
+    return inserts, updates, unchanged
+
+
+def stat_fingerprint(path):
+    """Return the size and mtime_ns of a file, as stored on PO File"""
+    st = os.stat(path)
+    # mtime_ns does not fit an Int column, it is stored as text
+    return {"file_size": st.st_size, "file_mtime_ns": str(st.st_mtime_ns)}
+
+
+def content_hash(path):
+    """Return a BLAKE2b digest of the file content"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def classify_rescan(path, record, force=False):
+    """
+    Decide whether a file has to be parsed again
+
+    Args:
+        path (str): Full path of the PO file
+        record (dict): Existing PO File record with the fingerprint fields,
+            or None for a file that is not in the database yet
+        force (bool): Treat every existing file as changed
+
+    Returns:
+        tuple: (state, fingerprint dict), the state being NEW, UNCHANGED,
+        TOUCHED (stat changed but the content did not) or CHANGED
+    """
+    fingerprint = stat_fingerprint(path)
+    if record is None:
+        fingerprint["content_hash"] = content_hash(path)
+        return NEW, fingerprint
+
+    if not force and (
+        record.get("file_size") == fingerprint["file_size"]
+        and str(record.get("file_mtime_ns")) == fingerprint["file_mtime_ns"]
+    ):
+        return UNCHANGED, fingerprint
+
+    fingerprint["content_hash"] = content_hash(path)
+    if not force and record.get("content_hash") == fingerprint["content_hash"]:
+        return TOUCHED, fingerprint
+    return CHANGED, fingerprint
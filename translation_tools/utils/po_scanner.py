@@ -0,0 +1,239 @@
+"""
+Lightweight line scanner for PO files.
+
+polib builds a full object graph for every entry; the helpers here only look
+at the raw bytes, which is enough to locate entries in the file without
+parsing it.
+"""
+
+import hashlib
+
+import polib
+
+# gettext separates msgctxt from msgid with EOT in compiled catalogs
+CONTEXT_SEPARATOR = "\x04"
+
+UTF8_BOM = b"\xef\xbb\xbf"
+
+
+def _quoted(line):
+    """Return the raw bytes between the first and last quote of a line"""
+    start = line.find(b'"')
+    end = line.rfind(b'"')
+    if start == -1 or end <= start:
+        return b""
+    return line[start + 1 : end]
+
+
+def _decode(parts):
+    value = b"".join(parts).decode("utf-8")
+    return polib.unescape(value) if "\\" in value else value
+
+
+def make_entry_key(msgctxt, msgid):
+    """Return the stable entry ID for a msgctxt (or None) and msgid"""
+    if msgctxt is None:
+        source = msgid
+    else:
+        source = f"{msgctxt}{CONTEXT_SEPARATOR}{msgid}"
+    return hashlib.md5(source.encode("utf-8")).hexdigest()
+
+
+def scan_entry_spans(data):
+    """
+    Find the byte span of every entry's msgstr block
+
+    Args:
+        data (bytes): Raw content of the PO file
+
+    Returns:
+        tuple: ({entry_key: (start, end)}, (start, end) of the PO-Revision-Date
+        header line without its line ending, or None)
+    """
+    spans = {}
+    revision_span = None
+
+    # State of the block being scanned; msgctxt/msgid are lists of raw parts
+    msgctxt = msgid = None
+    current = None  # parts list that continuation lines are appended to
+    in_msgstr = False
+    obsolete = False
+    msgstr_start = msgstr_end = None
+    is_header = False
+
+    def finish():
+        if msgid is not None and msgstr_start is not None and not obsolete and not is_header:
+            ctxt = None if msgctxt is None else _decode(msgctxt)
+            spans.setdefault(make_entry_key(ctxt, _decode(msgid)), (msgstr_start, msgstr_end))
+
+    # Offsets are into the raw file, so step over a UTF-8 BOM
+    pos = len(UTF8_BOM) if data.startswith(UTF8_BOM) else 0
+    for line in data[pos:].splitlines(keepends=True):
+        line_start = pos
+        pos += len(line)
+        first = line[:1]
+        if first in (b" ", b"\t"):
+            # Indentation is unusual but polib accepts it
+            line = line.lstrip(b" \t")
+            first = line[:1]
+
+        if first in (b"\n", b"\r", b"") or (
+            in_msgstr and (first == b"#" or line.startswith(b"msgctxt") or line.startswith(b"msgid "))
+        ):
+            # Blank line, or a new entry starting right after a msgstr
+            finish()
+            msgctxt = msgid = current = None
+            in_msgstr = obsolete = is_header = False
+            msgstr_start = msgstr_end = None
+            if not line.strip():
+                continue
+
+        if first == b'"':
+            if in_msgstr:
+                msgstr_end = pos
+                if is_header and revision_span is None and line.startswith(b'"PO-Revision-Date:'):
+                    revision_span = (pos - len(line), pos - len(line) + len(line.rstrip(b"\r\n")))
+            elif current is not None:
+                current.append(_quoted(line))
+        elif first == b"m":
+            if line.startswith(b"msgstr"):
+                if not in_msgstr:
+                    is_header = msgctxt is None and msgid is not None and not any(msgid)
+                    msgstr_start = line_start
+                    in_msgstr = True
+                msgstr_end = pos
+            elif line.startswith(b"msgid_plural"):
+                current = None
+            elif line.startswith(b"msgid"):
+                msgid = current = [_quoted(line)]
+            elif line.startswith(b"msgctxt"):
+                msgctxt = current = [_quoted(line)]
+        elif line.startswith(b"#~"):
+            obsolete = True
+
+    finish()
+    return spans, revision_span
+
+
+# Entry classes yielded by iter_entry_classes, matching polib's *_entries()
+TRANSLATED = "translated"
+UNTRANSLATED = "untranslated"
+FUZZY = "fuzzy"
+OBSOLETE = "obsolete"
+
+
+def _has_text(line):
+    """True if the quoted part of a line is not empty"""
+    start = line.find(b'"')
+    return start != -1 and line.rfind(b'"') > start + 1
+
+
+def iter_entry_classes(lines):
+    """
+    Classify the entries of a PO file without building POEntry objects
+
+    Args:
+        lines: Iterable of raw byte lines, e.g. a file opened in binary mode
+
+    Yields:
+        tuple: (entry class, has_msgstr) per entry, excluding the header.
+        ``has_msgstr`` is False for plural entries, like ``bool(entry.msgstr)``.
+    """
+    header_seen = False
+
+    # State of the current entry
+    has_msgid = msgid_empty = False
+    in_msgstr = fuzzy = obsolete = plural = False
+    msgstrs = []  # one flag per msgstr / msgstr[n], True when it has text
+
+    def classify():
+        if obsolete:
+            entry_class = OBSOLETE
+        elif fuzzy:
+            entry_class = FUZZY
+        elif msgstrs and all(msgstrs):
+            entry_class = TRANSLATED
+        else:
+            entry_class = UNTRANSLATED
+        return entry_class, not plural and bool(msgstrs) and msgstrs[0]
+
+    first = True
+    for line in lines:
+        if first:
+            first = False
+            if line.startswith(UTF8_BOM):
+                line = line[len(UTF8_BOM):]
+        line = line.strip()
+        if not line:
+            continue
+
+        is_obsolete = line.startswith(b"#~")
+        if is_obsolete:
+            if line.startswith(b"#~|"):
+                # Previous msgid of an obsolete entry, polib skips these
+                continue
+            line = line[2:].lstrip()
+
+        if in_msgstr and (
+            line[:1] == b"#" or line.startswith(b"msgid ") or line.startswith(b"msgctxt")
+        ):
+            # The previous entry ends where the next one starts
+            if has_msgid:
+                if msgid_empty and not obsolete and not header_seen:
+                    header_seen = True
+                else:
+                    yield classify()
+            has_msgid = msgid_empty = False
+            in_msgstr = fuzzy = obsolete = plural = False
+            msgstrs = []
+
+        if line[:1] == b"#":
+            if line.startswith(b"#,"):
+                flags = [flag.strip() for flag in line[2:].split(b",")]
+                fuzzy = fuzzy or b"fuzzy" in flags
+            continue
+
+        if line[:1] == b'"':
+            if in_msgstr:
+                msgstrs[-1] = msgstrs[-1] or _has_text(line)
+            elif has_msgid and msgid_empty:
+                msgid_empty = not _has_text(line)
+        elif line.startswith(b"msgstr"):
+            in_msgstr = True
+            plural = plural or line.startswith(b"msgstr[")
+            msgstrs.append(_has_text(line))
+        elif line.startswith(b"msgid_plural"):
+            plural = True
+        elif line.startswith(b"msgid"):
+            has_msgid = True
+            msgid_empty = not _has_text(line)
+            obsolete = is_obsolete
+
+    if has_msgid:
+        if not (msgid_empty and not obsolete and not header_seen):
+            yield classify()
+
+
+def count_po_entries(path):
+    """
+    Count entries of a PO file by class in a single streaming pass
+
+    Returns:
+        dict: total, translated, untranslated, fuzzy, obsolete and
+        with_msgstr counts, with the same meaning as CatalogStats
+    """
+    counts = {
+        "total": 0,
+        TRANSLATED: 0,
+        UNTRANSLATED: 0,
+        FUZZY: 0,
+        OBSOLETE: 0,
+        "with_msgstr": 0,
+    }
+    with open(path, "rb") as f:
+        for entry_class, has_msgstr in iter_entry_classes(f):
+            counts["total"] += 1
+            counts[entry_class] += 1
+            if has_msgstr:
+                counts["with_msgstr"] += 1
+    return counts
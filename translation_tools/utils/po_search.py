@@ -0,0 +1,151 @@
+"""
+In-memory search index for a parsed PO catalog.
+
+The translation editor searches msgid, msgstr and msgctxt as the user types.
+Each field is casefolded once and every character trigram of it is indexed
+with the positions of the entries it occurs in. A query token is looked up
+by intersecting the posting sets of its trigrams, and only those candidates
+are checked with a substring test, so a lookup touches the few entries that
+can match instead of the whole catalog.
+
+Character n-grams need no word segmentation, which matters for Thai and
+other scripts written without spaces between words: a term matches wherever
+its characters appear. Terms containing spaces are split into tokens that
+must all match (in any of the fields). Tokens shorter than a trigram match
+too many entries for the index to help and are scanned.
+"""
+
+from collections import OrderedDict
+
+# Length of the indexed character n-grams
+NGRAM = 3
+
+# Recent queries kept per index, so paging through results does not search again
+RESULT_CACHE_SIZE = 32
+
+# Rank buckets, best first
+RANK_EXACT = 0
+RANK_PREFIX = 1
+RANK_MSGID = 2
+RANK_MSGSTR = 3
+RANK_CONTEXT = 4
+
+
+def normalize(text):
+    return (text or "").casefold()
+
+
+def ngrams(text, n=NGRAM):
+    """Distinct character n-grams of text"""
+    return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+
+class SearchIndex:
+    """Character trigram index over the entries of a polib catalog"""
+
+    def __init__(self, entries):
+        self.fields = {
+            "msgid": [normalize(entry.msgid) for entry in entries],
+            "msgstr": [normalize(entry.msgstr) for entry in entries],
+            "msgctxt": [normalize(entry.msgctxt) for entry in entries],
+        }
+        # field -> n-gram -> positions of the entries containing it
+        self.postings = {field: {} for field in self.fields}
+        for field, values in self.fields.items():
+            for position, value in enumerate(values):
+                self._add(field, position, value)
+        self._results = OrderedDict()
+
+    def _add(self, field, position, value):
+        postings = self.postings[field]
+        for gram in ngrams(value):
+            postings.setdefault(gram, set()).add(position)
+
+    def _remove(self, field, position, value):
+        postings = self.postings[field]
+        for gram in ngrams(value):
+            positions = postings.get(gram)
+            if positions is not None:
+                positions.discard(position)
+                if not positions:
+                    del postings[gram]
+
+    def update(self, position, entry):
+        """Reindex the translation of the entry at position after a save"""
+        self._remove("msgstr", position, self.fields["msgstr"][position])
+        value = normalize(entry.msgstr)
+        self.fields["msgstr"][position] = value
+        self._add("msgstr", position, value)
+        self._results.clear()
+
+    def _matches(self, field, token, candidates):
+        values = self.fields[field]
+        if len(token) >= NGRAM:
+            postings = self.postings[field]
+            sets = sorted((postings.get(gram, ()) for gram in ngrams(token)), key=len)
+            if not sets[0]:
+                return set()
+            found = set(sets[0])
+            for positions in sets[1:]:
+                found &= positions
+                if not found:
+                    return found
+            if candidates is not None:
+                found &= candidates
+            # Shared trigrams do not guarantee the token occurs as a whole
+            return {i for i in found if token in values[i]}
+        if candidates is None:
+            return {i for i, value in enumerate(values) if token in value}
+        return {i for i in candidates if token in values[i]}
+
+    def search(self, term):
+        """
+        Find entries matching every token of term
+
+        Returns:
+            list: Entry positions, best matches first and in file order
+            within the same rank
+        """
+        query = normalize(term).strip()
+        if query in self._results:
+            self._results.move_to_end(query)
+            return self._results[query]
+
+        result = self._search(query)
+        self._results[query] = result
+        if len(self._results) > RESULT_CACHE_SIZE:
+            self._results.popitem(last=False)
+        return result
+
+    def _search(self, query):
+        tokens = query.split()
+        if not tokens:
+            return []
+
+        # Longest tokens first, they have the smallest posting sets
+        matched = None
+        for token in sorted(tokens, key=len, reverse=True):
+            matched = set().union(
+                *(self._matches(field, token, matched) for field in self.fields)
+            )
+            if not matched:
+                return []
+
+        msgids = self.fields["msgid"]
+        msgstrs = self.fields["msgstr"]
+        ranked = []
+        for position in matched:
+            msgid = msgids[position]
+            if msgid == query:
+                rank = RANK_EXACT
+            elif msgid.startswith(query):
+                rank = RANK_PREFIX
+            elif all(token in msgid for token in tokens):
+                rank = RANK_MSGID
+            elif all(token in msgstrs[position] for token in tokens):
+                rank = RANK_MSGSTR
+            else:
+                rank = RANK_CONTEXT
+            ranked.append((rank, position))
+        ranked.sort()
+        return [position for _, position in ranked]
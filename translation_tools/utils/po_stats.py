@@ -0,0 +1,74 @@
+"""
+Translation statistics for a parsed PO catalog.
+
+Counting translated entries means walking the whole catalog, which several
+endpoints used to do on every request. CatalogStats counts once per parsed
+catalog and is then adjusted by delta when a single entry changes.
+
+The counters follow polib's definitions (translated_entries(),
+untranslated_entries(), fuzzy_entries(), obsolete_entries()), plus
+``with_msgstr``/``without_msgstr`` for callers that only check whether an
+msgstr is present, as the editor does.
+"""
+
+from collections import Counter
+
+COUNTERS = ("translated", "untranslated", "fuzzy", "obsolete", "with_msgstr")
+
+
+def entry_state(entry):
+    """Return the counters an entry contributes to"""
+    return (
+        entry.translated(),
+        not entry.translated() and not entry.obsolete and not entry.fuzzy,
+        entry.fuzzy and not entry.obsolete,
+        entry.obsolete,
+        bool(entry.msgstr),
+    )
+
+
+class CatalogStats:
+    """Entry counts of a catalog, maintained incrementally"""
+
+    def __init__(self, entries):
+        self.total = 0
+        self.translated = self.untranslated = self.fuzzy = self.obsolete = 0
+        self.with_msgstr = 0
+        self.flags = Counter()
+        for entry in entries:
+            self.total += 1
+            self._apply(entry_state(entry), 1)
+            self.flags.update(entry.flags)
+
+    def _apply(self, state, sign):
+        for name, value in zip(COUNTERS, state):
+            if value:
+                setattr(self, name, getattr(self, name) + sign)
+
+    def update(self, before, entry):
+        """
+        Adjust the counts after an entry changed
+
+        Args:
+            before (tuple): entry_state() of the entry before the change
+            entry: The changed entry
+        """
+        self._apply(before, -1)
+        self._apply(entry_state(entry), 1)
+
+    @property
+    def without_msgstr(self):
+        return self.total - self.with_msgstr
+
+    def percentage(self, translated=None):
+        """Share of all entries that are translated, rounded to one decimal"""
+        translated = self.translated if translated is None else translated
+        return round(translated / self.total * 100, 1) if self.total else 0
+
+    def as_dict(self):
+        return {
+            "total": self.total,
+            **{name: getattr(self, name) for name in COUNTERS},
+            "without_msgstr": self.without_msgstr,
+            "flags": dict(self.flags),
+        }
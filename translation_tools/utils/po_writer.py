@@ -0,0 +1,104 @@
+"""
+Incremental writer for PO files.
+
+Saving one translation with polib re-serialises the whole catalog, which for
+ERPNext's th.po means rewriting several megabytes per keystroke save. Instead
+the msgstr spans found by po_scanner are replaced with the re-rendered msgstr
+of the entries that changed (plus the PO-Revision-Date header line) and the
+file is replaced atomically.
+"""
+
+import bisect
+import os
+import shutil
+import tempfile
+
+import polib
+
+
+def detect_newline(data):
+    """Line ending of a PO file's content, "\r\n" or "\n" """
+    end = data.find(b"\n")
+    return "\r\n" if end > 0 and data[end - 1 : end] == b"\r" else "\n"
+
+
+def render_msgstr(entry, wrapwidth=78, newline="\n"):
+    """Render the msgstr lines of an entry exactly as polib would save them"""
+    text = polib._BaseEntry.__unicode__(entry, wrapwidth)
+    return text[text.index("\nmsgstr") + 1 :].replace("\n", newline)
+
+
+def render_revision_date(value):
+    return f'"PO-Revision-Date: {polib.escape(value)}\\n"'
+
+
+def apply_patches(data, patches):
+    """
+    Splice replacement bytes into data
+
+    Args:
+        data (bytes): Original content
+        patches (list): Non-overlapping (start, end, replacement) tuples
+
+    Returns:
+        bytes: Patched content
+    """
+    chunks = []
+    last = 0
+    for start, end, replacement in sorted(patches, key=lambda p: p[0]):
+        chunks.append(data[last:start])
+        chunks.append(replacement)
+        last = end
+    chunks.append(data[last:])
+    return b"".join(chunks)
+
+
+def shift_spans(spans, patches):
+    """
+    Move spans to where they end up after apply_patches
+
+    Spans that were replaced by a patch cover their replacement afterwards.
+
+    Args:
+        spans (dict): key -> (start, end)
+        patches (list): The (start, end, replacement) tuples that were applied
+
+    Returns:
+        dict: key -> (start, end) in the patched content
+    """
+    patches = sorted(patches, key=lambda p: p[0])
+    starts = [p[0] for p in patches]
+    # deltas[i] is the size change caused by the first i patches
+    deltas = [0]
+    for p_start, p_end, replacement in patches:
+        deltas.append(deltas[-1] + len(replacement) - (p_end - p_start))
+
+    shifted = {}
+    for key, (start, end) in spans.items():
+        i = bisect.bisect_right(starts, start)
+        if i and patches[i - 1][0] == start and patches[i - 1][1] == end:
+            new_start = start + deltas[i - 1]
+            shifted[key] = (new_start, new_start + len(patches[i - 1][2]))
+        else:
+            shifted[key] = (start + deltas[i], end + deltas[i])
+    return shifted
+
+
+def atomic_write(path, data):
+    """Write data to path through a temporary file in the same directory"""
+    directory = os.path.dirname(path) or "."
+    fd, temp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
@@ -0,0 +1,100 @@
+"""
+Prompt layout for provider-side prompt caching.
+
+Providers keep recently seen prompt prefixes cached and bill cached input
+tokens at a fraction of the price, with a shorter time to first token:
+OpenAI does so automatically, Anthropic for the blocks marked with
+``cache_control``. Translation prompts are therefore laid out as a stable
+prefix, the system prompt with the guidelines and output format that is
+identical for every request of a kind, followed by the variable part: the
+glossary terms that occur in the text and the text itself.
+
+PromptUsage adds up per job how many input tokens were read from the
+cache, written to it or sent uncached.
+"""
+
+import threading
+
+from translation_tools.utils.translation_batching import format_glossary
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+USAGE_FIELDS = ("input_tokens", "cached_input_tokens", "cache_write_tokens", "output_tokens")
+
+
+def anthropic_system(prefix):
+    """System blocks of an Anthropic request with the prefix marked for caching"""
+    return [{"type": "text", "text": prefix, "cache_control": CACHE_CONTROL}]
+
+
+def variable_message(text, glossary_terms=None, label="TEXT"):
+    """User message: the glossary terms that occur in the text, then the text"""
+    if not glossary_terms:
+        return text
+    return (
+        f"GLOSSARY - Use these exact translations:\n{format_glossary(glossary_terms)}\n\n"
+        f"{label}:\n{text}"
+    )
+
+
+def usage_counts(usage):
+    """
+    Token counts of an OpenAI or Anthropic usage object
+
+    Returns:
+        dict: input_tokens (uncached), cached_input_tokens,
+        cache_write_tokens and output_tokens
+    """
+    if usage is None:
+        return dict.fromkeys(USAGE_FIELDS, 0)
+    if getattr(usage, "prompt_tokens", None) is not None:
+        # OpenAI counts cached tokens as part of the prompt tokens
+        cached = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", 0) or 0
+        return {
+            "input_tokens": (usage.prompt_tokens or 0) - cached,
+            "cached_input_tokens": cached,
+            "cache_write_tokens": 0,
+            "output_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        }
+    return {
+        "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+        "cached_input_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0,
+        "cache_write_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+        "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+    }
+
+
+def record_usage(usage, response_usage):
+    """Add a response's token counts, and their sum as "tokens", to a usage dict"""
+    counts = usage_counts(response_usage)
+    for name, value in counts.items():
+        usage[name] = usage.get(name, 0) + value
+    usage["tokens"] = usage.get("tokens", 0) + sum(counts.values())
+    return usage
+
+
+class PromptUsage:
+    """Token counters of a job, thread safe"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.counts = dict.fromkeys(USAGE_FIELDS, 0)
+
+    def add(self, usage):
+        """Add a usage dict filled by record_usage() for one request"""
+        with self._lock:
+            self.requests += 1
+            for name in USAGE_FIELDS:
+                self.counts[name] += usage.get(name, 0)
+
+    def as_dict(self):
+        with self._lock:
+            counts = dict(self.counts)
+            requests = self.requests
+        prompt = counts["input_tokens"] + counts["cached_input_tokens"] + counts["cache_write_tokens"]
+        return {
+            "requests": requests,
+            **counts,
+            "cache_hit_ratio": round(counts["cached_input_tokens"] / prompt, 3) if prompt else 0,
+        }
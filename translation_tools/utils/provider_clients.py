@@ -0,0 +1,98 @@
+"""
+Per-process registry of AI provider SDK clients.
+
+Building an ``openai.OpenAI`` or ``anthropic.Anthropic`` client per call opens
+a new connection, and pays a new TLS handshake, for every request. Clients
+here are created once per provider and API key and share a pooled httpx
+client, using HTTP/2 when the ``h2`` package is installed.
+
+Connections must not be shared between processes: the registry remembers the
+pid it was filled in and starts over in a forked gunicorn or RQ worker.
+"""
+
+import hashlib
+import os
+import threading
+
+import httpx
+
+DEFAULT_TIMEOUT = 60
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE = 10
+KEEPALIVE_EXPIRY = 60
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+_clients = {}
+_clients_pid = os.getpid()
+_clients_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    global _clients, _clients_pid, _clients_lock
+    # Forget the parent's connections without closing them, they belong to it
+    _clients = {}
+    _clients_pid = os.getpid()
+    _clients_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def make_http_client(
+    timeout=DEFAULT_TIMEOUT,
+    max_connections=DEFAULT_MAX_CONNECTIONS,
+    max_keepalive=DEFAULT_MAX_KEEPALIVE,
+):
+    """Return a pooled httpx client for provider SDKs"""
+    return httpx.Client(
+        http2=HTTP2,
+        timeout=httpx.Timeout(timeout, connect=min(timeout, DEFAULT_CONNECT_TIMEOUT)),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def _build_client(provider, api_key, **options):
+    http_client = make_http_client(**options)
+    if provider in ("claude", "anthropic"):
+        import anthropic
+
+        return anthropic.Anthropic(api_key=api_key, http_client=http_client)
+
+    import openai
+
+    return openai.OpenAI(api_key=api_key, http_client=http_client)
+
+
+def get_provider_client(provider, api_key, configure=None):
+    """
+    Return the shared SDK client of a provider and API key
+
+    Clients are thread safe and are reused by all threads of the process.
+
+    Args:
+        provider (str): "openai", or "claude"/"anthropic"
+        configure: Callable returning make_http_client() keyword arguments;
+            only called when the client is created
+    """
+    if os.getpid() != _clients_pid:
+        _reset_after_fork()
+
+    kind = "anthropic" if provider in ("claude", "anthropic") else "openai"
+    key = (kind, hashlib.sha1((api_key or "").encode("utf-8")).hexdigest())
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = _build_client(kind, api_key, **(configure() if configure else {}))
+    return client
@@ -0,0 +1,311 @@
+"""
+Client-side rate limiting of AI provider requests.
+
+Every provider/model/API key has a token bucket for requests per minute and
+one for tokens per minute. The limits are learnt from the rate limit headers
+of the provider's responses, and the usable share of them adapts: it shrinks
+by half on every 429 and grows back slowly while requests succeed. A 429
+also pauses every caller of the same key until the provider's retry-after.
+
+The bucket state lives in a Redis hash (RedisStateStore), so parallel RQ
+workers and their threads share one budget; without Redis, or while it is
+unreachable, the state is kept in process.
+"""
+
+import hashlib
+import re
+import threading
+import time
+
+DEFAULT_RPM = 500
+DEFAULT_TPM = 200000
+
+# Adaptive share of the learnt limits
+MIN_FACTOR = 0.1
+FACTOR_INCREASE = 0.02
+FACTOR_DECREASE = 0.5
+
+# Pause after a 429 that came without a retry-after header
+DEFAULT_RETRY_AFTER = 5
+
+# Longest single sleep while waiting, so pauses set by others are noticed
+MAX_SLEEP = 5
+
+# Idle bucket state expires from Redis after this many seconds
+STATE_TTL = 600
+
+KEY_PREFIX = "translation_tools:rate_limit"
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def parse_duration(value):
+    """Seconds of a header duration like "20ms", "1s", "6m0s" or "12", None if unparsable"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+def _header_number(headers, *names):
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                continue
+    return None
+
+
+def parse_rate_limit_headers(headers):
+    """
+    Extract limits from OpenAI (x-ratelimit-*) or Anthropic
+    (anthropic-ratelimit-*) response headers
+
+    Returns:
+        dict: rpm, tpm, remaining_requests, remaining_tokens, reset_requests,
+        reset_tokens and retry_after, None where a header is missing
+    """
+    headers = {str(name).lower(): value for name, value in (headers or {}).items()}
+    return {
+        "rpm": _header_number(
+            headers, "x-ratelimit-limit-requests", "anthropic-ratelimit-requests-limit"
+        ),
+        "tpm": _header_number(
+            headers,
+            "x-ratelimit-limit-tokens",
+            "anthropic-ratelimit-tokens-limit",
+            "anthropic-ratelimit-input-tokens-limit",
+        ),
+        "remaining_requests": _header_number(
+            headers, "x-ratelimit-remaining-requests", "anthropic-ratelimit-requests-remaining"
+        ),
+        "remaining_tokens": _header_number(
+            headers,
+            "x-ratelimit-remaining-tokens",
+            "anthropic-ratelimit-tokens-remaining",
+            "anthropic-ratelimit-input-tokens-remaining",
+        ),
+        "reset_requests": parse_duration(headers.get("x-ratelimit-reset-requests")),
+        "reset_tokens": parse_duration(headers.get("x-ratelimit-reset-tokens")),
+        "retry_after": parse_duration(headers.get("retry-after")),
+    }
+
+
+def take(state, now, cost, default_rpm=DEFAULT_RPM, default_tpm=DEFAULT_TPM):
+    """
+    Try to take one request and ``cost`` tokens from a bucket state
+
+    Returns:
+        float: 0 when taken, otherwise seconds to wait before trying again
+    """
+    blocked_until = state.get("blocked_until", 0)
+    if blocked_until > now:
+        return blocked_until - now
+
+    factor = state.get("factor", 1.0)
+    rpm = (state.get("rpm") or default_rpm) * factor
+    tpm = (state.get("tpm") or default_tpm) * factor
+    elapsed = max(0.0, now - state.get("ts", now))
+    requests = min(rpm, state.get("req", rpm) + elapsed * rpm / 60)
+    tokens = min(tpm, state.get("tok", tpm) + elapsed * tpm / 60)
+    # A request larger than the whole bucket would otherwise never pass
+    cost = min(cost, tpm)
+
+    state["ts"] = now
+    wait = 0.0
+    if requests < 1:
+        wait = (1 - requests) * 60 / rpm
+    if tokens < cost:
+        wait = max(wait, (cost - tokens) * 60 / tpm)
+    if wait == 0:
+        requests -= 1
+        tokens -= cost
+    state["req"] = requests
+    state["tok"] = tokens
+    return wait
+
+
+def observe(state, now, limits, throttled=False):
+    """Update a bucket state from a response's parse_rate_limit_headers()"""
+    for name in ("rpm", "tpm"):
+        if limits.get(name):
+            state[name] = limits[name]
+
+    factor = state.get("factor", 1.0)
+    if throttled:
+        state["factor"] = max(MIN_FACTOR, factor * FACTOR_DECREASE)
+        pause = limits.get("retry_after") or DEFAULT_RETRY_AFTER
+        state["blocked_until"] = max(state.get("blocked_until", 0), now + pause)
+        state["req"] = 0
+        state["ts"] = now
+        return
+
+    state["factor"] = min(1.0, factor + FACTOR_INCREASE)
+    # The provider's view of the remaining budget covers every client of the key
+    if limits.get("remaining_requests") is not None:
+        state["req"] = min(state.get("req", limits["remaining_requests"]), limits["remaining_requests"])
+        if limits["remaining_requests"] < 1 and limits.get("reset_requests"):
+            state["blocked_until"] = max(state.get("blocked_until", 0), now + limits["reset_requests"])
+    if limits.get("remaining_tokens") is not None:
+        state["tok"] = min(state.get("tok", limits["remaining_tokens"]), limits["remaining_tokens"])
+
+
+class LocalStateStore:
+    """Bucket states kept in this process"""
+
+    def __init__(self):
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def update(self, key, change):
+        with self._lock:
+            state = self._states.setdefault(key, {})
+            return change(state)
+
+
+class RedisStateStore:
+    """Bucket states in Redis hashes, updated with optimistic transactions"""
+
+    def __init__(self, client, ttl=STATE_TTL):
+        self.client = client
+        self.ttl = ttl
+
+    def update(self, key, change):
+        from redis.exceptions import WatchError
+
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    state = {
+                        name.decode("utf-8"): float(value)
+                        for name, value in pipe.hgetall(key).items()
+                    }
+                    result = change(state)
+                    pipe.multi()
+                    if state:
+                        pipe.hset(key, mapping=state)
+                        pipe.expire(key, self.ttl)
+                    pipe.execute()
+                    return result
+                except WatchError:
+                    continue
+
+
+class ProviderRateLimiter:
+    """
+    Shared request and token budget of one provider/model/API key
+
+    Args:
+        key (str): Bucket name, see limiter_key()
+        store: RedisStateStore or LocalStateStore
+        default_rpm (int): Requests per minute until the headers tell otherwise
+        default_tpm (int): Tokens per minute until the headers tell otherwise
+    """
+
+    def __init__(self, key, store=None, default_rpm=DEFAULT_RPM, default_tpm=DEFAULT_TPM, logger=None):
+        self.key = key
+        self.store = store or LocalStateStore()
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self.logger = logger
+        self._fallback = None
+
+    def _update(self, change):
+        try:
+            return self.store.update(self.key, change)
+        except Exception as e:
+            # Keep translating with a per-process budget when Redis is unavailable
+            if self._fallback is None:
+                self._fallback = LocalStateStore()
+                if self.logger:
+                    self.logger.warning(f"Rate limiter {self.key} falling back to process state: {e}")
+            return self._fallback.update(self.key, change)
+
+    def acquire(self, tokens=0):
+        """Block until a request of ``tokens`` estimated tokens may be sent, return the time waited"""
+        waited = 0.0
+        while True:
+            now = time.time()
+            wait = self._update(
+                lambda state: take(state, now, tokens, self.default_rpm, self.default_tpm)
+            )
+            if wait <= 0:
+                if waited and self.logger:
+                    self.logger.debug(f"Rate limiter {self.key} waited {waited:.2f}s")
+                return waited
+            wait = min(wait, MAX_SLEEP)
+            time.sleep(wait)
+            waited += wait
+
+    def record_response(self, headers):
+        """Learn limits and remaining budget from a successful response"""
+        limits = parse_rate_limit_headers(headers)
+        now = time.time()
+        self._update(lambda state: observe(state, now, limits))
+
+    def record_throttle(self, headers=None):
+        """Back off after a 429, pausing every caller of the key"""
+        limits = parse_rate_limit_headers(headers)
+        now = time.time()
+        self._update(lambda state: observe(state, now, limits, throttled=True))
+        if self.logger:
+            self.logger.warning(f"Rate limited on {self.key}, backing off")
+
+    def call(self, create, estimated_tokens=0, throttle_errors=(), **kwargs):
+        """
+        Send a request through the limiter
+
+        Args:
+            create: An SDK ``with_raw_response`` method, e.g.
+                ``client.chat.completions.with_raw_response.create``
+            estimated_tokens (int): Tokens the request is expected to use
+            throttle_errors (tuple): Exception types meaning HTTP 429
+
+        Returns:
+            The parsed SDK response
+        """
+        self.acquire(estimated_tokens)
+        try:
+            raw = create(**kwargs)
+        except throttle_errors as e:
+            self.record_throttle(getattr(getattr(e, "response", None), "headers", None))
+            raise
+        self.record_response(raw.headers)
+        return raw.parse()
+
+
+def limiter_key(provider, model, api_key):
+    """Bucket name of a provider/model/API key; limits are per key, not per site"""
+    key_hash = hashlib.sha1((api_key or "").encode("utf-8")).hexdigest()[:12]
+    return f"{KEY_PREFIX}:{provider}:{model or ''}:{key_hash}"
+
+
+def get_rate_limiter(provider, model, api_key, configure=None):
+    """
+    Return the process-wide limiter of a provider/model/API key
+
+    Args:
+        configure: Callable returning ProviderRateLimiter keyword arguments
+            (store, default_rpm, default_tpm, logger); only called when the
+            limiter is created
+    """
+    key = limiter_key(provider, model, api_key)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = ProviderRateLimiter(key, **(configure() if configure else {}))
+    return limiter
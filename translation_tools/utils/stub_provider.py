@@ -0,0 +1,286 @@
+"""
+Offline stand-in for the AI provider SDK clients.
+
+StubProvider answers the requests the translation code makes through
+``client.chat.completions`` (OpenAI) and ``client.messages`` (Anthropic)
+with deterministic fake translations, so the whole pipeline (prompts,
+batching, rate limiter, circuit breaker, executor, streaming) can be run and
+measured without API keys or cost. Latency, random 5xx errors and a
+requests per minute limit answered with 429s are configurable.
+
+While a stub is enabled with enable(), translation.get_ai_client() returns
+its clients for every provider in this process.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+
+from translation_tools.utils.translation_batching import estimate_tokens
+
+STUB_API_KEY = "stub"
+STUB_MODEL = "stub-model"
+
+# Prefixes shorter than this are not cached, like the real providers
+CACHE_MIN_TOKENS = 1024
+
+_NUMBERED = re.compile(r"^(\d+)\. (.*)$", re.M)
+
+_active = None
+_active_lock = threading.Lock()
+
+
+def stub_translate(text):
+    """The stub's deterministic translation of a text"""
+    return f"[{STUB_MODEL}] {text}"
+
+
+def _after(content, label):
+    marker = f"\n\n{label}:\n"
+    return content.split(marker, 1)[1] if marker in content else content
+
+
+def answer(system, content):
+    """
+    Build the answer a provider would give to a translation prompt
+
+    Recognises the JSON chunk and numbered list (CSV) formats; anything else
+    is a single text to translate.
+    """
+    prompt = f"{system}\n{content}"
+    if '"translations"' in system:
+        payload = _after(content, "INPUT")
+        items = json.loads(payload[payload.index("[") :])
+        return json.dumps(
+            {
+                "translations": [
+                    {"id": item["id"], "translation": stub_translate(item["text"])}
+                    for item in items
+                ]
+            },
+            ensure_ascii=False,
+        )
+    if "numbered list" in prompt:
+        # Skip the format example when the system prompt is inlined in the message
+        items = content.rsplit("Translate from", 1)[-1]
+        return "\n".join(
+            f"{number}. {stub_translate(text)}" for number, text in _NUMBERED.findall(items)
+        )
+    return stub_translate(_after(content, "TEXT"))
+
+
+class StubProvider:
+    """
+    Fake provider with configurable behaviour, thread safe
+
+    Args:
+        latency (float): Seconds per request
+        jitter (float): Latency varies by up to this fraction either way
+        error_rate (float): Share of requests failing with a 500
+        rate_limit_rpm (int): Requests per minute before answering 429, 0 for
+            no limit
+        seed (int): Seed of the latency and error draws
+    """
+
+    def __init__(self, latency=0.05, jitter=0.5, error_rate=0.0, rate_limit_rpm=0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rpm = rate_limit_rpm
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = deque()
+        self._prefixes = set()
+        self.calls = 0
+        self.errors = 0
+        self.throttled = 0
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "errors": self.errors, "throttled": self.throttled}
+
+    def client(self, provider):
+        """SDK-like client of a provider kind, "openai" or "claude"/"anthropic" """
+        kind = "anthropic" if provider in ("claude", "anthropic") else "openai"
+        create = _Create(self, kind)
+        if kind == "anthropic":
+            return SimpleNamespace(messages=create)
+        return SimpleNamespace(chat=SimpleNamespace(completions=create))
+
+    def _admit(self, kind):
+        """Draw the outcome of a request: latency, 429 or 500"""
+        with self._lock:
+            self.calls += 1
+            now = time.monotonic()
+            while self._window and self._window[0] <= now - 60:
+                self._window.popleft()
+            if self.rate_limit_rpm and len(self._window) >= self.rate_limit_rpm:
+                self.throttled += 1
+                retry_after = max(0.0, self._window[0] + 60 - now)
+                raise _error(kind, 429, {"retry-after": f"{retry_after:.3f}"})
+            self._window.append(now)
+            remaining = self.rate_limit_rpm - len(self._window) if self.rate_limit_rpm else None
+            failed = self._random.random() < self.error_rate
+            delay = self.latency * (1 + self.jitter * (2 * self._random.random() - 1))
+        time.sleep(max(0.0, delay))
+        if failed:
+            with self._lock:
+                self.errors += 1
+            raise _error(kind, 500)
+        return remaining
+
+    def _cached_tokens(self, system):
+        tokens = estimate_tokens(system)
+        if tokens < CACHE_MIN_TOKENS:
+            return 0
+        with self._lock:
+            if system in self._prefixes:
+                return tokens
+            self._prefixes.add(system)
+        return 0
+
+    def respond(self, kind, kwargs):
+        remaining = self._admit(kind)
+        system = kwargs.get("system") or ""
+        if isinstance(system, list):
+            system = "".join(block.get("text", "") for block in system)
+        messages = kwargs.get("messages", [])
+        for message in messages:
+            if message.get("role") == "system":
+                system = message.get("content") or ""
+        content = next(
+            (m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), ""
+        )
+
+        text = answer(system, content)
+        cached = self._cached_tokens(system)
+        prompt_tokens = estimate_tokens(system + content)
+        output_tokens = estimate_tokens(text)
+        headers = _headers(kind, self.rate_limit_rpm, remaining)
+        if kind == "anthropic":
+            usage = SimpleNamespace(
+                input_tokens=prompt_tokens - cached,
+                output_tokens=output_tokens,
+                cache_read_input_tokens=cached,
+                cache_creation_input_tokens=0,
+            )
+        else:
+            usage = SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=output_tokens,
+                total_tokens=prompt_tokens + output_tokens,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=cached),
+            )
+
+        tool = kind == "anthropic" and bool(kwargs.get("tools"))
+        if kwargs.get("stream"):
+            return headers, _stream(kind, text, usage, tool)
+        if kind == "anthropic":
+            if tool:
+                block = SimpleNamespace(
+                    type="tool_use", name=kwargs["tools"][0]["name"], input=json.loads(text)
+                )
+            else:
+                block = SimpleNamespace(type="text", text=text)
+            parsed = SimpleNamespace(
+                model=kwargs.get("model"),
+                content=[block],
+                usage=usage,
+                stop_reason="tool_use" if tool else "end_turn",
+            )
+        else:
+            parsed = SimpleNamespace(
+                model=kwargs.get("model"),
+                choices=[
+                    SimpleNamespace(message=SimpleNamespace(content=text), finish_reason="stop")
+                ],
+                usage=usage,
+            )
+        return headers, parsed
+
+
+class _Create:
+    """``create`` and ``with_raw_response.create`` of a stub client"""
+
+    def __init__(self, provider, kind):
+        self._provider = provider
+        self._kind = kind
+        self.with_raw_response = SimpleNamespace(create=self._create_raw)
+
+    def create(self, **kwargs):
+        return self._provider.respond(self._kind, kwargs)[1]
+
+    def _create_raw(self, **kwargs):
+        headers, parsed = self._provider.respond(self._kind, kwargs)
+        return SimpleNamespace(headers=headers, parse=lambda: parsed)
+
+
+def _headers(kind, rpm, remaining):
+    if not rpm:
+        return {}
+    if kind == "anthropic":
+        return {
+            "anthropic-ratelimit-requests-limit": str(rpm),
+            "anthropic-ratelimit-requests-remaining": str(remaining),
+        }
+    return {"x-ratelimit-limit-requests": str(rpm), "x-ratelimit-remaining-requests": str(remaining)}
+
+
+def _stream(kind, text, usage, tool=False):
+    """Events of a streamed answer, a few characters at a time"""
+    pieces = [text[i : i + 16] for i in range(0, len(text), 16)]
+    if kind == "anthropic":
+        start_usage = SimpleNamespace(**{**vars(usage), "output_tokens": 1})
+        yield SimpleNamespace(type="message_start", message=SimpleNamespace(usage=start_usage))
+        for piece in pieces:
+            if tool:
+                delta = SimpleNamespace(type="input_json_delta", partial_json=piece)
+            else:
+                delta = SimpleNamespace(type="text_delta", text=piece)
+            yield SimpleNamespace(type="content_block_delta", delta=delta)
+        yield SimpleNamespace(
+            type="message_delta", usage=SimpleNamespace(output_tokens=usage.output_tokens)
+        )
+        return
+    for piece in pieces:
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))], usage=None)
+    yield SimpleNamespace(choices=[], usage=usage)
+
+
+def _error(kind, status, headers=None):
+    """The SDK exception a provider raises for an HTTP status"""
+    import httpx
+
+    if kind == "anthropic":
+        import anthropic as sdk
+    else:
+        import openai as sdk
+
+    error = sdk.RateLimitError if status == 429 else sdk.InternalServerError
+    response = httpx.Response(
+        status, headers=headers, request=httpx.Request("POST", "https://stub.invalid/v1")
+    )
+    return error(f"Stub provider error {status}", response=response, body=None)
+
+
+def enable(**options):
+    """Route this process's provider clients to a new StubProvider and return it"""
+    global _active
+    with _active_lock:
+        _active = StubProvider(**options)
+    return _active
+
+
+def disable():
+    global _active
+    with _active_lock:
+        _active = None
+
+
+def get_active_stub():
+    """The enabled StubProvider, or None"""
+    return _active
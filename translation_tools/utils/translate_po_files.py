@@ -17,6 +17,13 @@ Options:
 """
 
 from translation_tools.utils.thai_glossary import GLOSSARY
+from translation_tools.utils.provider_clients import get_provider_client
+from translation_tools.utils.rate_limiter import get_rate_limiter
+from translation_tools.utils.translation_batching import (
+    estimate_tokens,
+    format_glossary,
+    select_glossary_terms,
+)
 import os
 import re
 import sys
@@ -48,7 +55,6 @@ DEFAULT_TARGET_LANG = "th"
 # DEFAULT_MODEL = "gpt-4"
 DEFAULT_MODEL = "gpt-4.1-mini-2025-04-14"  # Using a model that supports JSON format
 DEFAULT_BATCH_SIZE = 10
-SLEEP_TIME = 0.5  # Seconds to sleep between API calls to avoid rate limiting
 
 
 def backoff_wait(attempt):
@@ -172,11 +178,10 @@ def translate_batch_claude(
     entries: List[Dict], target_lang: str, api_key: str, model: str
 ) -> List[str]:
     """Translate a batch of entries using Anthropic Claude API."""
-    client = anthropic.Anthropic(api_key=api_key)
-    GLOSSARY_TEXT = json.dumps(GLOSSARY, indent=2)
-
+    client = get_provider_client("claude", api_key)
     # Format the batch for translation
     messages_to_translate = [entry["msgid"] for entry in entries]
+    GLOSSARY_TEXT = format_glossary(select_glossary_terms(GLOSSARY, messages_to_translate))
 
     # Create prompt with instructions
     prompt = f"""
@@ -193,7 +198,10 @@ def translate_batch_claude(
 
     # Make the API call
     try:
-        response = client.messages.create(
+        response = get_rate_limiter("claude", model, api_key).call(
+            client.messages.with_raw_response.create,
+            estimate_tokens(prompt) + 1000,
+            throttle_errors=(anthropic.RateLimitError,),
             model=model or "claude-3-haiku-20240307",
             max_tokens=1000,
             temperature=0.3,
@@ -237,11 +245,10 @@ def translate_batch(
 ) -> List[str]:
     """Translate a batch of entries using OpenAI API."""
     # openai.api_key = api_key
-    client = openai.OpenAI(api_key=api_key)
-    GLOSSARY_TEXT = json.dumps(GLOSSARY, indent=2)
-
+    client = get_provider_client("openai", api_key)
     # Format the batch for translation
     messages_to_translate = [entry["msgid"] for entry in entries]
+    GLOSSARY_TEXT = format_glossary(select_glossary_terms(GLOSSARY, messages_to_translate))
 
     # Create system prompt with instructions
     system_prompt = f"""
@@ -276,7 +283,10 @@ def translate_batch(
                 # For older models that don't support JSON response format
                 api_params = {}
 
-            response = client.chat.completions.create(
+            response = get_rate_limiter("openai", model, api_key).call(
+                client.chat.completions.with_raw_response.create,
+                estimate_tokens(system_prompt + json.dumps(messages_to_translate)) + max_tokens,
+                throttle_errors=(openai.RateLimitError,),
                 model=model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -424,10 +434,6 @@ def translate_po_file(
         po.save(output_path)
         print(f"Saved progress to {output_path}")
 
-        # Sleep to avoid rate limiting
-        if batch_num < total_batches - 1:
-            time.sleep(SLEEP_TIME)
-
     # Update metadata
     po.metadata["PO-Revision-Date"] = datetime.now().strftime("%Y-%m-%d %H:%M%z")
     po.metadata["Language"] = target_lang
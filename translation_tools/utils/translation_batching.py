@@ -0,0 +1,284 @@
+"""
+Packing of PO entries into multi-entry translation requests.
+
+Each chunk is sent as one provider request with a JSON payload of
+``{"id", "text"}`` items and the provider answers with a list of
+``{"id", "translation"}`` objects, enforced with a JSON schema (OpenAI) or a
+forced tool call (Anthropic), see CHUNK_RESPONSE_SCHEMA. Chunks are packed by
+an estimated token budget rather than a fixed entry count, so a chunk of
+short labels holds many more entries than a chunk of help texts.
+
+Every translation in an answer is validated against its source: unknown ids
+are ignored, and a missing, empty or placeholder-breaking translation is
+reported so the caller can send just those items again.
+"""
+
+import json
+import math
+import re
+import threading
+
+from translation_tools.utils.glossary_matcher import get_glossary_matcher
+
+# Estimated tokens per request, source plus expected translation
+DEFAULT_TOKEN_BUDGET = 4000
+
+# Hard cap on entries per request, keeps a single failure cheap to retry
+DEFAULT_MAX_ITEMS = 50
+
+# Rough tokenizer ratios: English source text and the Thai output it produces
+CHARS_PER_TOKEN = 4
+OUTPUT_TOKEN_FACTOR = 2.5
+
+# JSON keys, quotes and separators around every item
+ITEM_OVERHEAD_TOKENS = 10
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+# Smaller chunks for items sent again after a chunk's answer missed them
+RETRY_MAX_ITEMS = 10
+
+# A complete "key": "value" pair of JSON strings
+_STREAM_PAIR = re.compile(r'"((?:[^"\\]|\\.)*)"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+# A complete {"id": ..., "translation": ...} item of the schema's list
+_STREAM_ITEM = re.compile(
+    r'"id"\s*:\s*"((?:[^"\\]|\\.)*)"\s*,\s*"translation"\s*:\s*"((?:[^"\\]|\\.)*)"'
+)
+
+# Jinja expressions, Python format fields and printf conversions
+_PLACEHOLDER = re.compile(r"\{\{.*?\}\}|\{[^{}\s]*\}|%(?:\([^)]*\))?[-#0+]*\d*(?:\.\d+)?[sdifr]")
+
+CHUNK_TOOL_NAME = "submit_translations"
+
+# Answer of a chunk request: one object per input item
+CHUNK_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "translations": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "string"},
+                    "translation": {"type": "string"},
+                },
+                "required": ["id", "translation"],
+                "additionalProperties": False,
+            },
+        }
+    },
+    "required": ["translations"],
+    "additionalProperties": False,
+}
+
+# Reasons an item of a chunk's answer is not accepted
+MISSING = "missing"
+EMPTY = "empty"
+PLACEHOLDERS = "placeholders"
+
+
+def estimate_tokens(text):
+    """Rough token count of a piece of source text"""
+    return max(1, math.ceil(len(text or "") / CHARS_PER_TOKEN))
+
+
+def item_cost(text):
+    """Estimated tokens an item adds to a request, input and output"""
+    return math.ceil(estimate_tokens(text) * (1 + OUTPUT_TOKEN_FACTOR)) + ITEM_OVERHEAD_TOKENS
+
+
+def pack_chunks(items, token_budget=DEFAULT_TOKEN_BUDGET, max_items=DEFAULT_MAX_ITEMS):
+    """
+    Group items into chunks that fit a token budget, keeping their order
+
+    Args:
+        items (list): (id, text) tuples
+        token_budget (int): Estimated tokens per chunk, see item_cost()
+        max_items (int): Maximum items per chunk
+
+    Returns:
+        list: Lists of (id, text) tuples. An item larger than the budget gets
+        a chunk of its own.
+    """
+    chunks = []
+    chunk = []
+    used = 0
+    for item in items:
+        cost = item_cost(item[1])
+        if chunk and (used + cost > token_budget or len(chunk) >= max_items):
+            chunks.append(chunk)
+            chunk = []
+            used = 0
+        chunk.append(item)
+        used += cost
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def chunk_payload(chunk):
+    """Serialise a chunk as the JSON array sent to the provider"""
+    return json.dumps(
+        [{"id": str(item_id), "text": text} for item_id, text in chunk], ensure_ascii=False
+    )
+
+
+def placeholders(text):
+    """Placeholders of a text that a translation must keep, sorted"""
+    return sorted(_PLACEHOLDER.findall(text or ""))
+
+
+def check_translation(source, translation):
+    """
+    Check a translation against its source text
+
+    Returns:
+        str: EMPTY or PLACEHOLDERS when the translation is not usable,
+        otherwise None
+    """
+    if not isinstance(translation, str) or not translation.strip():
+        return EMPTY
+    if placeholders(source) != placeholders(translation):
+        return PLACEHOLDERS
+    return None
+
+
+def _response_items(response):
+    """id -> value of a decoded or raw chunk answer, None when it does not parse"""
+    data = response
+    if isinstance(response, str):
+        try:
+            data = json.loads(_CODE_FENCE.sub("", response.strip()))
+        except ValueError:
+            return None
+
+    if isinstance(data, dict) and "translations" in data:
+        data = data["translations"]
+    if isinstance(data, list):
+        data = {
+            str(item.get("id")): item.get("translation", item.get("text"))
+            for item in data
+            if isinstance(item, dict)
+        }
+    return data if isinstance(data, dict) else None
+
+
+def validate_chunk_response(response, chunk):
+    """
+    Extract and validate the translations of a chunk's answer
+
+    Accepts a JSON string or the decoded tool input: ``{"translations":
+    [{"id", "translation"}]}``, ``{"translations": {id: text}}``, ``{id:
+    text}`` or a bare list, optionally inside a code fence.
+
+    Returns:
+        tuple: (id -> translation of the valid items, id -> reason of the
+        others: MISSING, EMPTY or PLACEHOLDERS)
+    """
+    data = _response_items(response) if response else None
+    translations = {}
+    invalid = {}
+    for item_id, text in chunk:
+        value = (data or {}).get(str(item_id))
+        if value is None:
+            invalid[item_id] = MISSING
+            continue
+        reason = check_translation(text, value)
+        if reason:
+            invalid[item_id] = reason
+        else:
+            translations[item_id] = value.strip()
+    return translations, invalid
+
+
+def parse_chunk_response(response_text, chunk):
+    """
+    Extract the valid translations from a provider's JSON answer
+
+    Returns:
+        dict: id -> translation for the items of the chunk that came back
+        usable; anything else is left out for the caller to retry, see
+        validate_chunk_response()
+    """
+    return validate_chunk_response(response_text, chunk)[0]
+
+
+class ParseStats:
+    """Requested and rejected items of chunk answers per model, thread safe"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.models = {}
+
+    def add(self, model, requested, invalid):
+        """Count a chunk answer of ``requested`` items, ``invalid`` is id -> reason"""
+        with self._lock:
+            counts = self.models.setdefault(model or "unknown", {"requests": 0, "items": 0})
+            counts["requests"] += 1
+            counts["items"] += requested
+            for reason in invalid.values():
+                counts[reason] = counts.get(reason, 0) + 1
+
+    def as_dict(self):
+        with self._lock:
+            return {model: dict(counts) for model, counts in self.models.items()}
+
+
+def failure_rate(counts):
+    """Share of requested items rejected, from ParseStats counts, in percent"""
+    items = counts.get("items", 0)
+    failed = sum(counts.get(reason, 0) for reason in (MISSING, EMPTY, PLACEHOLDERS))
+    return round(failed / items * 100, 2) if items else 0
+
+
+class ChunkStreamParser:
+    """
+    Pick translations out of a chunk's JSON answer while it is streamed
+
+    Every complete ``{"id": ..., "translation": ...}`` item, or
+    ``"<id>": "<translation>"`` pair of the older map answer, is returned as
+    soon as its closing quote arrives, if it passes check_translation(). The
+    items are only a preview: the full answer is still validated with
+    validate_chunk_response() once the stream ends.
+    """
+
+    def __init__(self, chunk):
+        self.ids = {str(item_id): item_id for item_id, _ in chunk}
+        self.texts = dict(chunk)
+        self.buffer = ""
+        self.pos = 0
+        self.seen = set()
+
+    def feed(self, text):
+        """Add streamed text, return (id, translation) pairs completed by it"""
+        self.buffer += text or ""
+        found = []
+        pattern = _STREAM_ITEM if '"id"' in self.buffer else _STREAM_PAIR
+        for match in pattern.finditer(self.buffer, self.pos):
+            self.pos = match.end()
+            try:
+                key = json.loads(f'"{match.group(1)}"')
+                value = json.loads(f'"{match.group(2)}"').strip()
+            except ValueError:
+                continue
+            item_id = self.ids.get(key)
+            if item_id is None or item_id in self.seen:
+                continue
+            if check_translation(self.texts[item_id], value):
+                continue
+            self.seen.add(item_id)
+            found.append((item_id, value))
+        return found
+
+
+def select_glossary_terms(glossary_terms, texts):
+    """Return the glossary terms that occur in any of the texts, see glossary_matcher"""
+    if not glossary_terms:
+        return {}
+    return get_glossary_matcher(glossary_terms).select(texts)
+
+
+def format_glossary(glossary_terms):
+    """Serialise glossary terms for a prompt"""
+    return json.dumps(glossary_terms, ensure_ascii=False, indent=2)
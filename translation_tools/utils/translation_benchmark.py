@@ -0,0 +1,178 @@
+"""
+Throughput benchmark of the translation pipeline, run against the stub provider.
+
+translate_po_file, translate_batch and translate_csv_column are run on
+synthetic catalogs of the requested sizes with every provider request
+answered by utils/stub_provider.py, so a run costs nothing and only
+measures our own overhead plus the simulated latency. Each result reports
+wall time, provider calls made (including injected errors and 429s) and
+entries per second.
+
+Usage: bench --site <site> benchmark-translation --sizes 1000,10000,50000
+"""
+
+import base64
+import csv
+import io
+import json
+import os
+import random
+import shutil
+import time
+
+import frappe
+import polib
+
+from translation_tools.utils.po_catalog import entry_key
+from translation_tools.utils.stub_provider import STUB_MODEL, disable, enable
+
+DEFAULT_SIZES = (1000, 10000, 50000)
+TARGETS = ("po_file", "batch", "csv")
+
+_WORDS = (
+    "account", "sales", "invoice", "purchase", "order", "item", "customer", "supplier",
+    "payment", "entry", "journal", "stock", "warehouse", "tax", "template", "price",
+    "list", "cost", "center", "project", "task", "employee", "salary", "ledger",
+    "balance", "report", "settings", "default", "posting", "date", "amount", "total",
+    "please", "select", "cannot", "be", "the", "for", "is", "not", "allowed", "new",
+)
+
+
+def synthetic_sources(count, seed=0, salt=""):
+    """Return ``count`` distinct UI-like English strings"""
+    rng = random.Random(seed)
+    sources = []
+    for i in range(count):
+        words = [rng.choice(_WORDS) for _ in range(rng.randint(1, 12))]
+        # The salt keeps translation memory entries of earlier runs from being served
+        sources.append(f"{' '.join(words).capitalize()} {salt}{i}")
+    return sources
+
+
+def write_catalog(path, sources):
+    po = polib.POFile()
+    po.metadata = {"Language": "th", "Content-Type": "text/plain; charset=utf-8"}
+    for source in sources:
+        po.append(polib.POEntry(msgid=source, msgstr=""))
+    po.save(path)
+    return po
+
+
+def synthetic_csv(sources):
+    """Base64 CSV content with a filled source and an empty target column"""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(["source", "target"])
+    writer.writerows([source, ""] for source in sources)
+    return base64.b64encode(output.getvalue().encode("utf-8")).decode("ascii")
+
+
+def _run_target(target, sources, work_dir, provider, concurrency):
+    """Run one pipeline entry point, return the number of entries translated"""
+    from translation_tools.api.ai_translation import translate_batch
+    from translation_tools.api.csv_translation import translate_csv_column
+    from translation_tools.api.translation import translate_po_file, translation_journal_path
+
+    if target == "csv":
+        result = translate_csv_column(
+            synthetic_csv(sources),
+            "source",
+            "target",
+            direction="en_to_th",
+            model_provider=provider,
+            model=STUB_MODEL,
+        )
+        return result.get("translated_count", 0)
+
+    path = os.path.join(work_dir, f"{target}_{len(sources)}_th.po")
+    po = write_catalog(path, sources)
+    if target == "po_file":
+        try:
+            result = translate_po_file(
+                path, model_provider=provider, model=STUB_MODEL, concurrency=concurrency
+            )
+        finally:
+            journal_path = translation_journal_path(path)
+            if os.path.exists(journal_path):
+                os.remove(journal_path)
+        return result.get("translated_count", 0)
+
+    result = translate_batch(
+        path,
+        json.dumps([entry_key(entry) for entry in po]),
+        model_provider=provider,
+        model=STUB_MODEL,
+    )
+    return sum(1 for translation in (result.get("translations") or {}).values() if translation)
+
+
+def run_benchmark(
+    sizes=DEFAULT_SIZES,
+    targets=TARGETS,
+    provider="openai",
+    latency=0.05,
+    jitter=0.5,
+    error_rate=0.0,
+    rate_limit_rpm=0,
+    concurrency=None,
+    seed=0,
+    on_result=None,
+):
+    """
+    Benchmark the translation entry points against the stub provider
+
+    Args:
+        sizes: Catalog sizes in entries
+        targets: Any of "po_file", "batch" and "csv"
+        latency, jitter, error_rate, rate_limit_rpm, seed: StubProvider options
+        concurrency (int): Requests in flight for translate_po_file
+        on_result: Callable taking each result dict as soon as it is measured
+
+    Returns:
+        list: One dict per size and target with entries, translated,
+        wall_time, calls, errors, throttled and entries_per_sec
+    """
+    from translation_tools.api.common import get_bench_path
+    from translation_tools.api.translation_memory import TM_DOCTYPE
+
+    work_dir = os.path.join(get_bench_path(), "logs", "translation_benchmark")
+    os.makedirs(work_dir, exist_ok=True)
+    salt = f"{frappe.generate_hash(length=6)}-"
+    stub = enable(
+        latency=latency,
+        jitter=jitter,
+        error_rate=error_rate,
+        rate_limit_rpm=rate_limit_rpm,
+        seed=seed,
+    )
+
+    results = []
+    try:
+        for size in sizes:
+            sources = synthetic_sources(size, seed, salt)
+            for target in targets:
+                before = stub.stats()
+                started = time.monotonic()
+                translated = _run_target(target, sources, work_dir, provider, concurrency)
+                wall_time = time.monotonic() - started
+                after = stub.stats()
+
+                result = {
+                    "target": target,
+                    "entries": size,
+                    "translated": translated,
+                    "wall_time": round(wall_time, 2),
+                    **{name: after[name] - before[name] for name in after},
+                    "entries_per_sec": round(translated / wall_time, 1) if wall_time else 0,
+                }
+                results.append(result)
+                if on_result:
+                    on_result(result)
+    finally:
+        disable()
+        shutil.rmtree(work_dir, ignore_errors=True)
+        # Stub translations must not stay in the translation memory
+        frappe.db.delete(TM_DOCTYPE, {"model": STUB_MODEL})
+        frappe.db.commit()
+
+    return results
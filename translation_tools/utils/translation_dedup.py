@@ -0,0 +1,73 @@
+"""
+Cross-catalog deduplication of untranslated entries.
+
+Jobs that translate several apps and locales see the same msgids over and
+over ("Company", "Posting Date", ...). Before anything is sent to a provider,
+the untranslated entries of all targeted catalogs are grouped by exact
+(msgid, msgctxt, locale), so each unique string is translated once and the
+result is fanned back out to every entry of its group. Sources differing
+only in whitespace stay apart, their translations must keep that spacing.
+"""
+
+
+class TranslationGroup:
+    """A unique (source, context, language) and the entries that share it"""
+
+    __slots__ = ("source", "context", "language", "targets")
+
+    def __init__(self, source, context, language):
+        self.source = source
+        self.context = context
+        self.language = language
+        self.targets = []
+
+
+class DedupPlan:
+    """Unique translation groups of a job and how many entries they cover"""
+
+    def __init__(self, groups, occurrences):
+        self.groups = groups
+        self.occurrences = occurrences
+
+    @property
+    def calls_saved(self):
+        """Entries that do not need a translation of their own"""
+        return self.occurrences - len(self.groups)
+
+    def by_language(self):
+        """Return language -> list of groups"""
+        languages = {}
+        for group in self.groups:
+            languages.setdefault(group.language, []).append(group)
+        return languages
+
+    def as_dict(self):
+        return {
+            "occurrences": self.occurrences,
+            "unique": len(self.groups),
+            "calls_saved": self.calls_saved,
+        }
+
+
+def plan_deduplicated_translation(occurrences):
+    """
+    Group untranslated entries by exact source, context and language
+
+    Args:
+        occurrences: Iterable of (target, source text, msgctxt or None,
+            language) tuples; target is whatever the caller needs to apply
+            the translation later, e.g. (catalog, entry)
+
+    Returns:
+        DedupPlan: Groups in order of first occurrence
+    """
+    groups = {}
+    count = 0
+    for target, source, context, language in occurrences:
+        key = (language or "", context or "", source)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = TranslationGroup(source, context, language)
+        group.targets.append(target)
+        count += 1
+    return DedupPlan(list(groups.values()), count)
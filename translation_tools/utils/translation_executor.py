@@ -0,0 +1,148 @@
+"""
+Concurrent executor for per-entry AI translation.
+
+Provider calls are network bound, so translating one entry at a time leaves
+the worker idle for most of a run. TranslationExecutor keeps a bounded number
+of requests in flight on a thread pool while results are still applied one
+by one, in input order, on the calling thread. That keeps the catalog (and
+anything else that is not thread safe, like frappe.local) out of the worker
+threads.
+"""
+
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+
+DEFAULT_CONCURRENCY = 4
+
+# Seconds between on_poll calls while waiting for a result
+DEFAULT_POLL_INTERVAL = 0.2
+
+_DONE = object()
+
+
+class ExecutorStats:
+    """Counters and throughput of an executor run"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.finished = None
+        self.translated = 0
+        self.failed = 0
+        self.tokens = 0
+        self.checkpoints = 0
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def entries_per_sec(self):
+        return round(self.translated / self.elapsed, 2) if self.elapsed else 0
+
+    @property
+    def tokens_per_sec(self):
+        return round(self.tokens / self.elapsed, 2) if self.elapsed else 0
+
+    def as_dict(self):
+        return {
+            "translated": self.translated,
+            "failed": self.failed,
+            "tokens": self.tokens,
+            "checkpoints": self.checkpoints,
+            "elapsed": round(self.elapsed, 2),
+            "entries_per_sec": self.entries_per_sec,
+            "tokens_per_sec": self.tokens_per_sec,
+        }
+
+
+class TranslationExecutor:
+    """
+    Run translate() for many items with at most ``concurrency`` calls at once
+
+    Args:
+        translate: Callable taking an item and returning (translation, tokens);
+            runs on worker threads
+        concurrency (int): Maximum number of translate() calls in flight
+        checkpoint_every (int): Call on_checkpoint after this many applied
+            results, 0 to only checkpoint at the end
+        on_checkpoint: Callable taking the ExecutorStats, runs on the calling
+            thread, e.g. to flush the catalog to disk
+        on_poll: Callable without arguments, runs on the calling thread every
+            ``poll_interval`` seconds while waiting for a result, e.g. to
+            publish partial results collected by the workers
+    """
+
+    def __init__(
+        self,
+        translate,
+        concurrency=DEFAULT_CONCURRENCY,
+        checkpoint_every=0,
+        on_checkpoint=None,
+        on_poll=None,
+        poll_interval=DEFAULT_POLL_INTERVAL,
+    ):
+        self.translate = translate
+        self.concurrency = max(1, int(concurrency or 1))
+        self.checkpoint_every = max(0, int(checkpoint_every or 0))
+        self.on_checkpoint = on_checkpoint
+        self.on_poll = on_poll
+        self.poll_interval = poll_interval
+
+    def run(self, items, apply, on_error=None):
+        """
+        Translate items and apply the results in input order
+
+        Args:
+            items: Iterable of items to translate
+            apply: Callable taking (item, translation), runs on the calling thread
+            on_error: Callable taking (item, exception) for failed items
+
+        Returns:
+            ExecutorStats: Counters of the run
+        """
+        stats = ExecutorStats()
+        items = iter(items)
+        # Queue a few more calls than workers, so a slow result at the head
+        # does not leave workers idle
+        window = self.concurrency * 2
+        pending = deque()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="translate") as pool:
+
+            def fill():
+                while len(pending) < window:
+                    item = next(items, _DONE)
+                    if item is _DONE:
+                        return
+                    pending.append((item, pool.submit(self.translate, item)))
+
+            fill()
+            while pending:
+                item, future = pending.popleft()
+                if self.on_poll:
+                    while not wait([future], timeout=self.poll_interval).done:
+                        self.on_poll()
+                    self.on_poll()
+                try:
+                    translation, tokens = future.result()
+                except Exception as e:
+                    stats.failed += 1
+                    if on_error:
+                        on_error(item, e)
+                else:
+                    apply(item, translation)
+                    stats.translated += 1
+                    stats.tokens += tokens or 0
+                    if self.checkpoint_every and stats.translated % self.checkpoint_every == 0:
+                        self._checkpoint(stats)
+                fill()
+
+        self._checkpoint(stats)
+        stats.finished = time.monotonic()
+        return stats
+
+    def _checkpoint(self, stats):
+        if self.on_checkpoint:
+            self.on_checkpoint(stats)
+            stats.checkpoints += 1
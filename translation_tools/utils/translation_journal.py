@@ -0,0 +1,145 @@
+"""
+Append-only journal of a PO file translation job.
+
+A long translation run only writes the PO file at checkpoints, so a worker
+that dies or hits the RQ timeout loses the translations received since the
+last one, and those were already paid for. The journal records, one JSON
+line per event, which entry keys were sent to the provider, which
+translations came back and which were written to the PO file. A restarted
+job replays it, applies the received but unwritten translations without
+calling the provider again and only sends what is left. Progress can be
+read from the journal alone, without parsing the PO file.
+"""
+
+import json
+import os
+import threading
+import time
+
+START = "start"
+SENT = "sent"
+RECEIVED = "received"
+APPLIED = "applied"
+FINISH = "finish"
+
+
+class JournalState:
+    """What a journal says about its job"""
+
+    def __init__(self):
+        self.started_at = None
+        self.updated_at = None
+        self.total = 0
+        self.provider = None
+        self.model = None
+        self.sent = set()
+        self.received = {}
+        self.applied = set()
+        self.tokens = 0
+        self.finished = False
+        self.summary = None
+
+    @property
+    def pending(self):
+        """Received translations not yet written to the PO file: key -> msgstr"""
+        return {key: msgstr for key, msgstr in self.received.items() if key not in self.applied}
+
+    def as_dict(self):
+        return {
+            "started_at": self.started_at,
+            "updated_at": self.updated_at,
+            "provider": self.provider,
+            "model": self.model,
+            "total": self.total,
+            "sent": len(self.sent),
+            "received": len(self.received),
+            "applied": len(self.applied),
+            "pending": len(self.pending),
+            "tokens": self.tokens,
+            "finished": self.finished,
+            "progress": round(len(self.applied) / self.total * 100, 1) if self.total else 0,
+        }
+
+
+class TranslationJournal:
+    """
+    JSON lines journal of one PO file's translation job
+
+    Thread safe; ``sent`` and ``received`` may be recorded from executor
+    worker threads.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _write(self, event, sync=False, **data):
+        line = json.dumps({"event": event, "ts": time.time(), **data}, ensure_ascii=False)
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+
+    def replay(self):
+        """Read the journal into a JournalState, ignoring a torn last line"""
+        state = JournalState()
+        if not os.path.exists(self.path):
+            return state
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                event = record.get("event")
+                state.updated_at = record.get("ts")
+                if event == START:
+                    state.started_at = record.get("ts")
+                    state.total = record.get("total", 0)
+                    state.provider = record.get("provider")
+                    state.model = record.get("model")
+                elif event == SENT:
+                    state.sent.add(record["key"])
+                elif event == RECEIVED:
+                    state.received[record["key"]] = record["msgstr"]
+                    state.tokens += record.get("tokens") or 0
+                elif event == APPLIED:
+                    state.applied.update(record["keys"])
+                elif event == FINISH:
+                    state.finished = True
+                    state.summary = record.get("summary")
+        return state
+
+    def start(self, total, provider=None, model=None, resumed=False):
+        """Begin a job; a fresh job truncates the journal of a previous one"""
+        if not resumed:
+            self.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        self._write(START, sync=True, total=total, provider=provider, model=model, resumed=resumed)
+
+    def sent(self, key):
+        self._write(SENT, key=key)
+
+    def received(self, key, msgstr, tokens=0):
+        self._write(RECEIVED, key=key, msgstr=msgstr, tokens=tokens)
+
+    def applied(self, keys):
+        """Record keys written to the PO file, call after the file was saved"""
+        if keys:
+            self._write(APPLIED, sync=True, keys=list(keys))
+
+    def finish(self, summary=None):
+        self._write(FINISH, sync=True, summary=summary)
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
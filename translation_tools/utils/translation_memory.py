@@ -0,0 +1,24 @@
+"""
+Keys of the translation memory (TM).
+
+A TM entry is identified by the target language, the glossary version it was
+produced under, the msgctxt and the normalised source text. Normalising only
+folds Unicode composition; whitespace is kept, since a translation has to
+reproduce the source's leading, trailing and inner spacing and line breaks.
+"""
+
+import hashlib
+import unicodedata
+
+KEY_SEPARATOR = "\x04"
+
+
+def normalize_source(text):
+    """Normalise source text for TM lookups"""
+    return unicodedata.normalize("NFC", text or "")
+
+
+def make_tm_key(source, context, language, glossary_version):
+    """Return the TM key (also the record name) of a source text"""
+    parts = (language or "", str(glossary_version or 0), context or "", normalize_source(source))
+    return hashlib.sha1(KEY_SEPARATOR.join(parts).encode("utf-8")).hexdigest()